@@ -0,0 +1,127 @@
+"""
+Compares the sync and the async views under ASGI, on a single worker, i.e.
+event loop: concurrent clients poll the issue list and the issues of a
+project through the ASGI handler serving the sync views, and through the
+one of softdesk.asgi serving the async views.
+
+The queries are run as is, then with a latency added to each of them, as
+for a database on the network or on a cold disk.
+
+    python -m benchmarks.bench_async_views [issues] [requests] [latency ms]
+"""
+import asyncio
+import statistics
+import sys
+import time
+
+from benchmarks.utils import seed_project, setup, test_database
+
+
+# Latency added to each query, in seconds
+query_latency = 0
+
+
+def execute(execute, sql, params, many, context):
+    if query_latency:
+        time.sleep(query_latency)
+    return execute(sql, params, many, context)
+
+
+def connected(sender, connection, **kwargs):
+    if execute not in connection.execute_wrappers:
+        connection.execute_wrappers.append(execute)
+
+
+def get_scope(path, query_string, token):
+    return {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': 'GET', 'scheme': 'http', 'path': path,
+        'raw_path': path.encode(), 'query_string': query_string.encode(),
+        'root_path': '', 'client': ('127.0.0.1', 0),
+        'server': ('testserver', 80),
+        'headers': [(b'host', b'testserver'),
+                    (b'authorization', b'Bearer ' + token.encode())],
+    }
+
+
+async def request(application, scope):
+    received = False
+    disconnect = asyncio.Event()
+    statuses = []
+
+    async def receive():
+        nonlocal received
+        if not received:
+            received = True
+            return {'type': 'http.request', 'body': b''}
+        await disconnect.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            statuses.append(message['status'])
+
+    start = time.perf_counter()
+    await application(scope, receive, send)
+    disconnect.set()
+    assert statuses == [200], statuses
+    return time.perf_counter() - start
+
+
+async def client(application, scopes, count, latencies):
+    for i in range(count):
+        latencies.append(await request(application, scopes[i % len(scopes)]))
+
+
+async def run(application, scopes, clients, count):
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        client(application, scopes[i:] + scopes[:i], count // clients,
+               latencies)
+        for i in range(clients)])
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return (len(latencies) / elapsed, statistics.median(latencies) * 1000,
+            latencies[int(len(latencies) * 0.95)] * 1000)
+
+
+def main(issues=5000, count=400, latency=2):
+    global query_latency
+    from django.core.handlers.asgi import ASGIHandler
+    from django.db.backends.signals import connection_created
+    from helpdesk.models import Contributor, Issue
+    from rest_framework_simplejwt.tokens import AccessToken
+    from softdesk.asgi import AsyncViewsASGIHandler
+
+    connection_created.connect(connected)
+    with test_database('bench_async_views.sqlite3'):
+        project = seed_project(issues, 1)
+        user = Contributor.objects.get(
+            project=project, permission='manager').user
+        token = str(AccessToken.for_user(user))
+        url = '/api/projects/%s/issues/' % project.pk
+        issue_ids = list(Issue.objects.filter(
+            project=project).values_list('pk', flat=True)[:50])
+        scopes = [get_scope(url, 'page_size=200&ordering=priority', token),
+                  get_scope(url, 'status=a+faire&page_size=200', token)] + [
+            get_scope('%s%s/' % (url, pk), '', token) for pk in issue_ids[:6]]
+        applications = (('sync views', ASGIHandler()),
+                        ('async views', AsyncViewsASGIHandler()))
+
+        print('%-12s %8s %8s %12s %10s %10s' % (
+            'views', 'latency', 'clients', 'requests/s', 'p50 ms', 'p95 ms'))
+        for milliseconds in (0, latency):
+            query_latency = milliseconds / 1000
+            for clients in (1, 8, 32):
+                for label, application in applications:
+                    asyncio.run(run(application, scopes, clients, clients))
+                    rate, p50, p95 = asyncio.run(
+                        run(application, scopes, clients, count))
+                    print('%-12s %6d ms %8d %12.0f %10.1f %10.1f' % (
+                        label, milliseconds, clients, rate, p50, p95))
+
+
+if __name__ == '__main__':
+    setup()
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,34 @@
+"""
+Compares the polls of the issue list of a project, answered in full and
+with a 304 when the client sends the ETag of its last response.
+
+    python -m benchmarks.bench_conditional [issues] [polls]
+"""
+import sys
+
+from benchmarks.utils import seed_project, setup, test_database, timer
+
+
+def main(issues=1000, polls=200):
+    from rest_framework.test import APIClient
+    from helpdesk.models import Contributor
+
+    with test_database():
+        project = seed_project(issues, 0)
+        manager = Contributor.objects.select_related('user').get(
+            project=project, permission='manager')
+        client = APIClient()
+        client.force_authenticate(manager.user)
+        url = '/api/projects/%s/issues/' % project.pk
+        etag = client.get(url)['ETag']
+        polls_headers = (('full response', {}),
+                         ('If-None-Match', {'HTTP_IF_NONE_MATCH': etag}))
+        for label, headers in polls_headers:
+            with timer('%s x %d' % (label, polls)):
+                for i in range(polls):
+                    client.get(url, **headers)
+
+
+if __name__ == '__main__':
+    setup()
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,51 @@
+"""
+Compares the deletion of a large project, row by row as ProjectViewSet used
+to do it, and with helpdesk.deletion.delete_project.
+
+    python -m benchmarks.bench_delete [issues] [comments per issue]
+"""
+import sys
+
+from benchmarks.utils import seed_project, setup, test_database, timer
+
+
+def delete_row_by_row(project):
+    from helpdesk.models import Comment, Contributor, Issue
+
+    issues = Issue.objects.filter(project=project.pk)
+    contributors = Contributor.objects.filter(project=project.pk)
+    project.delete()
+    for issue in issues:
+        for comment in Comment.objects.filter(issue=issue.pk):
+            comment.delete()
+        issue.delete()
+    for contributor in contributors:
+        contributor.delete()
+
+
+def main(issues=2000, comments_per_issue=10):
+    from django.db import connection
+    from helpdesk.deletion import delete_project
+
+    rows = issues * (comments_per_issue + 1)
+    with test_database():
+        for label, delete in (('row by row', delete_row_by_row),
+                              ('delete_project', delete_project)):
+            project = seed_project(issues, comments_per_issue)
+            # Counted by a wrapper rather than from the query log, which
+            # only keeps the last 9000 queries
+            queries = []
+
+            def count(execute, sql, params, many, context):
+                queries.append(sql)
+                return execute(sql, params, many, context)
+
+            with connection.execute_wrapper(count):
+                with timer(label, rows):
+                    delete(project)
+            print('%-40s %10d queries' % ('', len(queries)))
+
+
+if __name__ == '__main__':
+    setup()
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,128 @@
+"""
+Holds idle event streams of a project on one event loop, and measures their
+memory, the fan-out of an event to all of them, and the buffer of a stream
+whose client does not read its events.
+
+    python -m benchmarks.bench_events [streams] [events]
+"""
+import asyncio
+import gc
+import sys
+import time
+import tracemalloc
+
+from benchmarks.utils import seed_project, setup, test_database, timer
+
+
+class IdleClient:
+
+    def __init__(self, scope, slow=False):
+        self.scope = scope
+        self.slow = slow
+        self.received = 0
+        self.started = asyncio.Event()
+        self.disconnect = asyncio.Event()
+        self.event = asyncio.Event()
+
+    async def receive(self):
+        await self.disconnect.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(self, message):
+        if message['type'] == 'http.response.start':
+            return
+        if self.started.is_set():
+            if self.slow:
+                # Never reads its events
+                await asyncio.Event().wait()
+            self.received += 1
+            self.event.set()
+        self.started.set()
+
+
+async def run(scope, streams, events_count):
+    from helpdesk import events
+    from helpdesk.stream import EventStream
+
+    application = EventStream()
+    backend = events.get_backend()
+    channel = events.project_channel(1)
+    loop = asyncio.get_running_loop()
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    clients = [IdleClient(scope) for i in range(streams)]
+    start = time.perf_counter()
+    tasks = [asyncio.ensure_future(
+        application(scope, client.receive, client.send))
+        for client in clients]
+    for client in clients:
+        await client.started.wait()
+    print('%-40s %10.3f s' % ('open %d streams' % streams,
+                              time.perf_counter() - start))
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    print('%-40s %10.0f KiB' % ('memory of the streams', used / 1024))
+    print('%-40s %10.0f B' % ('memory per stream', used / streams))
+    print('%-40s %10d' % ('subscriptions', backend.count()))
+
+    for i in range(events_count):
+        for client in clients:
+            client.event.clear()
+        message = events.encode('test', {'i': i})
+        start = time.perf_counter()
+        # Published from a worker thread, as by the views
+        await loop.run_in_executor(None, backend.publish, channel, message)
+        for client in clients:
+            await client.event.wait()
+        print('%-40s %10.3f ms' % ('fan-out of event %d' % i,
+                                   (time.perf_counter() - start) * 1000))
+
+    slow = IdleClient(scope, slow=True)
+    slow_task = asyncio.ensure_future(
+        application(scope, slow.receive, slow.send))
+    await slow.started.wait()
+    slow_message = events.encode('test', {'i': 0})
+    # Delivered until the buffer of the slow stream is full
+    for i in range(events.get_queue_size() * 10):
+        backend.publish(channel, slow_message)
+        await asyncio.sleep(0)
+    subscription = [subscription for subscription in backend.subscriptions[
+        channel] if subscription.overflowed]
+    print('%-40s %10d' % ('overflowed streams', len(subscription)))
+    print('%-40s %10d' % ('buffered events of the slow stream', max(
+        [len(subscription.messages) for subscription in subscription],
+        default=0)))
+
+    with timer('close %d streams' % (streams + 1)):
+        for client in clients + [slow]:
+            client.disconnect.set()
+        await asyncio.gather(*tasks)
+        slow_task.cancel()
+        await asyncio.gather(slow_task, return_exceptions=True)
+    print('%-40s %10d' % ('subscriptions', backend.count()))
+
+
+def main(streams=5000, events_count=5):
+    from django.conf import settings
+    from helpdesk.models import Contributor
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    # Only the explicit events are sent to the streams
+    settings.HELPDESK_EVENTS_HEARTBEAT = 3600
+    with test_database('bench_events.sqlite3'):
+        project = seed_project(0, 0, 1)
+        user = Contributor.objects.get(project=project).user
+        token = str(AccessToken.for_user(user))
+        scope = {'type': 'http', 'method': 'GET', 'path': '/api/events/',
+                 'query_string': b'',
+                 'headers': [(b'authorization',
+                              b'Bearer ' + token.encode())]}
+        asyncio.run(run(scope, streams, events_count))
+
+
+if __name__ == '__main__':
+    setup()
+    main(*[int(arg) for arg in sys.argv[1:]])
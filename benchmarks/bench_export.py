@@ -0,0 +1,44 @@
+"""
+Measures the throughput of the project export, in rows (contributors, issues
+and comments) per second, and its peak memory, which should not depend on
+the size of the project.
+
+    python -m benchmarks.bench_export [issues] [comments per issue]
+"""
+import sys
+import tracemalloc
+
+from benchmarks.utils import seed_project, setup, test_database, timer
+
+
+def consume(chunks):
+    size = 0
+    for chunk in chunks:
+        size += len(chunk)
+    return size
+
+
+def main(issues=10000, comments_per_issue=10):
+    from helpdesk.export import export
+
+    with test_database('bench_export.sqlite3'):
+        for scale in (issues // 10, issues):
+            project = seed_project(scale, comments_per_issue)
+            rows = 1 + 10 + scale * (comments_per_issue + 1)
+            print('%d rows' % rows)
+            for format in ('ndjson', 'json'):
+                for chunk_size in (100, 500, 2000):
+                    with timer('%s, chunks of %d' % (format, chunk_size),
+                               rows):
+                        size = consume(export(project, format, chunk_size))
+                    tracemalloc.start()
+                    consume(export(project, format, chunk_size))
+                    current, peak = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+                    print('%-40s %10.1f MB  %8.0f KB peak' % (
+                        '', size / 2 ** 20, peak / 2 ** 10))
+
+
+if __name__ == '__main__':
+    setup()
+    main(*[int(arg) for arg in sys.argv[1:]])
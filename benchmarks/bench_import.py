@@ -0,0 +1,66 @@
+"""
+Measures the throughput of the project import, in records per second, from
+a generated NDJSON file.
+
+    python -m benchmarks.bench_import [issues] [comments per issue]
+"""
+import json
+import os
+import sys
+import tempfile
+
+from benchmarks.utils import setup, test_database, timer
+
+
+def write_records(path, issues, comments_per_issue, users):
+    with open(path, 'w') as file:
+        def write(kind, data):
+            file.write(json.dumps({kind: data}) + '\n')
+
+        write('project', {'title': 'benchmark', 'description': 'benchmark',
+                          'type': 'projet'})
+        for i in range(users):
+            write('contributor', {'user': 'bench%d' % i,
+                                  'permission': 'contributeur',
+                                  'role': 'role'})
+        comment_id = 0
+        for i in range(issues):
+            write('issue', {
+                'id': i, 'title': 'issue %d' % i,
+                'desc': 'description of the issue %d' % i, 'tag': 'bug',
+                'priority': 'moyenne', 'status': 'a faire',
+                'author': 'bench%d' % (i % users),
+                'assignee': 'bench%d' % ((i + 1) % users),
+                'created_time': '2020-01-01T00:00:00+00:00',
+                'updated_time': '2020-01-02T00:00:00+00:00',
+                'status_time': '2020-01-02T00:00:00+00:00'})
+            for j in range(comments_per_issue):
+                write('comment', {
+                    'id': comment_id, 'issue_id': i,
+                    'description': 'comment %d of the issue %d' % (j, i),
+                    'author': 'bench%d' % (j % users),
+                    'created_time': '2020-01-01T00:00:00+00:00'})
+                comment_id += 1
+
+
+def main(issues=10000, comments_per_issue=10, users=10):
+    from helpdesk.imports import ProjectImporter, read_ndjson
+    from helpdesk.models import ImportRun
+
+    records = 1 + users + issues * (comments_per_issue + 1)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'project.ndjson')
+        write_records(path, issues, comments_per_issue, users)
+        with test_database('bench_import.sqlite3'):
+            for batch_size in (1000, 5000):
+                run = ImportRun.objects.create(source=path)
+                importer = ProjectImporter(run, batch_size,
+                                           create_users=True)
+                with open(path) as file:
+                    with timer('batches of %d' % batch_size, records):
+                        importer.import_records(read_ndjson(file))
+
+
+if __name__ == '__main__':
+    setup()
+    main(*[int(arg) for arg in sys.argv[1:]])
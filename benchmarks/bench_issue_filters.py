@@ -0,0 +1,65 @@
+"""
+Times filtered and sorted issue lists on projects of growing size, to check
+that the latency of a page does not depend on the number of issues.
+
+    python -m benchmarks.bench_issue_filters [requests per query]
+"""
+import sys
+
+from benchmarks.utils import seed_project, setup, test_database, timer
+
+SIZES = (1000, 10000, 50000)
+
+QUERIES = (
+    '',
+    '?ordering=-created_time',
+    '?status=en cours',
+    '?priority=elevee&ordering=priority',
+    '?assignee=%(assignee)s&ordering=-priority',
+    '?tag=tache&status=a faire&ordering=-created_time',
+)
+
+
+def vary_issues(project):
+    """
+    Spreads the issues of the project over every status, priority and tag.
+    """
+    from helpdesk.models import (PRIORITY_CHOICES, PRIORITY_RANKS,
+                                 STATUS_CHOICES, TAG_CHOICES, Issue)
+
+    issues = Issue.objects.filter(project=project.pk)
+    for field, choices in (('status', STATUS_CHOICES),
+                           ('priority', PRIORITY_CHOICES),
+                           ('tag', TAG_CHOICES)):
+        for i, (value, label) in enumerate(choices):
+            values = {field: value}
+            if field == 'priority':
+                values['priority_rank'] = PRIORITY_RANKS[value]
+            issues.extra(where=['id %% %s = %s'],
+                         params=[len(choices), i]).update(**values)
+
+
+def main(repeat=50):
+    from rest_framework.test import APIClient
+    from helpdesk.models import Contributor
+
+    with test_database():
+        for size in SIZES:
+            project = seed_project(size, 0)
+            vary_issues(project)
+            manager = Contributor.objects.select_related('user').get(
+                project=project, permission='manager')
+            client = APIClient()
+            client.force_authenticate(manager.user)
+            print('%d issues' % size)
+            for query in QUERIES:
+                query = query % {'assignee': manager.user.username}
+                url = '/api/projects/%s/issues/%s' % (project.pk, query)
+                with timer('  %s x %d' % (query or '(none)', repeat)):
+                    for i in range(repeat):
+                        assert client.get(url).status_code == 200
+
+
+if __name__ == '__main__':
+    setup()
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,57 @@
+"""
+Compares the renderers of the API on pages of issues and comments: the size
+of the payloads, raw and gzipped, and the time to encode them.
+
+    python -m benchmarks.bench_renderers [issues] [comments per issue]
+"""
+import gzip
+import sys
+import time
+
+from benchmarks.utils import seed_project, setup, test_database
+
+
+def measure(renderer, data, repeat=20):
+    start = time.perf_counter()
+    for i in range(repeat):
+        content = renderer.render(data)
+    elapsed = (time.perf_counter() - start) / repeat
+    return content, elapsed
+
+
+def main(issues=1000, comments_per_issue=10):
+    from helpdesk.models import Comment, Issue
+    from helpdesk.renderers import ColumnarJSONRenderer, MessagePackRenderer
+    from helpdesk.serializers import CommentSerializer, IssueSerializer
+    from rest_framework.renderers import JSONRenderer
+
+    renderers = (JSONRenderer(), MessagePackRenderer(),
+                 ColumnarJSONRenderer())
+    with test_database():
+        project = seed_project(issues, comments_per_issue)
+        pages = {
+            'issues': IssueSerializer(
+                Issue.objects.filter(project=project), many=True).data,
+            'comments': CommentSerializer(
+                Comment.objects.filter(issue__project=project), many=True
+            ).data,
+        }
+        for name, items in pages.items():
+            for size in (100, len(items)):
+                data = {'count': len(items), 'next': None, 'previous': None,
+                        'results': list(items[:size])}
+                print('%d %s' % (size, name))
+                reference = None
+                for renderer in renderers:
+                    content, elapsed = measure(renderer, data)
+                    reference = reference or (len(content), elapsed)
+                    print('%-14s %10d B %9d B gzip %5.0f%% %9.2f ms %5.2fx'
+                          % (renderer.format, len(content),
+                             len(gzip.compress(content)),
+                             100 * len(content) / reference[0],
+                             elapsed * 1000, reference[1] / elapsed))
+
+
+if __name__ == '__main__':
+    setup()
+    main(*[int(arg) for arg in sys.argv[1:]])
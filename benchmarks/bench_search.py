@@ -0,0 +1,79 @@
+"""
+Times full-text searches on a project of a million comments, whose words
+are drawn from a vocabulary with a Zipf distribution, for terms of
+decreasing rarity.
+
+    python -m benchmarks.bench_search [issues] [comments per issue]
+"""
+import random
+import string
+import sys
+from itertools import accumulate
+
+from benchmarks.utils import seed_project, setup, test_database, timer
+
+VOCABULARY = 20000
+WORDS = 12
+
+
+def make_vocabulary(rng):
+    words = set()
+    while len(words) < VOCABULARY:
+        words.add(''.join(rng.choice(string.ascii_lowercase)
+                          for i in range(rng.randint(4, 10))))
+    return sorted(words)
+
+
+def seed_text(project, rng, vocabulary):
+    """
+    Replaces the text of the comments of the project with random words.
+    """
+    from django.db import connection
+    from helpdesk.models import Comment
+
+    weights = list(accumulate(1 / (rank + 1)
+                              for rank in range(len(vocabulary))))
+    comments = Comment.objects.filter(issue__project=project.pk)
+    with connection.cursor() as cursor:
+        for pks in iter_chunks(comments.values_list('pk', flat=True), 5000):
+            cursor.executemany(
+                'UPDATE helpdesk_comment SET description = %s WHERE id = %s',
+                [(' '.join(rng.choices(vocabulary, cum_weights=weights,
+                                       k=WORDS)), pk)
+                 for pk in pks])
+
+
+def iter_chunks(queryset, size):
+    pks = list(queryset)
+    for i in range(0, len(pks), size):
+        yield pks[i:i + size]
+
+
+def main(issues=20000, comments_per_issue=50, repeat=20):
+    from django.db import transaction
+    from helpdesk import search
+    from helpdesk.models import Comment, Issue
+
+    rng = random.Random(0)
+    vocabulary = make_vocabulary(rng)
+    with test_database('bench_search.sqlite3'):
+        rows = issues * (comments_per_issue + 1)
+        with timer('seed', rows), transaction.atomic():
+            project = seed_project(issues, comments_per_issue)
+            seed_text(project, rng, vocabulary)
+        with timer('rebuild_search_index', rows), transaction.atomic():
+            search.rebuild(Issue.objects.all(), Comment.objects.all())
+        for rank in (10000, 1000, 100, 10, 0):
+            query = vocabulary[rank]
+            with timer('q=%s (word rank %d) x %d' % (query, rank, repeat)):
+                for i in range(repeat):
+                    search.search([query], [project.pk])[0:20]
+        query = [vocabulary[100], vocabulary[200]]
+        with timer('q=%s x %d' % (' '.join(query), repeat)):
+            for i in range(repeat):
+                search.search(query, [project.pk])[0:20]
+
+
+if __name__ == '__main__':
+    setup()
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,111 @@
+"""
+Compares the write concurrency of the SQLite profiles: threads acting as
+the workers of a deployment each run requests creating a comment and
+reading the issue it comments, while other threads only read the issues.
+
+The default journal, fully synced, with a connection opened by each request,
+is compared to the profile of softdesk.settings: the write-ahead log synced
+at checkpoints, with persistent connections.
+
+    python -m benchmarks.bench_writes [writers] [readers] [requests]
+"""
+import statistics
+import sys
+import threading
+import time
+
+from benchmarks.utils import seed_project, setup, test_database
+
+
+# The journal mode is set on the database file, which the other connections
+# can not do while one of them is open
+PROFILES = (
+    ('journal, new connections', 'DELETE',
+     {'synchronous': 'FULL'}, False),
+    ('WAL, new connections', 'WAL',
+     {'synchronous': 'NORMAL', 'busy_timeout': 5000}, False),
+    ('WAL, persistent connections', 'WAL',
+     {'synchronous': 'NORMAL', 'busy_timeout': 5000,
+      'mmap_size': 256 * 1024 * 1024}, True),
+)
+
+
+def worker(requests, count, persistent, write, latencies, errors):
+    from django.db import OperationalError, connection, transaction
+    from helpdesk.models import Comment, Issue
+
+    for i in range(count):
+        issue_id, user_id = requests[i % len(requests)]
+        start = time.perf_counter()
+        try:
+            if write:
+                with transaction.atomic():
+                    Comment.objects.create(description='comment',
+                                           issue_id=issue_id,
+                                           author_id=user_id)
+            list(Issue.objects.filter(pk=issue_id))
+            list(Comment.objects.filter(issue_id=issue_id)[:20])
+        except OperationalError:
+            # The database is locked
+            errors.append(1)
+        else:
+            latencies.append(time.perf_counter() - start)
+        if not persistent:
+            connection.close()
+    connection.close()
+
+
+def run(requests, writers, readers, count, persistent):
+    write_latencies, read_latencies, errors = [], [], []
+    threads = [
+        threading.Thread(target=worker, args=(
+            requests[i:] + requests[:i], count, persistent, True,
+            write_latencies, errors))
+        for i in range(writers)] + [
+        threading.Thread(target=worker, args=(
+            requests[i:] + requests[:i], count, persistent, False,
+            read_latencies, errors))
+        for i in range(readers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    write_latencies.sort()
+    read_latencies.sort()
+    return (len(write_latencies) / elapsed,
+            write_latencies[int(len(write_latencies) * 0.95)] * 1000
+            if write_latencies else 0,
+            statistics.median(read_latencies) * 1000 if readers else 0,
+            len(errors))
+
+
+def main(writers=8, readers=4, count=200):
+    from django.db import connection
+    from django.test.utils import override_settings
+    from helpdesk.models import Issue
+
+    with test_database('bench_writes.sqlite3'):
+        project = seed_project(2000, 2)
+        requests = list(Issue.objects.filter(project=project).values_list(
+            'pk', 'author_id')[:100])
+        connection.close()
+
+        print('%-30s %12s %10s %14s %8s' % (
+            'profile', 'writes/s', 'p95 ms', 'read p50 ms', 'errors'))
+        for label, journal_mode, pragmas, persistent in PROFILES:
+            with override_settings(SOFTDESK_SQLITE_PRAGMAS=pragmas):
+                with connection.cursor() as cursor:
+                    cursor.execute('PRAGMA journal_mode = %s' % journal_mode)
+                connection.close()
+                rate, p95, read_p50, errors = run(
+                    requests, writers, readers, count, persistent)
+                print('%-30s %12.0f %10.1f %14.1f %8d' % (
+                    label, rate, p95, read_p50, errors))
+        connection.close()
+
+
+if __name__ == '__main__':
+    setup()
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,87 @@
+"""
+Helpers shared by the benchmarks, which run against a throwaway test
+database, e.g.:
+
+    python -m benchmarks.bench_delete
+"""
+import os
+import time
+from contextlib import contextmanager
+
+
+def setup():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'softdesk.settings')
+    import django
+    django.setup()
+
+
+@contextmanager
+def test_database(name=None):
+    """
+    Creates the test database, in memory unless a file name is given.
+    """
+    from django.db import connection
+    from django.test.utils import (setup_test_environment,
+                                   teardown_test_environment)
+
+    setup_test_environment()
+    if name is not None:
+        connection.settings_dict['TEST']['NAME'] = name
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+@contextmanager
+def timer(label, rows=None):
+    """
+    Prints the time spent in the block, and the throughput if a number of
+    rows is given.
+    """
+    start = time.perf_counter()
+    yield
+    elapsed = time.perf_counter() - start
+    line = '%-40s %10.3f s' % (label, elapsed)
+    if rows:
+        line += '  %12.0f rows/s' % (rows / elapsed)
+    print(line)
+
+
+def seed_project(issues=1000, comments_per_issue=10, users=10):
+    """
+    Creates a project with its contributors, issues and comments, using bulk
+    inserts, and returns it. The bulk inserts send no signal, so the comment
+    counts of the issues are set with them.
+    """
+    from django.contrib.auth.models import User
+    from helpdesk.models import Comment, Contributor, Issue, Project
+
+    project = Project.objects.create(
+        title='benchmark', description='benchmark', type='projet')
+    first_user = User.objects.count()
+    User.objects.bulk_create([
+        User(username='bench%d' % (first_user + i)) for i in range(users)])
+    users = list(User.objects.order_by('-pk')[:users])
+    Contributor.objects.bulk_create([
+        Contributor(user=user, project=project,
+                    permission='manager' if i == 0 else 'contributeur',
+                    role='role')
+        for i, user in enumerate(users)])
+    Issue.objects.bulk_create([
+        Issue(title='issue %d' % i, desc='description of the issue %d' % i,
+              tag='bug', priority='moyenne', project=project,
+              status='a faire', author=users[i % len(users)],
+              assignee=users[(i + 1) % len(users)],
+              comment_count=comments_per_issue)
+        for i in range(issues)], batch_size=500)
+    issue_ids = Issue.objects.filter(project=project).values_list(
+        'pk', flat=True)
+    Comment.objects.bulk_create([
+        Comment(description='comment %d' % i, issue_id=issue_id,
+                author=users[i % len(users)])
+        for issue_id in issue_ids
+        for i in range(comments_per_issue)], batch_size=500)
+    return project
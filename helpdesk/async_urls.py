@@ -0,0 +1,12 @@
+from django.urls import path, include
+
+from .asynchronous import async_urlpatterns
+from .urls import router, project_router, issue_router
+
+
+# The urls of helpdesk.urls, with the async views of the viewsets
+urlpatterns = [
+    path('', include(async_urlpatterns(router.urls))),
+    path('', include(async_urlpatterns(project_router.urls))),
+    path('', include(async_urlpatterns(issue_router.urls))),
+]
@@ -0,0 +1,123 @@
+"""
+Async views of the viewsets, served by softdesk.asgi.
+
+Under ASGI, Django runs every sync view in a single thread, so that a slow
+read blocks all the other requests. The viewsets implement their read
+actions as coroutines too, e.g. alist for list, which run the permission
+checks and the queries in a pool of threads, while the other actions and the
+WSGI deployments keep the sync views.
+"""
+from functools import update_wrapper
+
+from asgiref.sync import sync_to_async
+from django.urls import URLPattern
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.generics import get_object_or_404
+
+from .pool import database_sync_to_async
+
+
+aget_object_or_404 = database_sync_to_async(get_object_or_404)
+
+
+class AsyncViewSetMixin:
+    """
+    Serves the actions of a viewset which have a coroutine, named after the
+    action with an "a" prefix, with an async view.
+    """
+
+    @classmethod
+    def as_async_view(cls, view):
+        """
+        Returns the async view of the sync view of the viewset built by
+        as_view. The actions without a coroutine are delegated to the sync
+        view, run in the thread of the sync views.
+        """
+        sync_view = sync_to_async(view)
+
+        async def async_view(request, *args, **kwargs):
+            actions = view.actions
+            action = actions.get(request.method.lower()) \
+                or request.method == 'HEAD' and actions.get('get')
+            if not action or not hasattr(cls, 'a' + action):
+                return await sync_view(request, *args, **kwargs)
+
+            self = cls(**view.initkwargs)
+            self.action_map = actions
+            self.handler = getattr(self, 'a' + action)
+            self.request = request
+            self.args = args
+            self.kwargs = kwargs
+            return await self.adispatch(request, *args, **kwargs)
+
+        # Copies csrf_exempt too, which would wrap the coroutine in Django 3.1
+        return update_wrapper(async_view, view)
+
+    async def adispatch(self, request, *args, **kwargs):
+        """
+        Async dispatch: the authentication, which may query the user, runs
+        in the thread pool, as well as the rendering of the response.
+        """
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await database_sync_to_async(self.initial)(
+                request, *args, **kwargs)
+            response = await self.handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(
+            request, response, *args, **kwargs)
+        return await sync_to_async(self.response.render,
+                                   thread_sensitive=False)()
+
+    async def acheck_object_permissions(self, request, obj):
+        """
+        Async check_object_permissions, awaiting the permissions which have
+        an async check.
+        """
+        for permission in self.get_permissions():
+            check = getattr(permission, 'ahas_object_permission', None)
+            if check is not None:
+                allowed = await check(request, self, obj)
+            else:
+                allowed = permission.has_object_permission(
+                    request, self, obj)
+            if not allowed:
+                self.permission_denied(
+                    request,
+                    message=getattr(permission, 'message', None),
+                    code=getattr(permission, 'code', None)
+                )
+
+    async def acheck_read_permissions(self, request, project, queryset):
+        """
+        Async helpdesk.views.check_read_permissions.
+        """
+        try:
+            await self.acheck_object_permissions(request, project)
+        except PermissionDenied:
+            await aget_object_or_404(queryset)
+            raise
+
+
+def async_urlpatterns(urlpatterns):
+    """
+    Returns the url patterns of a router, with the async views of the
+    viewsets which have some.
+    """
+    patterns = []
+    for pattern in urlpatterns:
+        cls = getattr(pattern, 'callback', None) and getattr(
+            pattern.callback, 'cls', None)
+        if isinstance(cls, type) and issubclass(cls, AsyncViewSetMixin):
+            pattern = URLPattern(
+                pattern.pattern, cls.as_async_view(pattern.callback),
+                pattern.default_args, pattern.name)
+        patterns.append(pattern)
+    return patterns
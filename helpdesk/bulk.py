@@ -0,0 +1,111 @@
+from django.conf import settings
+from django.db import NotSupportedError, connection
+from django.db.models import DateTimeField
+from rest_framework import serializers, status
+from rest_framework.response import Response
+
+
+def get_max_items():
+    return getattr(settings, 'HELPDESK_BULK_MAX_ITEMS', 1000)
+
+
+def validate_items(data):
+    """
+    Checks that the data of a bulk request is a list of at most
+    HELPDESK_BULK_MAX_ITEMS items.
+    """
+    if not isinstance(data, list):
+        raise serializers.ValidationError(
+            'Expected a list of items but got type "%s".'
+            % type(data).__name__)
+    if len(data) > get_max_items():
+        raise serializers.ValidationError(
+            'Ensure this list has no more than %s items.' % get_max_items())
+    return data
+
+
+def bulk_create(queryset, objs, batch_size=500):
+    """
+    Inserts the objects with batched statements and sets their primary key.
+    Must be called within a transaction.
+
+    Backends which can not return the ids of the inserted rows (SQLite with
+    Django < 4.0) get them from the last rows of the queryset, which are the
+    ones just inserted since the transaction holds the write lock.
+    """
+    assert connection.in_atomic_block
+    queryset.model.objects.bulk_create(objs, batch_size=batch_size)
+    if objs and objs[0].pk is None:
+        pks = list(queryset.order_by('-pk').values_list(
+            'pk', flat=True)[:len(objs)])
+        for obj, pk in zip(objs, reversed(pks)):
+            obj.pk = pk
+    return objs
+
+
+def insert_rows(model, fields, rows):
+    """
+    Inserts rows, tuples of the values of the fields of a model, with
+    batched statements, and returns their primary keys. Must be called
+    within a transaction.
+
+    Much faster than bulk_create for large imports, as no model instance is
+    built and only the datetimes are prepared for the database, so the other
+    values must be accepted as they are by the database driver.
+    """
+    assert connection.in_atomic_block
+    fields = [model._meta.get_field(name) for name in fields]
+    datetimes = [i for i, field in enumerate(fields)
+                 if isinstance(field, DateTimeField)]
+    adapt = connection.ops.adapt_datetimefield_value
+    returning = connection.features.can_return_rows_from_bulk_insert
+    if not returning and connection.vendor != 'sqlite':
+        raise NotSupportedError(
+            'insert_rows needs the ids of the inserted rows.')
+    batch_size = connection.ops.bulk_batch_size(fields, rows)
+    table = connection.ops.quote_name(model._meta.db_table)
+    pk_column = connection.ops.quote_name(model._meta.pk.column)
+    columns = ', '.join(connection.ops.quote_name(field.column)
+                        for field in fields)
+    placeholders = '(%s)' % ', '.join(['%s'] * len(fields))
+    pks = []
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            params = []
+            for row in batch:
+                if datetimes:
+                    row = list(row)
+                    for i in datetimes:
+                        row[i] = adapt(row[i])
+                params.extend(row)
+            sql = 'INSERT INTO %s (%s) VALUES %s' % (
+                table, columns, ', '.join([placeholders] * len(batch)))
+            if returning:
+                cursor.execute(sql + ' RETURNING %s' % pk_column, params)
+                pks.extend(pk for pk, in cursor.fetchall())
+            else:
+                # SQLite (with Django < 4.0) numbers the rows of a statement
+                # after the last one of the table, since the transaction
+                # holds the write lock
+                cursor.execute(sql, params)
+                last = cursor.lastrowid
+                pks.extend(range(last - len(batch) + 1, last + 1))
+    return pks
+
+
+def bulk_response(results, success):
+    """
+    Returns the response of a bulk request from the (status code, data)
+    results of its items: the success status if all the items succeeded,
+    400 if they all failed and 207 otherwise.
+    """
+    codes = {code for code, data in results}
+    if codes <= {success}:
+        code = success
+    elif success in codes:
+        code = status.HTTP_207_MULTI_STATUS
+    else:
+        code = status.HTTP_400_BAD_REQUEST
+    return Response([{'status': code, 'data': data}
+                     for code, data in results], status=code)
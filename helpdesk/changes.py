@@ -0,0 +1,64 @@
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import permissions
+
+from .bulk import insert_rows
+from .conditional import bump_version
+from .models import Change, Comment, Contributor, Issue, Project
+
+
+def get_target(instance):
+    """
+    Returns the model name, project id and issue id of a changed object.
+    """
+    if isinstance(instance, Project):
+        return 'project', instance.pk, None
+    elif isinstance(instance, Issue):
+        return 'issue', instance.project_id, instance.pk
+    elif isinstance(instance, Comment):
+        return 'comment', instance.issue.project_id, instance.issue_id
+    elif isinstance(instance, Contributor):
+        return 'contributor', instance.project_id, None
+
+
+def record(project_id, model, action, objects):
+    """
+    Records the changes of (object id, issue id) objects of a project, with
+    the versions of the project they lead to as sequence numbers.
+
+    The project update serializes the changes of a project, so that the
+    changes are committed in the order of their sequence numbers, and a
+    client reading the changes since the last one it has seen misses none.
+    """
+    if not objects:
+        return
+    with transaction.atomic():
+        version = bump_version(project_id, len(objects))
+        if version is None:
+            return
+        first = version - len(objects) + 1
+        # Inserted without building the changes, which may be as many as the
+        # rows of a bulk request or an import
+        now = timezone.now()
+        insert_rows(Change, ('project', 'seq', 'model', 'object_id',
+                             'issue_id', 'action', 'time'), [
+            (project_id, first + i, model, object_id, issue_id, action, now)
+            for i, (object_id, issue_id) in enumerate(objects)])
+
+
+def record_instance(instance, action):
+    model, project_id, issue_id = get_target(instance)
+    record(project_id, model, action, [(instance.pk, issue_id)])
+
+
+class AtomicWritesMixin:
+    """
+    Runs the unsafe requests of a viewset in a transaction, so that the
+    changes they make are recorded in the same transaction.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method in permissions.SAFE_METHODS:
+            return super().dispatch(request, *args, **kwargs)
+        with transaction.atomic():
+            return super().dispatch(request, *args, **kwargs)
@@ -0,0 +1,98 @@
+"""
+Conditional GET of the helpdesk resources.
+
+Every change of a project, or of its issues, comments and contributors,
+bumps the version and the updated_time of the project. The validators of a
+response are derived from them, so that a request whose validators match is
+answered with a 304 after the permission checks, without fetching or
+serializing the resources.
+"""
+import hashlib
+
+from django.db.models import F
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import Project
+
+
+def bump_version(project_id, count=1):
+    """
+    Marks a project as changed by a number of changes, and returns its new
+    version, or None if it does not exist. Must be called within the
+    transaction of the changes, see helpdesk.changes.record.
+    """
+    updated = Project.objects.filter(pk=project_id).update(
+        version=F('version') + count, updated_time=timezone.now())
+    if not updated:
+        return None
+    # The update locks the project until the end of the transaction
+    return Project.objects.filter(pk=project_id).values_list(
+        'version', flat=True).get()
+
+
+class ConditionalMixin:
+    """
+    Sets the ETag and Last-Modified of the responses of a viewset from the
+    state of a project, and answers the matching requests with a 304.
+    """
+
+    def get_etag(self, request, state):
+        """
+        Strong ETag of the representation of the requested resource when
+        the project is in the given state, e.g. its version.
+        """
+        key = '%s:%s:%s:%s' % (state, request.user.pk, request.get_full_path(),
+                               request.accepted_media_type)
+        return '"%s"' % hashlib.md5(key.encode()).hexdigest()
+
+    def not_modified(self, request, state, last_modified, exists=True):
+        """
+        Returns a 304 response if the validators of the request match the
+        state of the project, and keeps them for the response otherwise.
+
+        Unless the resource is known to exist, only its ETags match, which
+        it had to exist in the state to be given, rather than * or any
+        If-Modified-Since date.
+        """
+        etag = self.get_etag(request, state)
+        self.validators = {'ETag': etag}
+        if last_modified is not None:
+            self.validators['Last-Modified'] = http_date(
+                last_modified.timestamp())
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match is not None:
+            etags = parse_etags(if_none_match)
+            modified = etag not in etags and (
+                not exists or '*' not in etags)
+        elif last_modified is None or not exists:
+            modified = True
+        else:
+            since = parse_http_date_safe(
+                request.META.get('HTTP_IF_MODIFIED_SINCE'))
+            modified = since is None \
+                or int(last_modified.timestamp()) > since
+        if not modified:
+            return Response(status=status.HTTP_304_NOT_MODIFIED)
+        return None
+
+    def not_modified_project(self, request, project, exists=True):
+        return self.not_modified(
+            request, 'project:%s:%s' % (project.pk, project.version),
+            project.updated_time, exists)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs)
+        validators = getattr(self, 'validators', None)
+        if validators and response.status_code in (
+                status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            for header, value in validators.items():
+                response[header] = value
+        # The representation depends on the negotiated media type, and the
+        # ETag on the user too
+        patch_vary_headers(response, ('Accept', 'Authorization'))
+        return response
@@ -0,0 +1,173 @@
+"""
+Counters of the issues of each project by status, priority and tag, and of
+the comments of each issue, updated in the transactions creating, updating
+and deleting them, so that they are read without counting the issues and
+comments.
+
+The statistics of helpdesk.stats are updated along with the issue counters.
+
+The counters are updated by the signals of the issues and comments, and
+explicitly by the bulk requests, which bypass them. Counters which drifted,
+e.g. after raw updates of the issues, are repaired by the check_counters
+command.
+"""
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+
+from .models import (COUNTED_ISSUE_FIELDS, SAVED_ISSUE_FIELDS, Issue,
+                     IssueCounter, Project)
+from .stats import STATS_FIELDS, StatsDeltas, increment
+
+COUNTED_FIELDS = [field for field, choices in COUNTED_ISSUE_FIELDS]
+
+
+def create_counters(project_id):
+    """
+    Creates the counters of the values of the fields of a new project.
+    """
+    IssueCounter.objects.bulk_create([
+        IssueCounter(project_id=project_id, field=field, value=value)
+        for field, choices in COUNTED_ISSUE_FIELDS
+        for value, label in choices])
+
+
+def get_issue_counts(project):
+    """
+    Returns the issue counts of a project, by field and value, from its
+    counters, prefetched or not.
+    """
+    counts = {field: {value: 0 for value, label in choices}
+              for field, choices in COUNTED_ISSUE_FIELDS}
+    for counter in project.issue_counters.all():
+        counts.setdefault(counter.field, {})[counter.value] = counter.count
+    return counts
+
+
+def get_saved_values(issue):
+    return {field: getattr(issue, field) for field in SAVED_ISSUE_FIELDS}
+
+
+def add(deltas):
+    """
+    Adds the deltas, by project and (field, value), to the counters.
+    """
+    with transaction.atomic():
+        for project_id, project_deltas in deltas.items():
+            for (field, value), delta in project_deltas.items():
+                # The counters of the values outside the choices are created
+                # on their first issue
+                increment(IssueCounter, {'project_id': project_id,
+                                         'field': field, 'value': value},
+                          count=delta)
+
+
+def count_issues(issues, delta=1):
+    """
+    Counts created issues, or deleted ones with a delta of -1, along with
+    their statistics.
+    """
+    deltas = defaultdict(Counter)
+    stats_deltas = StatsDeltas()
+    for issue in issues:
+        values = get_saved_values(issue)
+        for field in COUNTED_FIELDS:
+            deltas[issue.project_id][field, values[field]] += delta
+        stats_deltas.add_issue(values, delta)
+        issue._saved_values = values
+    with transaction.atomic():
+        add(deltas)
+        stats_deltas.save()
+
+
+def count_issue_updates(issues):
+    """
+    Counts the changes of the counted fields of updated issues, from the
+    values they were last saved, or loaded, with.
+    """
+    deltas = defaultdict(Counter)
+    stats_deltas = StatsDeltas()
+    for issue in issues:
+        previous = getattr(issue, '_saved_values', {})
+        values = get_saved_values(issue)
+        previous_project_id = previous.get('project_id', issue.project_id)
+        for field in COUNTED_FIELDS:
+            if field not in previous:
+                # Not loaded, so its change is unknown
+                continue
+            if previous[field] != values[field] \
+                    or previous_project_id != issue.project_id:
+                deltas[previous_project_id][field, previous[field]] -= 1
+                deltas[issue.project_id][field, values[field]] += 1
+        if all(field in previous for field in STATS_FIELDS):
+            stats_deltas.update_issue(previous, values)
+        issue._saved_values = values
+    with transaction.atomic():
+        add(deltas)
+        stats_deltas.save()
+
+
+def count_comments(issue_id, delta=1):
+    """
+    Counts created comments of an issue, or deleted ones with a negative
+    delta. The count does not go below 0 when it drifted, so that the
+    comments can still be deleted, e.g. by the deletion of their issue.
+    """
+    count = F('comment_count') + delta
+    if delta < 0:
+        count = Greatest(count, 0)
+    Issue.objects.filter(pk=issue_id).update(comment_count=count)
+
+
+def check_issue_counters():
+    """
+    Returns the drifted issue counters, as (project id, field, value, count,
+    actual count) tuples, including the missing ones.
+    """
+    actual = Counter()
+    for field in COUNTED_FIELDS:
+        rows = Issue.objects.values_list('project', field).annotate(
+            count=Count('pk')).order_by()
+        for project_id, value, count in rows:
+            actual[project_id, field, value] = count
+    stored = {
+        (project_id, field, value): count
+        for project_id, field, value, count in IssueCounter.objects
+        .values_list('project', 'field', 'value', 'count')}
+    expected = {
+        (project_id, field, value)
+        for project_id in Project.objects.values_list('pk', flat=True)
+        for field, choices in COUNTED_ISSUE_FIELDS
+        for value, label in choices}
+    drifted = []
+    for key in sorted(expected | set(stored) | set(actual)):
+        if stored.get(key) != actual[key]:
+            drifted.append(key + (stored.get(key), actual[key]))
+    return drifted
+
+
+def check_comment_counts():
+    """
+    Returns the drifted comment counts, as (issue id, count, actual count)
+    tuples.
+    """
+    return list(Issue.objects.annotate(
+        actual=Count('comments')).exclude(
+            comment_count=F('actual')).values_list(
+                'pk', 'comment_count', 'actual').order_by('pk'))
+
+
+def repair_issue_counters(drifted):
+    with transaction.atomic():
+        for project_id, field, value, count, actual in drifted:
+            IssueCounter.objects.update_or_create(
+                project_id=project_id, field=field, value=value,
+                defaults={'count': actual})
+
+
+def repair_comment_counts(drifted):
+    with transaction.atomic():
+        for issue_id, count, actual in drifted:
+            Issue.objects.filter(pk=issue_id).update(comment_count=actual)
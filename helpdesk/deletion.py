@@ -0,0 +1,56 @@
+from django.db import connections, transaction
+
+from . import changes, search
+from .models import Comment, Contributor, Issue
+
+
+def raw_delete(model, condition, params):
+    """
+    Deletes the rows of the model matching an SQL condition with one
+    statement, without loading them nor sending their signals.
+    """
+    connection = connections[model.objects.db]
+    with connection.cursor() as cursor:
+        cursor.execute('DELETE FROM %s WHERE %s' % (
+            connection.ops.quote_name(model._meta.db_table), condition),
+            params)
+
+
+def delete_issue(issue):
+    """
+    Deletes an issue and its comments in a single transaction.
+    """
+    with transaction.atomic():
+        # The comments have no dependent rows, so they can be deleted with
+        # one statement. Their search documents are removed along with the
+        # issue ones, by the signal of the issue, but their deletions are
+        # recorded here.
+        comments = Comment.objects.filter(issue=issue.pk)
+        changes.record(issue.project_id, 'comment', 'delete', [
+            (pk, issue.pk) for pk in comments.values_list('pk', flat=True)])
+        raw_delete(Comment, 'issue_id = %s', [issue.pk])
+        issue.delete()
+
+
+def delete_project(project):
+    """
+    Deletes a project with its issues, comments and contributors in a single
+    transaction.
+
+    The issues and comments, which make up most of the rows, are deleted
+    with one statement each, bypassing the Django collector which would
+    load every issue in memory, and their signals, so their search documents
+    are removed explicitly. The counters, statistics and changes updated by
+    these signals belong to the project, and are deleted with it. The
+    contributors are deleted before the project, since the changes recorded
+    by their signals reference it.
+    """
+    with transaction.atomic():
+        search.remove_project(project.pk)
+        issues = connections[Issue.objects.db].ops.quote_name(
+            Issue._meta.db_table)
+        raw_delete(Comment, 'issue_id IN (SELECT id FROM %s '
+                   'WHERE project_id = %%s)' % issues, [project.pk])
+        raw_delete(Issue, 'project_id = %s', [project.pk])
+        Contributor.objects.filter(project=project.pk).delete()
+        project.delete()
@@ -0,0 +1,199 @@
+"""
+Publish/subscribe of the activity of the projects, streamed to the clients
+by helpdesk.stream.
+
+The events are published on channels, one per project and one per user for
+their membership changes, once the transaction of the change is committed.
+They are delivered by the backend of the HELPDESK_EVENTS_BACKEND setting,
+in memory by default, which only reaches the subscribers of the same
+process. Each subscription buffers at most HELPDESK_EVENTS_QUEUE_SIZE
+events: a subscriber that falls behind is marked as overflowed instead of
+buffering without bound, and its stream asks the client to resync from the
+change feed.
+"""
+import asyncio
+import json
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+
+def project_channel(project_id):
+    return 'project:%s' % project_id
+
+
+def user_channel(user_id):
+    return 'user:%s' % user_id
+
+
+def encode(event, data):
+    """
+    Returns the Server-Sent Events message of an event, encoded once for all
+    the subscribers.
+    """
+    return ('event: %s\ndata: %s\n\n' % (
+        event, json.dumps(data, separators=(',', ':')))).encode()
+
+
+class Subscription:
+    """
+    Bounded buffer of the messages of some channels, read by a coroutine of
+    the event loop it was created in.
+    """
+
+    def __init__(self, backend, channels, maxsize):
+        self.backend = backend
+        self.channels = channels
+        self.maxsize = maxsize
+        self.loop = asyncio.get_running_loop()
+        self.messages = []
+        # Future of the reader waiting for a message, kept small for the
+        # idle subscriptions
+        self.waiter = None
+        self.overflowed = False
+
+    def put(self, message):
+        """
+        Buffers a message. Must be called in the event loop of the
+        subscription.
+        """
+        if len(self.messages) >= self.maxsize:
+            self.overflowed = True
+        else:
+            self.messages.append(message)
+        if self.waiter is not None and not self.waiter.done():
+            self.waiter.set_result(None)
+
+    async def get(self, timeout=None):
+        """
+        Returns the buffered messages, waiting at most timeout seconds for
+        one, or an empty list.
+        """
+        if not self.messages and not self.overflowed:
+            self.waiter = self.loop.create_future()
+            try:
+                await asyncio.wait_for(self.waiter, timeout)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                self.waiter = None
+        messages, self.messages = self.messages, []
+        return messages
+
+    def close(self):
+        self.backend.unsubscribe(self)
+
+
+def deliver(subscriptions, message):
+    for subscription in subscriptions:
+        subscription.put(message)
+
+
+class InMemoryBackend:
+    """
+    Delivers the messages to the subscriptions of the process. The messages
+    can be published from any thread.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions = defaultdict(set)
+
+    def subscribe(self, channels, maxsize):
+        subscription = Subscription(self, channels, maxsize)
+        with self.lock:
+            for channel in channels:
+                self.subscriptions[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            for channel in subscription.channels:
+                subscriptions = self.subscriptions.get(channel)
+                if subscriptions is not None:
+                    subscriptions.discard(subscription)
+                    if not subscriptions:
+                        del self.subscriptions[channel]
+
+    def publish(self, channel, message):
+        with self.lock:
+            subscriptions = self.subscriptions.get(channel, ())
+            loops = defaultdict(list)
+            for subscription in subscriptions:
+                loops[subscription.loop].append(subscription)
+        # A single callback per event loop, rather than one per subscription
+        for loop, subscriptions in loops.items():
+            try:
+                loop.call_soon_threadsafe(deliver, subscriptions, message)
+            except RuntimeError:
+                # The event loop of the subscriptions is closed
+                for subscription in subscriptions:
+                    self.unsubscribe(subscription)
+
+    def count(self):
+        with self.lock:
+            return len(set().union(*self.subscriptions.values()))
+
+
+_backend = None
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        _backend = import_string(getattr(
+            settings, 'HELPDESK_EVENTS_BACKEND',
+            'helpdesk.events.InMemoryBackend'))()
+    return _backend
+
+
+def get_queue_size():
+    return getattr(settings, 'HELPDESK_EVENTS_QUEUE_SIZE', 100)
+
+
+def publish(channel, event, data):
+    """
+    Publishes an event once the current transaction is committed, or now
+    outside of a transaction.
+    """
+    message = encode(event, data)
+    transaction.on_commit(lambda: get_backend().publish(channel, message))
+
+
+def publish_issues(issues, created):
+    """
+    Publishes the creation, or the status changes, of issues. The status an
+    issue was loaded with is kept by Issue.from_db.
+    """
+    for issue in issues:
+        if created:
+            publish(project_channel(issue.project_id), 'issue_created', {
+                'project_id': issue.project_id, 'issue_id': issue.pk,
+                'title': issue.title, 'status': issue.status,
+                'author_id': issue.author_id})
+            continue
+        previous = getattr(issue, '_published_status', None) or getattr(
+            issue, '_loaded_status', None)
+        if previous is not None and previous != issue.status:
+            publish(project_channel(issue.project_id), 'issue_status', {
+                'project_id': issue.project_id, 'issue_id': issue.pk,
+                'status': issue.status, 'previous_status': previous})
+            issue._published_status = issue.status
+
+
+def publish_comments(comments, project_id):
+    for comment in comments:
+        publish(project_channel(project_id), 'comment_created', {
+            'project_id': project_id, 'issue_id': comment.issue_id,
+            'comment_id': comment.pk, 'author_id': comment.author_id,
+            'description': comment.description})
+
+
+def publish_memberships(user_id):
+    """
+    Tells the streams of a user that its memberships changed.
+    """
+    publish(user_channel(user_id), 'memberships', {'user_id': user_id})
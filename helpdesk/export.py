@@ -0,0 +1,211 @@
+"""
+Export of a whole project, with its contributors, issues and comments, as
+NDJSON, one {"<kind>": {...}} object per line, or as a single JSON object,
+whose issues hold their comments.
+
+The rows are read in keyset chunks, the comments being merged with the
+issues they belong to rather than loaded per issue, and the output is
+produced in chunks, so that the memory used does not depend on the size of
+the project. The rows are read in a transaction, repeatable read on
+PostgreSQL as the chunks are read by separate statements, so that the export
+is a consistent snapshot of the project.
+"""
+import json
+from datetime import datetime
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import CharField, Q
+from django.db.models.functions import Cast
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Comment, Contributor, Issue
+
+FORMATS = ('json', 'ndjson')
+
+PROJECT_FIELDS = ('id', 'title', 'description', 'type')
+
+CONTRIBUTOR_FIELDS = ('user', 'permission', 'role')
+
+ISSUE_FIELDS = ('id', 'title', 'desc', 'tag', 'priority', 'status', 'author',
+                'assignee', 'created_time', 'updated_time', 'status_time')
+
+COMMENT_FIELDS = ('id', 'issue_id', 'description', 'author', 'created_time',
+                  'updated_time')
+
+
+def get_chunk_size():
+    return getattr(settings, 'HELPDESK_EXPORT_CHUNK_SIZE', 500)
+
+
+def as_text(field):
+    return Cast(field, output_field=CharField())
+
+
+def parse_timestamp(text):
+    """
+    Returns the datetime of a timestamp read as text, which is much faster
+    than its conversion by the database backend. It is naive when stored in
+    UTC without time zone, e.g. by SQLite.
+    """
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        # The offsets without minutes of PostgreSQL, e.g. +00, are only
+        # parsed by fromisoformat since Python 3.11
+        return parse_datetime(text)
+
+
+def to_datetime(text):
+    value = parse_timestamp(text)
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def to_json(text):
+    """
+    Returns the ISO 8601 format of a timestamp read as text.
+    """
+    value = parse_timestamp(text)
+    if value.tzinfo is None:
+        return value.isoformat() + '+00:00'
+    return value.isoformat()
+
+
+def iter_chunks(queryset, fields, key, chunk_size):
+    """
+    Yields the rows of a values_list queryset, sorted by the fields, in
+    chunks of chunk_size rows, each selected after the key, the values of
+    the fields, of the last row of the previous one.
+
+    Unlike iterator(), whose rows are all fetched at once when the server
+    side cursors are disabled, e.g. behind pgbouncer, it does not hold more
+    than a chunk.
+    """
+    queryset = queryset.order_by(*fields)
+    rows = list(queryset[:chunk_size])
+    while rows:
+        yield rows
+        if len(rows) < chunk_size:
+            return
+        values = key(rows[-1])
+        after = Q()
+        for i, field in enumerate(fields):
+            after |= Q(**dict(zip(fields[:i], values[:i])),
+                       **{field + '__gt': values[i]})
+        rows = list(queryset.filter(after)[:chunk_size])
+
+
+def iter_records(project, chunk_size=None):
+    """
+    Yields the (kind, data) records of the project, its contributors, and
+    its issues, each followed by its comments.
+    """
+    chunk_size = chunk_size or get_chunk_size()
+    yield 'project', {field: getattr(project, field)
+                      for field in PROJECT_FIELDS}
+
+    contributors = Contributor.objects.filter(project=project.pk).values_list(
+        'pk', 'user__username', 'permission', 'role')
+    for rows in iter_chunks(contributors, ('pk',), lambda row: row[:1],
+                            chunk_size):
+        for values in rows:
+            yield 'contributor', dict(zip(CONTRIBUTOR_FIELDS, values[1:]))
+
+    issues = Issue.objects.filter(project=project.pk).values_list(
+        'pk', 'title', 'desc', 'tag', 'priority', 'status',
+        'author__username', 'assignee__username',
+        as_text('created_time'), as_text('updated_time'),
+        as_text('status_time'))
+    for rows in iter_chunks(issues, ('pk',), lambda row: row[:1],
+                            chunk_size):
+        # The comments of the chunk of issues, sorted by issue as the issues
+        # are, on the index of the comments of an issue. The ids of the
+        # issues of the projects created at the same time interleave, so
+        # the chunk is not selected as a range of ids.
+        comments = Comment.objects.filter(
+            issue_id__in=[values[0] for values in rows]).values_list(
+                'pk', 'issue', 'description', 'author__username',
+                as_text('created_time'), as_text('updated_time'))
+        comments = (
+            comment for chunk in iter_chunks(
+                comments, ('issue_id', 'created_time', 'pk'),
+                lambda row: (row[1], to_datetime(row[4]), row[0]),
+                chunk_size)
+            for comment in chunk)
+        comment = next(comments, None)
+        for values in rows:
+            issue = dict(zip(ISSUE_FIELDS, values))
+            for field in ('created_time', 'updated_time', 'status_time'):
+                issue[field] = to_json(issue[field])
+            yield 'issue', issue
+            while comment is not None and comment[1] <= values[0]:
+                if comment[1] == values[0]:
+                    comment = dict(zip(COMMENT_FIELDS, comment))
+                    comment['created_time'] = to_json(
+                        comment['created_time'])
+                    comment['updated_time'] = to_json(
+                        comment['updated_time'])
+                    yield 'comment', comment
+                comment = next(comments, None)
+
+
+def iter_ndjson(records):
+    for kind, data in records:
+        yield '{"%s": %s}\n' % (kind, json.dumps(data))
+
+
+def iter_json(records):
+    """
+    Yields the JSON object of the records, {"project": {...},
+    "contributors": [...], "issues": [{..., "comments": [...]}, ...]}.
+    """
+    kind, project = next(records)
+    yield '{"project": %s, "contributors": [' % json.dumps(project)
+    previous = 'project'
+    for kind, data in records:
+        if kind == 'contributor':
+            separator = ', ' if previous == 'contributor' else ''
+            yield separator + json.dumps(data)
+        elif kind == 'issue':
+            if previous == 'issue' or previous == 'comment':
+                separator = ']}, '
+            else:
+                separator = '], "issues": ['
+            # The issue object is left open for its comments
+            yield separator + json.dumps(data)[:-1] + ', "comments": ['
+        else:
+            separator = ', ' if previous == 'comment' else ''
+            yield separator + json.dumps(data)
+        previous = kind
+    if previous == 'issue' or previous == 'comment':
+        yield ']}]}'
+    else:
+        yield '], "issues": []}'
+
+
+def export(project, format='ndjson', chunk_size=None, buffer_size=65536):
+    """
+    Yields the export of the project in the format, encoded in chunks of
+    about buffer_size bytes.
+    """
+    writer = iter_ndjson if format == 'ndjson' else iter_json
+    outermost = not connection.in_atomic_block
+    with transaction.atomic():
+        if outermost and connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SET TRANSACTION ISOLATION LEVEL REPEATABLE READ')
+        buffer = []
+        size = 0
+        for part in writer(iter_records(project, chunk_size)):
+            buffer.append(part)
+            size += len(part)
+            if size >= buffer_size:
+                yield ''.join(buffer).encode()
+                buffer = []
+                size = 0
+        if buffer:
+            yield ''.join(buffer).encode()
@@ -0,0 +1,43 @@
+from rest_framework import filters, serializers
+
+from .models import (PRIORITY_CHOICES, PRIORITY_RANKS, STATUS_CHOICES,
+                     TAG_CHOICES)
+
+
+class IssueFilterBackend(filters.BaseFilterBackend):
+    """
+    Filters the issues on the status, priority, tag and assignee query
+    parameters. Each parameter may be repeated to select several values.
+    The filters are served by the (project, field, created_time, id)
+    indexes of the issues.
+    """
+    choices = {
+        'status': STATUS_CHOICES,
+        'priority': PRIORITY_CHOICES,
+        'tag': TAG_CHOICES,
+    }
+
+    def get_values(self, request, param):
+        values = request.query_params.getlist(param)
+        choices = self.choices.get(param)
+        if choices is not None:
+            for value in values:
+                if value not in dict(choices):
+                    raise serializers.ValidationError({
+                        param: ['"%s" is not a valid choice.' % value]})
+        return values
+
+    def filter_queryset(self, request, queryset, view):
+        for param in ('status', 'tag'):
+            values = self.get_values(request, param)
+            if values:
+                queryset = queryset.filter(**{param + '__in': values})
+        values = self.get_values(request, 'priority')
+        if values:
+            # The rank identifies the priority, and is indexed
+            queryset = queryset.filter(priority_rank__in=[
+                PRIORITY_RANKS[value] for value in values])
+        values = self.get_values(request, 'assignee')
+        if values:
+            queryset = queryset.filter(assignee__username__in=values)
+        return queryset
@@ -0,0 +1,370 @@
+"""
+Import of a project, with its contributors, issues and comments, from
+records such as the ones of helpdesk.export: NDJSON, one {"<kind>": {...}}
+object per line, or CSV whose record column gives the kind of each row, and
+the other columns its fields.
+
+The records are imported in batches, each in a transaction which inserts
+its rows with multi-row statements, looks up its usernames at once, updates
+what the signals of the models would (counters, statistics, search index,
+changes), and saves the checkpoint of its ImportRun, from which an
+interrupted import resumes. The project comes first, and the issues before
+their comments, which refer to them by their id in the records.
+"""
+import csv
+import json
+import time
+from collections import Counter, deque
+from datetime import datetime
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import changes, counters, events, search
+from .bulk import bulk_create, insert_rows
+from .memberships import invalidate_memberships
+from .models import (PERMISSION_CHOICES, PRIORITY_CHOICES, STATUS_CHOICES,
+                     TAG_CHOICES, TYPE_CHOICES, Comment, Contributor,
+                     ImportedIssue, Issue, Project)
+
+FORMATS = ('ndjson', 'csv')
+
+# Valid values of the fields with choices
+CHOICES = {
+    field: {value for value, label in choices}
+    for field, choices in (('type', TYPE_CHOICES),
+                           ('permission', PERMISSION_CHOICES),
+                           ('tag', TAG_CHOICES),
+                           ('priority', PRIORITY_CHOICES),
+                           ('status', STATUS_CHOICES))}
+
+# Fields of the records holding usernames, by kind
+USER_FIELDS = {
+    'contributor': ('user',),
+    'issue': ('author', 'assignee'),
+    'comment': ('author',),
+}
+
+# Fields of the issues inserted by the import
+ISSUE_COLUMNS = ('title', 'desc', 'tag', 'priority', 'priority_rank',
+                 'project', 'status', 'author', 'assignee', 'created_time',
+                 'updated_time', 'comment_count', 'status_time')
+
+REQUIRED = object()
+
+
+class InvalidRecord(Exception):
+    pass
+
+
+def read_ndjson(file):
+    for line in file:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as error:
+            raise InvalidRecord('Invalid JSON: %s' % error)
+        if not isinstance(record, dict) or len(record) != 1:
+            raise InvalidRecord('Expected an object with a single key')
+        kind, data = next(iter(record.items()))
+        if not isinstance(data, dict):
+            raise InvalidRecord('Expected an object of fields')
+        yield kind, data
+
+
+def read_csv(file):
+    reader = csv.DictReader(file)
+    if reader.fieldnames is None or 'record' not in reader.fieldnames:
+        raise InvalidRecord('Expected a record column')
+    for row in reader:
+        kind = row.pop('record')
+        # The empty cells are missing fields
+        yield kind, {field: value for field, value in row.items()
+                     if value not in ('', None)}
+
+
+def read_records(file, format):
+    return read_ndjson(file) if format == 'ndjson' else read_csv(file)
+
+
+def get_value(data, field, default=REQUIRED, model=None):
+    """
+    Returns the text of a field of a record, no longer than the field of the
+    model if given. The numbers, e.g. the ids of NDJSON records, are
+    converted to text.
+    """
+    value = data.get(field)
+    if value is None:
+        if default is REQUIRED:
+            raise InvalidRecord('The %s field is required' % field)
+        return default
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        value = str(value)
+    elif not isinstance(value, str):
+        raise InvalidRecord('The %s field must be a string' % field)
+    if field in CHOICES and value not in CHOICES[field]:
+        raise InvalidRecord('"%s" is not a valid %s' % (value, field))
+    if model is not None:
+        max_length = model._meta.get_field(field).max_length
+        if max_length is not None and len(value) > max_length:
+            raise InvalidRecord('The %s field has more than %d characters'
+                                % (field, max_length))
+    return value
+
+
+def get_time(data, field, default):
+    value = data.get(field)
+    if value is None:
+        return default
+    try:
+        # Much faster than parse_datetime, which also parses the other
+        # formats accepted by Django
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        parsed = parse_datetime(value) if isinstance(value, str) else None
+        if parsed is None:
+            raise InvalidRecord('"%s" is not a valid %s' % (value, field))
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, timezone.utc)
+    return parsed
+
+
+class ProjectImporter:
+    """
+    Imports the records of a project into the project of an ImportRun,
+    created by the project record, after the records it already imported.
+    """
+
+    def __init__(self, run, batch_size=5000, create_users=False):
+        self.run = run
+        self.batch_size = batch_size
+        self.create_users = create_users
+        # Ids of the users by username
+        self.users = {}
+        # Ids of the issues by id in the records
+        self.issues = dict(ImportedIssue.objects.filter(
+            run=run).values_list('source_id', 'issue_id'))
+        # Ids of the users already contributing to the project
+        self.contributors = set()
+        if run.project_id is not None:
+            self.contributors.update(Contributor.objects.filter(
+                project=run.project_id).values_list('user_id', flat=True))
+        # Number of the current record, for the errors
+        self.position = 0
+
+    def import_records(self, records, progress=None):
+        """
+        Imports the records, calling progress with the number of records
+        imported and the records imported per second after each batch, and
+        returns the number of records imported.
+        """
+        records = iter(records)
+        # The records imported before an interruption are skipped
+        deque(islice(self.count(records), self.run.records), maxlen=0)
+        start = time.perf_counter()
+        imported = 0
+        while True:
+            batch = list(islice(self.count(records), self.batch_size))
+            if not batch:
+                break
+            with transaction.atomic():
+                self.import_batch(batch)
+                self.run.records += len(batch)
+                self.run.save(update_fields=['project', 'records',
+                                             'updated_time'])
+            imported += len(batch)
+            if progress is not None:
+                progress(self.run.records,
+                         imported / (time.perf_counter() - start))
+        with transaction.atomic():
+            self.run.finished = True
+            self.run.save(update_fields=['finished', 'updated_time'])
+            # The ids of the issues are only needed to resume the import
+            ImportedIssue.objects.filter(run=self.run).delete()
+        return imported
+
+    def count(self, records):
+        while True:
+            self.position += 1
+            try:
+                record = next(records)
+            except StopIteration:
+                self.position -= 1
+                return
+            yield record
+
+    def import_batch(self, batch):
+        first = self.run.records
+        self.load_users({
+            data[field] for kind, data in batch
+            for field in USER_FIELDS.get(kind, ())
+            if isinstance(data.get(field), str)})
+        contributors = []
+        issues = []
+        comments = []
+        for i, (kind, data) in enumerate(batch):
+            self.position = first + i + 1
+            if kind == 'project':
+                self.create_project(data)
+            elif self.run.project_id is None:
+                raise InvalidRecord('The first record must be the project')
+            elif kind == 'contributor':
+                contributors.append(self.build_contributor(data))
+            elif kind == 'issue':
+                issues.append(self.build_issue(data))
+            elif kind == 'comment':
+                comments.append(self.build_comment(data))
+            else:
+                raise InvalidRecord('Unknown record "%s"' % kind)
+        self.create_contributors(contributors)
+        # The comments of the issues of the batch are counted with them
+        comment_counts = Counter(issue_id for issue_id, comment in comments)
+        for source_id, issue in issues:
+            issue.comment_count = comment_counts.pop(source_id, 0)
+        self.create_issues(issues)
+        self.create_comments(comments)
+        for issue_id, count in comment_counts.items():
+            counters.count_comments(self.issues[issue_id], count)
+
+    def load_users(self, usernames):
+        User = get_user_model()
+        missing = list(usernames - self.users.keys())
+        for i in range(0, len(missing), 500):
+            self.users.update(User.objects.filter(
+                username__in=missing[i:i + 500]).values_list(
+                    'username', 'pk'))
+        missing = sorted(usernames - self.users.keys())
+        if not missing:
+            return
+        if not self.create_users:
+            raise InvalidRecord('Unknown user(s) %s' % ', '.join(missing))
+        # The created users have no usable password
+        users = bulk_create(User.objects.all(), [
+            User(username=username, password=make_password(None))
+            for username in missing])
+        self.users.update((user.username, user.pk) for user in users)
+
+    def get_user(self, data, field, default=REQUIRED):
+        username = data.get(field)
+        if username is not None and not isinstance(username, str):
+            raise InvalidRecord('"%s" is not a valid %s' % (username, field))
+        username = get_value(data, field, default)
+        if username is None:
+            return None
+        return self.users[username]
+
+    def create_project(self, data):
+        if self.run.project_id is not None:
+            raise InvalidRecord('The project was already imported')
+        self.run.project = Project.objects.create(
+            title=get_value(data, 'title', model=Project),
+            description=get_value(data, 'description', '', Project),
+            type=get_value(data, 'type'))
+
+    def build_contributor(self, data):
+        user_id = self.get_user(data, 'user')
+        if user_id in self.contributors:
+            raise InvalidRecord('The user %s is already a contributor'
+                                % data['user'])
+        self.contributors.add(user_id)
+        return Contributor(
+            user_id=user_id,
+            project_id=self.run.project_id,
+            permission=get_value(data, 'permission'),
+            role=get_value(data, 'role', '', Contributor))
+
+    def build_issue(self, data):
+        created_time = get_time(data, 'created_time', timezone.now())
+        updated_time = get_time(data, 'updated_time', created_time)
+        issue = Issue(
+            title=get_value(data, 'title', model=Issue),
+            desc=get_value(data, 'desc', '', Issue),
+            tag=get_value(data, 'tag'),
+            priority=get_value(data, 'priority'),
+            project_id=self.run.project_id,
+            status=get_value(data, 'status'),
+            author_id=self.get_user(data, 'author'),
+            assignee_id=self.get_user(data, 'assignee', None),
+            created_time=created_time,
+            updated_time=updated_time,
+            status_time=get_time(data, 'status_time', updated_time),
+        )
+        source_id = str(get_value(data, 'id'))
+        if source_id in self.issues:
+            raise InvalidRecord('The issue %s was already imported'
+                                % source_id)
+        # Reserved until the issue is created
+        self.issues[source_id] = None
+        return source_id, issue
+
+    def build_comment(self, data):
+        created_time = get_time(data, 'created_time', timezone.now())
+        comment = (
+            get_value(data, 'description', model=Comment),
+            self.get_user(data, 'author'),
+            created_time,
+            get_time(data, 'updated_time', created_time),
+        )
+        issue_id = str(get_value(data, 'issue_id'))
+        if issue_id not in self.issues:
+            raise InvalidRecord('Unknown issue %s' % issue_id)
+        return issue_id, comment
+
+    def create_contributors(self, contributors):
+        if not contributors:
+            return
+        bulk_create(Contributor.objects.filter(
+            project=self.run.project_id), contributors)
+        changes.record(self.run.project_id, 'contributor', 'create', [
+            (contributor.pk, None) for contributor in contributors])
+        for contributor in contributors:
+            invalidate_memberships(contributor.user_id)
+            events.publish_memberships(contributor.user_id)
+
+    def create_issues(self, issues):
+        if not issues:
+            return
+        objs = [issue for source_id, issue in issues]
+        fields = [Issue._meta.get_field(name) for name in ISSUE_COLUMNS]
+        rank = Issue._meta.get_field('priority_rank')
+        for issue in objs:
+            rank.pre_save(issue, True)
+        pks = insert_rows(Issue, ISSUE_COLUMNS, [
+            tuple(getattr(issue, field.attname) for field in fields)
+            for issue in objs])
+        for issue, pk in zip(objs, pks):
+            issue.pk = pk
+        insert_rows(ImportedIssue, ('run', 'source_id', 'issue_id'), [
+            (self.run.pk, source_id, issue.pk)
+            for source_id, issue in issues])
+        self.issues.update(
+            (source_id, issue.pk) for source_id, issue in issues)
+        # The inserts do not send the signals indexing the issues, counting
+        # them and recording their changes
+        search.index_issues(objs)
+        counters.count_issues(objs)
+        changes.record(self.run.project_id, 'issue', 'create',
+                       [(issue.pk, issue.pk) for issue in objs])
+
+    def create_comments(self, comments):
+        if not comments:
+            return
+        # Inserted without building the comments, which make up most of the
+        # rows
+        project_id = self.run.project_id
+        rows = [(description, author_id, self.issues[source_id],
+                 created_time, updated_time)
+                for source_id, (description, author_id, created_time,
+                                updated_time) in comments]
+        pks = insert_rows(Comment, ('description', 'author', 'issue',
+                                    'created_time', 'updated_time'), rows)
+        search.get_backend().index([
+            (search.comment_key(pk), project_id, row[2], '', row[0])
+            for pk, row in zip(pks, rows)])
+        changes.record(project_id, 'comment', 'create', [
+            (pk, row[2]) for pk, row in zip(pks, rows)])
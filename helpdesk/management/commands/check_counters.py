@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from helpdesk import counters
+
+
+class Command(BaseCommand):
+    help = 'Checks the issue counters of the projects and the comment ' \
+           'counts of the issues against the rows they count, and ' \
+           'repairs them with --repair.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repair', action='store_true',
+            help='Sets the drifted counters to the actual counts.')
+
+    def handle(self, *args, **options):
+        issue_counters = counters.check_issue_counters()
+        for project_id, field, value, count, actual in issue_counters:
+            self.stdout.write(
+                'project %s: %s=%s counted %s, actual %s'
+                % (project_id, field, value, count, actual))
+        comment_counts = counters.check_comment_counts()
+        for issue_id, count, actual in comment_counts:
+            self.stdout.write('issue %s: %s comment(s) counted, actual %s'
+                              % (issue_id, count, actual))
+        drifted = len(issue_counters) + len(comment_counts)
+        if not drifted:
+            self.stdout.write('No drifted counter')
+        elif options['repair']:
+            counters.repair_issue_counters(issue_counters)
+            counters.repair_comment_counts(comment_counts)
+            self.stdout.write('%d counter(s) repaired' % drifted)
+        else:
+            raise CommandError('%d drifted counter(s)' % drifted)
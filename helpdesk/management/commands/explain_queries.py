@@ -0,0 +1,105 @@
+import re
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from helpdesk import search
+from helpdesk.models import Comment, Contributor
+
+
+# Full scan of a table in the SQLite and PostgreSQL query plans. SQLite
+# searches the rows it looks up, and scans the others, from the table or
+# from one of its indexes, except for the full-text index, whose scans go
+# through an index of the virtual table.
+FULL_SCAN = re.compile(r'\bSCAN (TABLE )?"?(helpdesk|auth)_\w+\b"?'
+                       r'(?! VIRTUAL TABLE INDEX)'
+                       r'|Seq Scan on (helpdesk|auth)_')
+
+
+class Command(BaseCommand):
+    help = 'Runs the requests of every helpdesk endpoint on the sample ' \
+           'project and prints the query plan of their queries. The ' \
+           'changes made by the requests are rolled back.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--project', type=int,
+            help='Id of the sample project, defaults to the first project '
+                 'having a comment.')
+        parser.add_argument(
+            '--fail-on-scan', action='store_true',
+            help='Exits with an error if a query scans a whole table.')
+
+    def get_endpoints(self, project):
+        manager = Contributor.objects.filter(
+            project=project, permission='manager').first()
+        issue = project.issues.filter(comments__isnull=False).first()
+        comment = issue.comments.first()
+        contributor = project.contributors.exclude(pk=manager.pk).first() \
+            or manager
+        project_url = '/api/projects/%s/' % project.pk
+        issue_url = '%sissues/%s/' % (project_url, issue.pk)
+        return manager.user, [
+            ('GET', '/api/projects/'),
+            ('GET', project_url),
+            ('GET', project_url + 'issues/'),
+            ('GET', project_url + 'issues/?page_size=1', 'next'),
+            ('GET', issue_url),
+            ('GET', issue_url + 'comments/'),
+            ('GET', issue_url + 'comments/?page_size=1', 'next'),
+            ('GET', '%scomments/%s/' % (issue_url, comment.pk)),
+            ('GET', project_url + 'users/'),
+            ('GET', project_url + 'changes/?page_size=1', 'next'),
+            ('GET', '/api/search/?' + urlencode(
+                {'q': ' '.join(search.parse_query(issue.title)[:2])})),
+            ('DELETE', '%susers/%s/' % (project_url, contributor.pk)),
+            ('DELETE', '%scomments/%s/' % (issue_url, comment.pk)),
+            ('DELETE', issue_url),
+            ('DELETE', project_url),
+        ]
+
+    def handle(self, *args, **options):
+        comments = Comment.objects.select_related('issue__project')
+        if options['project']:
+            comments = comments.filter(issue__project=options['project'])
+        comment = comments.first()
+        if comment is None:
+            raise CommandError('No project with a comment found.')
+        user, endpoints = self.get_endpoints(comment.issue.project)
+
+        host = next((host.lstrip('.') for host in settings.ALLOWED_HOSTS
+                     if host != '*'), 'localhost')
+        client = APIClient(HTTP_HOST=host)
+        client.force_authenticate(user)
+        prefix = connection.ops.explain_query_prefix()
+        scans = 0
+        with transaction.atomic():
+            for method, url, *follow in endpoints:
+                if follow:
+                    url = client.get(url).json()[follow[0]] or url
+                with CaptureQueriesContext(connection) as context:
+                    client.generic(method, url)
+                self.stdout.write(self.style.MIGRATE_HEADING(
+                    '%s %s' % (method, url)))
+                for query in context.captured_queries:
+                    sql = query['sql']
+                    if sql.startswith(('SAVEPOINT', 'RELEASE')):
+                        continue
+                    self.stdout.write('  ' + sql)
+                    with connection.cursor() as cursor:
+                        cursor.execute('%s %s' % (prefix, sql))
+                        for row in cursor.fetchall():
+                            line = str(row[-1])
+                            if FULL_SCAN.search(line):
+                                scans += 1
+                                line = self.style.WARNING(line)
+                            self.stdout.write('    ' + line)
+            transaction.set_rollback(True)
+
+        self.stdout.write('%d full table scan(s)' % scans)
+        if scans and options['fail_on_scan']:
+            raise CommandError('Some queries scan a whole table.')
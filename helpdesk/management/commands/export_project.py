@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from helpdesk import export
+from helpdesk.models import Project
+
+
+class Command(BaseCommand):
+    help = 'Exports a project, with its contributors, issues and comments, ' \
+           'as NDJSON or JSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('project_id', type=int)
+        parser.add_argument(
+            '--format', choices=export.FORMATS, default='ndjson',
+            help='Format of the export, ndjson by default.')
+        parser.add_argument(
+            '--output',
+            help='File to write the export to, the standard output by '
+                 'default.')
+        parser.add_argument(
+            '--chunk-size', type=int,
+            help='Number of rows fetched at once from the database.')
+
+    def handle(self, *args, **options):
+        try:
+            project = Project.objects.get(pk=options['project_id'])
+        except Project.DoesNotExist:
+            raise CommandError('Project %s does not exist'
+                               % options['project_id'])
+        chunks = export.export(project, options['format'],
+                               options['chunk_size'])
+        if options['output']:
+            with open(options['output'], 'wb') as output:
+                for chunk in chunks:
+                    output.write(chunk)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk.decode(), ending='')
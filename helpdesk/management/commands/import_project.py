@@ -0,0 +1,72 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from helpdesk import imports
+from helpdesk.models import ImportRun
+
+
+class Command(BaseCommand):
+    help = 'Imports a project, with its contributors, issues and comments, ' \
+           'from NDJSON or CSV records, e.g. the ones of export_project.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument(
+            '--format', choices=imports.FORMATS,
+            help='Format of the records, csv for the .csv files and ndjson '
+                 'otherwise by default.')
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Number of records imported in each transaction.')
+        parser.add_argument(
+            '--create-users', action='store_true',
+            help='Creates the unknown users, without usable password.')
+        parser.add_argument(
+            '--resume', type=int, metavar='RUN_ID',
+            help='Resumes an interrupted import after its last batch.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        format = options['format'] \
+            or ('csv' if path.lower().endswith('.csv') else 'ndjson')
+        if options['resume'] is None:
+            run = ImportRun.objects.create(source=path)
+        else:
+            try:
+                run = ImportRun.objects.get(pk=options['resume'])
+            except ImportRun.DoesNotExist:
+                raise CommandError('Import run %s does not exist'
+                                   % options['resume'])
+            if run.finished:
+                raise CommandError('Import run %s is finished' % run.pk)
+            if run.source != path:
+                self.stderr.write('Import run %s was started from %s'
+                                  % (run.pk, run.source))
+        self.stdout.write('Import run %s, from record %d'
+                          % (run.pk, run.records + 1))
+
+        self.last_progress = time.perf_counter()
+        importer = imports.ProjectImporter(
+            run, options['batch_size'], options['create_users'])
+        start = time.perf_counter()
+        try:
+            with open(path, encoding='utf-8', newline='') as file:
+                imported = importer.import_records(
+                    imports.read_records(file, format), self.progress)
+        except imports.InvalidRecord as error:
+            raise CommandError(
+                'Record %d: %s. Resume the import with --resume %s once '
+                'fixed.' % (importer.position, error, run.pk))
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            '%d record(s) imported into project %s in %.1fs (%d records/s)'
+            % (imported, run.project_id, elapsed,
+               imported / elapsed if elapsed else 0))
+
+    def progress(self, records, rate):
+        # At most a line per second
+        now = time.perf_counter()
+        if now - self.last_progress >= 1:
+            self.last_progress = now
+            self.stdout.write('%d records, %d records/s' % (records, rate))
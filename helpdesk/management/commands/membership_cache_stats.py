@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from helpdesk.memberships import get_stats
+
+
+class Command(BaseCommand):
+    help = 'Prints the hit and miss counters of the memberships cache, ' \
+           'in the Prometheus text format.'
+
+    def handle(self, *args, **options):
+        stats = get_stats()
+        for counter in ('hits', 'misses'):
+            name = 'helpdesk_membership_cache_%s_total' % counter
+            self.stdout.write('# TYPE %s counter' % name)
+            self.stdout.write('%s %s' % (name, stats[counter]))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from helpdesk import search
+from helpdesk.models import Comment, Issue
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the full-text search index of the issues and comments.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=2000,
+            help='Number of documents indexed per statement batch.')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            count = search.rebuild(Issue.objects.all(), Comment.objects.all(),
+                                   batch_size=options['batch_size'])
+        self.stdout.write('%d document(s) indexed' % count)
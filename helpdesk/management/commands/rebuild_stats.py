@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from helpdesk import stats
+from helpdesk.models import Project
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the statistics of the projects from their issues.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'project_ids', nargs='*', type=int,
+            help='Ids of the projects to rebuild, all of them by default.')
+
+    def handle(self, *args, **options):
+        projects = Project.objects.all()
+        if options['project_ids']:
+            projects = projects.filter(pk__in=options['project_ids'])
+        count = stats.rebuild(projects)
+        self.stdout.write('%d project(s) rebuilt' % count)
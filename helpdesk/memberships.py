@@ -0,0 +1,183 @@
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection, transaction
+
+from .models import Contributor
+from .pool import database_sync_to_async
+
+
+CACHE_PREFIX = 'helpdesk:memberships'
+
+# Backends private to a process, whose entries could not be invalidated by
+# the other workers
+LOCAL_BACKENDS = (LocMemCache, DummyCache)
+
+# Hits and misses counted since they were last added to the cache
+local_stats = Counter()
+stats_lock = threading.Lock()
+
+
+def get_cache():
+    """
+    Returns the cache of the permissions, or None if it is disabled, by
+    HELPDESK_MEMBERSHIP_CACHE set to None, or as it is private to the
+    process.
+    """
+    alias = getattr(settings, 'HELPDESK_MEMBERSHIP_CACHE', 'default')
+    if alias is None:
+        return None
+    cache = caches[alias]
+    if isinstance(cache, LOCAL_BACKENDS):
+        return None
+    return cache
+
+
+def get_version(user_id):
+    """
+    Returns the version of the memberships of a user, which is part of the
+    key of their cached permissions, or None if the cache is disabled.
+    """
+    cache = get_cache()
+    if cache is None:
+        return None
+    key = '%s:version:%s' % (CACHE_PREFIX, user_id)
+    version = cache.get(key)
+    if version is None:
+        # A counter evicted from the cache restarts from the current time, so
+        # that the entries cached under its previous values are never read.
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate_memberships(user_id):
+    """
+    Increments the version of the memberships of a user, now and once the
+    current transaction is committed, so that a concurrent request reading
+    the database before the commit can not cache stale permissions under
+    the new version.
+    """
+    cache = get_cache()
+    if cache is None:
+        return
+
+    def increment():
+        key = '%s:version:%s' % (CACHE_PREFIX, user_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), timeout=None)
+
+    increment()
+    transaction.on_commit(increment)
+
+
+def count(cache, counter):
+    """
+    Counts a hit or a miss, the counts being added to the cache every
+    HELPDESK_MEMBERSHIP_STATS_BATCH lookups of the process rather than on
+    every request.
+    """
+    local_stats[counter] += 1
+    if sum(local_stats.values()) < getattr(
+            settings, 'HELPDESK_MEMBERSHIP_STATS_BATCH', 100):
+        return
+    with stats_lock:
+        counts = dict(local_stats)
+        local_stats.clear()
+    for counter, value in counts.items():
+        key = '%s:%s' % (CACHE_PREFIX, counter)
+        try:
+            cache.incr(key, value)
+        except ValueError:
+            if not cache.add(key, value, timeout=None):
+                cache.incr(key, value)
+
+
+def get_stats():
+    """
+    Returns the hit and miss counters of the memberships cache, those of the
+    other processes as of their last addition to the cache.
+    """
+    cache = get_cache()
+    return {counter: (cache.get('%s:%s' % (CACHE_PREFIX, counter), 0)
+                      if cache is not None else 0) + local_stats[counter]
+            for counter in ('hits', 'misses')}
+
+
+def load_permissions(user_id):
+    """
+    Returns the mapping of the ids of the user projects to the user
+    permission, from the shared cache when it is up to date.
+    """
+    cache = get_cache()
+    if cache is None or connection.in_atomic_block:
+        # The transaction may see changes which are not committed yet, and
+        # which must not be published to the other workers.
+        return dict(Contributor.objects.filter(user=user_id).values_list(
+            'project_id', 'permission'))
+
+    key = '%s:%s:%s' % (CACHE_PREFIX, user_id, get_version(user_id))
+    permissions = cache.get(key)
+    if permissions is None:
+        count(cache, 'misses')
+        permissions = dict(Contributor.objects.filter(
+            user=user_id).values_list('project_id', 'permission'))
+        cache.set(key, permissions, getattr(
+            settings, 'HELPDESK_MEMBERSHIP_CACHE_TIMEOUT', 300))
+    else:
+        count(cache, 'hits')
+    return permissions
+
+
+class ProjectMemberships:
+    """
+    Project permissions of a user, loaded the first time they are needed.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self._permissions = None
+
+    @property
+    def permissions(self):
+        """
+        Mapping of the ids of the user projects to the user permission.
+        """
+        if self._permissions is None:
+            self._permissions = load_permissions(self.user.pk)
+        return self._permissions
+
+    async def aload(self):
+        """
+        Loads the permissions in the thread pool, for the async views.
+        """
+        if self._permissions is None:
+            self._permissions = await database_sync_to_async(
+                load_permissions)(self.user.pk)
+        return self._permissions
+
+    def is_contributor(self, project_id):
+        return project_id in self.permissions
+
+    def is_manager(self, project_id):
+        return self.permissions.get(project_id) == 'manager'
+
+
+def get_memberships(request):
+    """
+    Returns the project memberships of the request user. They are cached on
+    the request, so that all the permission checks of a request share them.
+    """
+    request = getattr(request, '_request', request)
+    memberships = getattr(request, '_project_memberships', None)
+    if memberships is None or memberships.user is not request.user:
+        memberships = ProjectMemberships(request.user)
+        request._project_memberships = memberships
+    return memberships
@@ -0,0 +1,42 @@
+# Generated by Django 3.1.7 on 2026-10-18 05:16
+
+from django.db import migrations, models
+import helpdesk.models
+
+
+def set_priority_ranks(apps, schema_editor):
+    Issue = apps.get_model('helpdesk', 'Issue')
+    for priority, rank in helpdesk.models.PRIORITY_RANKS.items():
+        Issue.objects.filter(priority=priority).update(priority_rank=rank)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('helpdesk', '0009_auto_20261018_0506'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='issue',
+            name='priority_rank',
+            field=helpdesk.models.PriorityRankField(default=0, editable=False),
+        ),
+        migrations.RunPython(set_priority_ranks, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['project', 'status', 'created_time', 'id'], name='issue_project_status'),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['project', 'priority_rank', 'created_time', 'id'], name='issue_project_priority'),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['project', 'tag', 'created_time', 'id'], name='issue_project_tag'),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['project', 'assignee', 'created_time', 'id'], name='issue_project_assignee'),
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 3.1.7 on 2026-10-18 05:23
+
+from django.conf import settings
+from django.db import migrations
+
+# The search index of helpdesk.search as of this migration, whose schema and
+# documents are written here rather than read from the module, which may
+# change after it: the documents are keyed by the id of the issue doubled,
+# or by the id of the comment doubled plus one.
+
+SQLITE = [
+    'CREATE VIRTUAL TABLE helpdesk_search USING fts5(title, body, '
+    'project_id UNINDEXED, scope, '
+    'tokenize="unicode61 remove_diacritics 2")',
+    "INSERT INTO helpdesk_search (rowid, title, body, project_id, scope) "
+    "SELECT id * 2, title, \"desc\", project_id, "
+    "'p' || project_id || ' i' || id FROM helpdesk_issue",
+    "INSERT INTO helpdesk_search (rowid, title, body, project_id, scope) "
+    "SELECT c.id * 2 + 1, '', c.description, i.project_id, "
+    "'p' || i.project_id || ' i' || i.id FROM helpdesk_comment c "
+    "JOIN helpdesk_issue i ON i.id = c.issue_id",
+    "INSERT INTO helpdesk_search (helpdesk_search) VALUES ('optimize')",
+]
+
+POSTGRESQL = [
+    'CREATE TABLE helpdesk_search (id bigint PRIMARY KEY, '
+    'project_id integer NOT NULL, issue_id integer NOT NULL, '
+    'document tsvector NOT NULL)',
+    'CREATE INDEX helpdesk_search_document ON helpdesk_search '
+    'USING gin (document)',
+    'CREATE INDEX helpdesk_search_project ON helpdesk_search (project_id)',
+    'CREATE INDEX helpdesk_search_issue ON helpdesk_search (issue_id)',
+    "INSERT INTO helpdesk_search (id, project_id, issue_id, document) "
+    "SELECT id * 2, project_id, id, "
+    "setweight(to_tsvector(%(config)s::regconfig, title), 'A') || "
+    "setweight(to_tsvector(%(config)s::regconfig, \"desc\"), 'B') "
+    "FROM helpdesk_issue",
+    "INSERT INTO helpdesk_search (id, project_id, issue_id, document) "
+    "SELECT c.id * 2 + 1, i.project_id, i.id, "
+    "setweight(to_tsvector(%(config)s::regconfig, ''), 'A') || "
+    "setweight(to_tsvector(%(config)s::regconfig, c.description), 'B') "
+    "FROM helpdesk_comment c JOIN helpdesk_issue i ON i.id = c.issue_id",
+]
+
+STATEMENTS = {
+    'sqlite': SQLITE,
+    'postgresql': POSTGRESQL,
+}
+
+
+def create_search_index(apps, schema_editor):
+    # Only SQLite and PostgreSQL have a search backend
+    statements = STATEMENTS.get(schema_editor.connection.vendor, [])
+    params = {'config': getattr(settings, 'HELPDESK_SEARCH_CONFIG', 'simple')}
+    with schema_editor.connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement, params if '%(' in statement else None)
+
+
+def drop_search_index(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute('DROP TABLE IF EXISTS helpdesk_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('helpdesk', '0010_auto_20261018_0516'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 3.1.7 on 2026-10-18 06:28
+
+from django.db import migrations, models
+
+
+def set_updated_times(apps, schema_editor):
+    for model in ('Issue', 'Comment'):
+        apps.get_model('helpdesk', model).objects.update(
+            updated_time=models.F('created_time'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('helpdesk', '0011_auto_20261018_0523'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='updated_time',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='issue',
+            name='updated_time',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='updated_time',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(set_updated_times, migrations.RunPython.noop),
+    ]
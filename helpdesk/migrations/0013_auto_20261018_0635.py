@@ -0,0 +1,31 @@
+# Generated by Django 3.1.7 on 2026-10-18 06:35
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('helpdesk', '0012_auto_20261018_0628'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Change',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('seq', models.PositiveIntegerField()),
+                ('model', models.CharField(choices=[('project', 'Project'), ('issue', 'Issue'), ('comment', 'Comment'), ('contributor', 'Contributor')], max_length=16)),
+                ('object_id', models.PositiveIntegerField()),
+                ('issue_id', models.PositiveIntegerField(null=True)),
+                ('action', models.CharField(choices=[('create', 'Create'), ('update', 'Update'), ('delete', 'Delete')], max_length=16)),
+                ('time', models.DateTimeField(auto_now_add=True)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='changes', to='helpdesk.project')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='change',
+            constraint=models.UniqueConstraint(fields=('project', 'seq'), name='unique_change_seq'),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 3.1.7 on 2026-10-18 07:41
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+import django.db.models.deletion
+import helpdesk.models
+
+
+def count_issues_and_comments(apps, schema_editor):
+    Project = apps.get_model('helpdesk', 'Project')
+    Issue = apps.get_model('helpdesk', 'Issue')
+    Comment = apps.get_model('helpdesk', 'Comment')
+    IssueCounter = apps.get_model('helpdesk', 'IssueCounter')
+    counts = {}
+    for field, choices in helpdesk.models.COUNTED_ISSUE_FIELDS:
+        for project_id in Project.objects.values_list('pk', flat=True):
+            for value, label in choices:
+                counts[project_id, field, value] = 0
+        rows = Issue.objects.values_list('project', field).annotate(
+            count=Count('pk')).order_by()
+        for project_id, value, count in rows:
+            counts[project_id, field, value] = count
+    IssueCounter.objects.bulk_create([
+        IssueCounter(project_id=project_id, field=field, value=value,
+                     count=count)
+        for (project_id, field, value), count in counts.items()],
+        batch_size=500)
+    comments = Comment.objects.filter(issue=OuterRef('pk')).order_by() \
+        .values('issue').annotate(count=Count('pk')).values('count')
+    Issue.objects.filter(comments__isnull=False).update(
+        comment_count=Subquery(comments))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('helpdesk', '0013_auto_20261018_0635'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='issue',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.CreateModel(
+            name='IssueCounter',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field', models.CharField(max_length=16)),
+                ('value', models.CharField(max_length=128)),
+                ('count', models.IntegerField(default=0)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='issue_counters', to='helpdesk.project')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='issuecounter',
+            constraint=models.UniqueConstraint(fields=('project', 'field', 'value'), name='unique_issue_counter'),
+        ),
+        migrations.RunPython(count_issues_and_comments,
+                             migrations.RunPython.noop),
+    ]
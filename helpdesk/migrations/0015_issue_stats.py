@@ -0,0 +1,111 @@
+# Generated by Django 3.1.7 on 2026-10-18 07:50
+
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def build_stats(apps, schema_editor):
+    # The issues entered their status when they were last updated, at best
+    Issue = apps.get_model('helpdesk', 'Issue')
+    DailyIssueStat = apps.get_model('helpdesk', 'DailyIssueStat')
+    StatusTimeStat = apps.get_model('helpdesk', 'StatusTimeStat')
+    AssigneeStat = apps.get_model('helpdesk', 'AssigneeStat')
+    Issue.objects.update(status_time=F('updated_time'))
+
+    daily = defaultdict(Counter)
+    status_time = defaultdict(Counter)
+    assignees = Counter()
+    localdate = django.utils.timezone.localdate
+    issues = Issue.objects.values_list(
+        'project', 'status', 'status_time', 'created_time', 'assignee')
+    for project_id, status, status_time_, created_time, assignee_id \
+            in issues.iterator():
+        daily[project_id, localdate(created_time)]['opened'] += 1
+        if status == 'termine':
+            daily[project_id, localdate(status_time_)]['closed'] += 1
+        status_time[project_id, status]['current'] += 1
+        status_time[project_id, status]['entered'] += int(
+            status_time_.timestamp())
+        if assignee_id is not None:
+            assignees[project_id, assignee_id] += 1
+    DailyIssueStat.objects.bulk_create([
+        DailyIssueStat(project_id=project_id, day=day, **counts)
+        for (project_id, day), counts in daily.items()], batch_size=500)
+    StatusTimeStat.objects.bulk_create([
+        StatusTimeStat(project_id=project_id, status=status, **counts)
+        for (project_id, status), counts in status_time.items()],
+        batch_size=500)
+    AssigneeStat.objects.bulk_create([
+        AssigneeStat(project_id=project_id, assignee_id=assignee_id,
+                     issues=count)
+        for (project_id, assignee_id), count in assignees.items()],
+        batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('helpdesk', '0014_issue_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='issue',
+            name='status_time',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.CreateModel(
+            name='StatusTimeStat',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(max_length=128)),
+                ('stays', models.IntegerField(default=0)),
+                ('seconds', models.BigIntegerField(default=0)),
+                ('current', models.IntegerField(default=0)),
+                ('entered', models.BigIntegerField(default=0)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_time_stats', to='helpdesk.project')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyIssueStat',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('opened', models.IntegerField(default=0)),
+                ('closed', models.IntegerField(default=0)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='helpdesk.project')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AssigneeStat',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('issues', models.IntegerField(default=0)),
+                ('assignee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='assignee_stats', to='helpdesk.project')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='statustimestat',
+            constraint=models.UniqueConstraint(fields=('project', 'status'), name='unique_status_time_stat'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyissuestat',
+            constraint=models.UniqueConstraint(fields=('project', 'day'), name='unique_daily_stat'),
+        ),
+        migrations.AddIndex(
+            model_name='assigneestat',
+            index=models.Index(fields=['project', '-issues'], name='assignee_stat_project_issues'),
+        ),
+        migrations.AddConstraint(
+            model_name='assigneestat',
+            constraint=models.UniqueConstraint(fields=('project', 'assignee'), name='unique_assignee_stat'),
+        ),
+        migrations.RunPython(build_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 3.1.7 on 2026-10-18 08:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('helpdesk', '0015_issue_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportRun',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=1024)),
+                ('records', models.PositiveIntegerField(default=0)),
+                ('finished', models.BooleanField(default=False)),
+                ('created_time', models.DateTimeField(auto_now_add=True)),
+                ('updated_time', models.DateTimeField(auto_now=True)),
+                ('project', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='import_runs', to='helpdesk.project')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ImportedIssue',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_id', models.CharField(max_length=128)),
+                ('issue_id', models.PositiveIntegerField()),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='issues', to='helpdesk.importrun')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='importedissue',
+            constraint=models.UniqueConstraint(fields=('run', 'source_id'), name='unique_imported_issue'),
+        ),
+    ]
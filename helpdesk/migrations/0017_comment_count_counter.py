@@ -0,0 +1,19 @@
+# Generated by Django 3.1.7 on 2026-10-18 08:46
+
+from django.db import migrations
+import helpdesk.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('helpdesk', '0016_import_runs'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='issue',
+            name='comment_count',
+            field=helpdesk.models.CounterField(default=0, editable=False),
+        ),
+    ]
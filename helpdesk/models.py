@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 
 TYPE_CHOICES = (
@@ -25,6 +26,22 @@ STATUS_CHOICES = (
     ('termine', 'Terminé')
 )
 
+# Status of the closed issues
+CLOSED_STATUS = 'termine'
+
+CHANGE_MODEL_CHOICES = (
+    ('project', 'Project'),
+    ('issue', 'Issue'),
+    ('comment', 'Comment'),
+    ('contributor', 'Contributor'),
+)
+
+CHANGE_ACTION_CHOICES = (
+    ('create', 'Create'),
+    ('update', 'Update'),
+    ('delete', 'Delete'),
+)
+
 TAG_CHOICES = (
     ('bug', 'Bug'),
     ('tache', 'Tâche'),
@@ -32,10 +49,64 @@ TAG_CHOICES = (
 )
 
 
+# Rank of each priority, the highest first
+PRIORITY_RANKS = {
+    priority: rank for rank, (priority, label) in enumerate(PRIORITY_CHOICES)
+}
+
+
+class PriorityRankField(models.PositiveSmallIntegerField):
+    """
+    Rank of the priority of an issue, which is set whenever the issue is
+    saved or bulk created, so that issues can be sorted by priority on an
+    index.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('editable', False)
+        kwargs.setdefault('default', 0)
+        super().__init__(*args, **kwargs)
+
+    def pre_save(self, model_instance, add):
+        value = PRIORITY_RANKS.get(model_instance.priority, 0)
+        setattr(model_instance, self.attname, value)
+        return value
+
+
+class CounterField(models.PositiveIntegerField):
+    """
+    Counter maintained by updates of its row, such as the comment count of
+    an issue, see helpdesk.counters. Saving an existing row keeps the
+    counter of the database, so that it does not overwrite the changes made
+    since the row was loaded.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('editable', False)
+        kwargs.setdefault('default', 0)
+        super().__init__(*args, **kwargs)
+
+    def pre_save(self, model_instance, add):
+        if add:
+            return super().pre_save(model_instance, add)
+        return models.F(self.attname)
+
+
+# Values of an issue kept when it is loaded or saved, from which its changes
+# are counted by helpdesk.counters and helpdesk.stats
+SAVED_ISSUE_FIELDS = ('project_id', 'status', 'priority', 'tag',
+                      'assignee_id', 'created_time', 'status_time')
+
+
 class Project(models.Model):
     title = models.CharField(max_length=128)
     description = models.TextField(max_length=2048)
     type = models.CharField(choices=TYPE_CHOICES, max_length=128)
+    # Bumped with updated_time on every change of the project, its issues,
+    # comments or contributors, see helpdesk.conditional and
+    # helpdesk.changes
+    version = models.PositiveIntegerField(default=0)
+    updated_time = models.DateTimeField(auto_now=True)
 
 
 class Contributor(models.Model):
@@ -53,6 +124,14 @@ class Contributor(models.Model):
             models.UniqueConstraint(
                 fields=['user', 'project'], name='unique_user'),
         ]
+        indexes = [
+            # Memberships of a user, read from the index only
+            models.Index(fields=['user', 'project', 'permission'],
+                         name='contributor_user_project_perm'),
+            # Managers of a project
+            models.Index(fields=['project', 'permission'],
+                         name='contributor_project_perm'),
+        ]
 
 
 class Issue(models.Model):
@@ -60,6 +139,7 @@ class Issue(models.Model):
     desc = models.CharField(max_length=2048)
     tag = models.CharField(choices=TAG_CHOICES, max_length=128)
     priority = models.CharField(choices=PRIORITY_CHOICES, max_length=128)
+    priority_rank = PriorityRankField()
     project = models.ForeignKey(
         to=Project,
         related_name='issues',
@@ -72,9 +152,150 @@ class Issue(models.Model):
         to=settings.AUTH_USER_MODEL, on_delete=models.SET_NULL,
         related_name='assignee', null=True)
     created_time = models.DateTimeField(auto_now_add=True)
+    updated_time = models.DateTimeField(auto_now=True)
+    # Maintained by helpdesk.counters
+    comment_count = CounterField()
+    # Time the issue entered its status, for helpdesk.stats
+    status_time = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         ordering = ['created_time']
+        indexes = [
+            # Pages of the issues of a project
+            models.Index(fields=['project', 'created_time', 'id'],
+                         name='issue_project_created'),
+            # Pages of the issues of a project filtered on a field, or
+            # sorted by priority
+            models.Index(fields=['project', 'status', 'created_time', 'id'],
+                         name='issue_project_status'),
+            models.Index(fields=['project', 'priority_rank', 'created_time',
+                                 'id'],
+                         name='issue_project_priority'),
+            models.Index(fields=['project', 'tag', 'created_time', 'id'],
+                         name='issue_project_tag'),
+            models.Index(fields=['project', 'assignee', 'created_time', 'id'],
+                         name='issue_project_assignee'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Values the issue was last saved, or loaded, with, to count its
+        # changes, see helpdesk.counters, and status it was loaded with, to
+        # publish its status changes, see helpdesk.events
+        instance._saved_values = {
+            field: value for field, value in zip(field_names, values)
+            if field in SAVED_ISSUE_FIELDS}
+        instance._loaded_status = instance._saved_values.get('status')
+        return instance
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            saved = getattr(self, '_saved_values', {})
+            if saved.get('status', self.status) != self.status:
+                self.status_time = timezone.now()
+        super().save(*args, **kwargs)
+
+
+# Fields of the issues counted by value for each project
+COUNTED_ISSUE_FIELDS = (
+    ('status', STATUS_CHOICES),
+    ('priority', PRIORITY_CHOICES),
+    ('tag', TAG_CHOICES),
+)
+
+
+class IssueCounter(models.Model):
+    """
+    Number of issues of a project with a value of a field, maintained by
+    helpdesk.counters.
+    """
+    project = models.ForeignKey(
+        to=Project,
+        related_name='issue_counters',
+        on_delete=models.CASCADE)
+    field = models.CharField(max_length=16)
+    value = models.CharField(max_length=128)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['project', 'field', 'value'],
+                name='unique_issue_counter'),
+        ]
+
+
+class DailyIssueStat(models.Model):
+    """
+    Number of issues of a project opened on a day, and of the closed ones
+    which were closed on that day, maintained by helpdesk.stats.
+    """
+    project = models.ForeignKey(
+        to=Project,
+        related_name='daily_stats',
+        on_delete=models.CASCADE)
+    day = models.DateField()
+    opened = models.IntegerField(default=0)
+    closed = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            # Also the index of the days of a project
+            models.UniqueConstraint(
+                fields=['project', 'day'], name='unique_daily_stat'),
+        ]
+
+
+class StatusTimeStat(models.Model):
+    """
+    Time spent by the issues of a project in a status, maintained by
+    helpdesk.stats: the number and duration, in seconds, of the stays which
+    ended, and the number of issues in the status with the sum of the
+    timestamps they entered it at, which give the duration of the current
+    stays.
+    """
+    project = models.ForeignKey(
+        to=Project,
+        related_name='status_time_stats',
+        on_delete=models.CASCADE)
+    status = models.CharField(max_length=128)
+    stays = models.IntegerField(default=0)
+    seconds = models.BigIntegerField(default=0)
+    current = models.IntegerField(default=0)
+    entered = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['project', 'status'], name='unique_status_time_stat'),
+        ]
+
+
+class AssigneeStat(models.Model):
+    """
+    Number of issues of a project assigned to a user, maintained by
+    helpdesk.stats.
+    """
+    project = models.ForeignKey(
+        to=Project,
+        related_name='assignee_stats',
+        on_delete=models.CASCADE)
+    assignee = models.ForeignKey(
+        to=settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
+        related_name='+')
+    issues = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['project', 'assignee'], name='unique_assignee_stat'),
+        ]
+        indexes = [
+            # Top assignees of a project
+            models.Index(fields=['project', '-issues'],
+                         name='assignee_stat_project_issues'),
+        ]
 
 
 class Comment(models.Model):
@@ -86,6 +307,76 @@ class Comment(models.Model):
         related_name='comments',
         on_delete=models.CASCADE)
     created_time = models.DateTimeField(auto_now_add=True)
+    updated_time = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['created_time']
+        indexes = [
+            # Pages of the comments of an issue
+            models.Index(fields=['issue', 'created_time', 'id'],
+                         name='comment_issue_created'),
+        ]
+
+
+class Change(models.Model):
+    """
+    Change of a project or of one of its objects, numbered by the version of
+    the project it led to.
+    """
+    project = models.ForeignKey(
+        to=Project,
+        related_name='changes',
+        on_delete=models.CASCADE)
+    seq = models.PositiveIntegerField()
+    model = models.CharField(choices=CHANGE_MODEL_CHOICES, max_length=16)
+    object_id = models.PositiveIntegerField()
+    # Issue of the changed issue or comment, to locate the comments
+    issue_id = models.PositiveIntegerField(null=True)
+    action = models.CharField(choices=CHANGE_ACTION_CHOICES, max_length=16)
+    time = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            # Also the index of the changes since a seq
+            models.UniqueConstraint(
+                fields=['project', 'seq'], name='unique_change_seq'),
+        ]
+
+
+class ImportRun(models.Model):
+    """
+    Import of a project by the import_project command. The number of records
+    it imported is saved in the transaction of each batch, so that an
+    interrupted import resumes after its last committed batch.
+    """
+    source = models.CharField(max_length=1024)
+    project = models.ForeignKey(
+        to=Project,
+        related_name='import_runs',
+        null=True,
+        on_delete=models.CASCADE)
+    records = models.PositiveIntegerField(default=0)
+    finished = models.BooleanField(default=False)
+    created_time = models.DateTimeField(auto_now_add=True)
+    updated_time = models.DateTimeField(auto_now=True)
+
+
+class ImportedIssue(models.Model):
+    """
+    Issue created by an unfinished import, by its id in the imported
+    records, which the comments of the next batches refer to.
+    """
+    run = models.ForeignKey(
+        to=ImportRun,
+        related_name='issues',
+        on_delete=models.CASCADE)
+    source_id = models.CharField(max_length=128)
+    # Not a foreign key, so that the deletions of the issues do not look
+    # for their imports
+    issue_id = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['run', 'source_id'], name='unique_imported_issue'),
+        ]
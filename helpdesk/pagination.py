@@ -0,0 +1,204 @@
+import json
+from base64 import b64decode, b64encode
+from urllib import parse
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import (Cursor, CursorPagination,
+                                       LimitOffsetPagination)
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination seeking on every field of the ordering.
+
+    DRF's CursorPagination only keys on the first ordering field and skips
+    the rows sharing its value with an offset. Here the cursor carries the
+    value of each ordering field, so that every page is fetched with a single
+    range scan on the (created_time, id) index, whatever its depth.
+    """
+    ordering = ('created_time', 'id')
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+    # Orderings clients can select with the ordering query parameter, by
+    # name. Each one must end with a unique field.
+    ordering_query_param = 'ordering'
+    orderings = {}
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.fields = [
+            (name.lstrip('-'), name.startswith('-'),
+             queryset.model._meta.get_field(name.lstrip('-')))
+            for name in self.ordering
+        ]
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+
+        if reverse:
+            queryset = queryset.order_by(*[
+                name if descending else '-' + name
+                for name, descending, field in self.fields
+            ])
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if self.cursor is not None:
+            queryset = queryset.filter(
+                self.get_seek_filter(self.cursor.position, reverse))
+
+        results = list(queryset[:self.page_size + 1])
+        has_following = len(results) > self.page_size
+        self.page = results[:self.page_size]
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = True
+            self.has_previous = has_following
+        else:
+            self.has_next = has_following
+            self.has_previous = self.cursor is not None
+        return self.page
+
+    def get_ordering(self, request, queryset, view):
+        name = request.query_params.get(self.ordering_query_param)
+        if name is None:
+            return self.ordering
+        try:
+            return self.orderings[name]
+        except KeyError:
+            raise ValidationError({self.ordering_query_param: [
+                '"%s" is not a valid ordering.' % name]})
+
+    def get_seek_filter(self, position, reverse):
+        """
+        Returns the condition selecting the rows located after the position,
+        i.e. the lexicographic comparison of the ordering fields.
+        """
+        name, descending, field = self.fields[0]
+        lookup = 'lte' if descending != reverse else 'gte'
+        # Redundant bound on the first field, so that the database starts
+        # the index range scan at the position.
+        condition = Q(**{name + '__' + lookup: position[0]})
+        seek = Q()
+        equal = {}
+        for (name, descending, field), value in zip(self.fields, position):
+            lookup = 'lt' if descending != reverse else 'gt'
+            seek |= Q(**equal, **{name + '__' + lookup: value})
+            equal[name] = value
+        return condition & seek
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if self.page:
+            position = self._get_position_from_instance(self.page[-1])
+        else:
+            position = self.cursor.position
+        return self.encode_cursor(
+            Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.page:
+            position = self._get_position_from_instance(self.page[0])
+        else:
+            position = self.cursor.position
+        return self.encode_cursor(
+            Cursor(offset=0, reverse=True, position=position))
+
+    def _get_position_from_instance(self, instance, ordering=None):
+        return [field.value_to_string(instance)
+                for name, descending, field in self.fields]
+
+    def encode_cursor(self, cursor):
+        tokens = {'p': json.dumps(cursor.position)}
+        if cursor.reverse:
+            tokens['r'] = '1'
+        querystring = parse.urlencode(tokens, doseq=True)
+        encoded = b64encode(querystring.encode('ascii')).decode('ascii')
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            querystring = b64decode(encoded.encode('ascii')).decode('ascii')
+            tokens = parse.parse_qs(querystring, keep_blank_values=True)
+            reverse = bool(int(tokens.get('r', ['0'])[0]))
+            values = json.loads(tokens['p'][0])
+            if not isinstance(values, list) \
+                    or len(values) != len(self.fields):
+                raise ValueError
+            for (name, descending, field), value in zip(self.fields, values):
+                field.to_python(value)
+        except (TypeError, ValueError, KeyError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+        return Cursor(offset=0, reverse=reverse, position=values)
+
+
+class IssuePagination(KeysetPagination):
+    """
+    Keyset pagination of the issues, sorted by creation time or priority.
+    """
+    orderings = {
+        'created_time': ('created_time', 'id'),
+        '-created_time': ('-created_time', '-id'),
+        'priority': ('priority_rank', 'created_time', 'id'),
+        '-priority': ('-priority_rank', '-created_time', '-id'),
+    }
+
+
+class ChangePagination(KeysetPagination):
+    """
+    Keyset pagination of the changes of a project, in the order they were
+    made.
+    """
+    ordering = ('seq',)
+
+
+class SearchPagination(LimitOffsetPagination):
+    """
+    Limit/offset pagination of the ranked search results, which fetches one
+    more result than the limit to know if there is a next page, instead of
+    counting them all.
+    """
+    default_limit = 20
+    max_limit = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.offset = self.get_offset(request)
+        results = queryset[self.offset:self.offset + self.limit + 1]
+        self.has_next = len(results) > self.limit
+        return results[:self.limit]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        return replace_query_param(
+            url, self.offset_query_param, self.offset + self.limit)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
@@ -1,9 +1,39 @@
 from rest_framework import permissions
 
+from .memberships import get_memberships
 from .models import Contributor, Project, Issue, Comment
+from .pool import database_sync_to_async
 
 
-class IsProjectContributor(permissions.BasePermission):
+def get_project_id(obj):
+    """
+    Returns the id of the project a project, issue or comment belongs to.
+    """
+    if isinstance(obj, Project):
+        return obj.pk
+    elif isinstance(obj, Issue):
+        return obj.project_id
+    elif isinstance(obj, Comment):
+        return obj.issue.project_id
+
+
+class AsyncPermissionMixin:
+    """
+    Async object permission check of the async views.
+    """
+
+    async def ahas_object_permission(self, request, view, obj):
+        # The reads of a project only need the memberships, which are loaded
+        # in the thread pool. The other checks may query the database.
+        await get_memberships(request).aload()
+        if request.method in permissions.SAFE_METHODS \
+                and isinstance(obj, Project):
+            return self.has_object_permission(request, view, obj)
+        return await database_sync_to_async(self.has_object_permission)(
+            request, view, obj)
+
+
+class IsProjectContributor(AsyncPermissionMixin, permissions.BasePermission):
     """
     Custom permission to only allow project contributors to create or view
     issues or comments, and only author to edit or delete issues and comments.
@@ -15,21 +45,15 @@ class IsProjectContributor(permissions.BasePermission):
 
         if request.method in permissions.SAFE_METHODS\
                                 or request.method == 'POST':
-            if isinstance(obj, Project):
-                return Contributor.objects.filter(
-                    user=request.user, project=obj).exists()
-            elif isinstance(obj, Issue):
-                return Contributor.objects.filter(
-                    user=request.user, project=obj.project).exists()
-            elif isinstance(obj, Comment):
-                return Contributor.objects.filter(
-                    user=request.user, project=obj.issue.project).exists()
+            project_id = get_project_id(obj)
+            return project_id is not None \
+                and get_memberships(request).is_contributor(project_id)
         # Write permissions are only allowed to the author.
         else:
-            return obj.author == request.user
+            return obj.author_id == request.user.pk
 
 
-class IsProjectManager(permissions.BasePermission):
+class IsProjectManager(AsyncPermissionMixin, permissions.BasePermission):
     """
     Custom permission to only allow project manager to edit or delete
     a project, and create or delete project users.
@@ -40,47 +64,40 @@ class IsProjectManager(permissions.BasePermission):
         if request.method == 'POST':
             return True
 
-        elif Contributor.objects.filter(
-                user=request.user, project=obj).exists():
-            # View a project is only allowed to the project contributors.
-            if request.method in permissions.SAFE_METHODS:
-                return True
-
-            # Write permissions are only allowed to the project manager.
-            else:
-                return Contributor.objects.get(
-                        user=request.user, project=obj).permission == 'manager'
+        # View a project is only allowed to the project contributors.
+        elif request.method in permissions.SAFE_METHODS:
+            return get_memberships(request).is_contributor(obj.pk)
 
+        # Write permissions are only allowed to the project manager.
         else:
-            return False
+            return get_memberships(request).is_manager(obj.pk)
 
 
-class IsProjectManagerUser(permissions.BasePermission):
+class IsProjectManagerUser(AsyncPermissionMixin,
+                           permissions.BasePermission):
     """
     Custom permission to only allow only project manager to create or delete
     project users, and project contributors to view project users.
     """
 
     def has_object_permission(self, request, view, obj):
+        memberships = get_memberships(request)
+
         # Read permissions are allowed to project contributors
         if request.method in permissions.SAFE_METHODS:
-            return Contributor.objects.filter(
-                    user=request.user, project=obj).exists()
+            return memberships.is_contributor(obj.pk)
 
         # Delete is only allowed to project manager if there is at least 2
         # project managers registered for the project
         elif request.method == 'DELETE':
-            return Contributor.objects.filter(
-                    user=request.user, project=obj.project,
-                    permission='manager').exists() \
-                    and (Contributor.objects.filter(
-                        permission='manager', project=obj.project).count() > 1
-                        or obj.permission == 'contributeur')
+            return memberships.is_manager(obj.project_id) \
+                and (obj.permission == 'contributeur'
+                     or Contributor.objects.filter(
+                         permission='manager', project=obj.project_id
+                         ).count() > 1)
 
         # Create is only allowed to project manager
         elif request.method == 'POST':
-            return Contributor.objects.filter(
-                    user=request.user, project=obj, permission='manager'
-                    ).exists()
+            return memberships.is_manager(obj.pk)
         else:
             return False
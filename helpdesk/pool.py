@@ -0,0 +1,36 @@
+"""
+Database queries of the async views, run in the thread pool of asgiref,
+i.e. the default executor of the event loop, whose size, ASGI_THREADS or
+min(32, cpus + 4) threads, bounds the number of connections they keep.
+
+Unlike helpdesk.asynchronous, it does not import DRF, so that the
+authentication classes, which DRF settings import, can use it.
+"""
+from functools import update_wrapper
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+
+
+def release_connections():
+    """
+    Closes the connections of a thread of the pool which are broken, or
+    older than CONN_MAX_AGE, as Django does at the end of a request, since
+    the threads of the pool outlive the requests. The other ones are kept for
+    the next queries of the thread.
+    """
+    close_old_connections()
+
+
+def database_sync_to_async(func):
+    """
+    Wraps a sync function reading the database into a coroutine running it
+    in the thread pool.
+    """
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            release_connections()
+    return sync_to_async(update_wrapper(wrapper, func),
+                         thread_sensitive=False)
@@ -0,0 +1,92 @@
+"""
+Renderers and parsers of the API besides JSON:
+
+- MessagePack, a binary JSON, smaller and faster to decode on the clients,
+  negotiated with the application/msgpack media type or the msgpack format,
+- columnar JSON, whose lists of objects are rendered with their keys once
+  and their values as arrays, negotiated with the columnar format,
+- NDJSON, for the project exports.
+"""
+import json
+
+import msgpack
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Renders a list as newline delimited JSON, one item by line, and anything
+    else, e.g. an error, as a single line.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if not isinstance(data, list):
+            data = [data]
+        return ''.join(json.dumps(item) + '\n' for item in data).encode()
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Renders the data as MessagePack. The values which are not native to
+    MessagePack, e.g. the lazy translations of the errors, are converted as
+    for JSON.
+    """
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=JSONEncoder().default)
+
+
+class MessagePackParser(BaseParser):
+    media_type = 'application/msgpack'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read())
+        except ValueError as error:
+            raise ParseError('MessagePack parse error - %s' % error)
+
+
+def to_columns(data):
+    """
+    Returns the data with its lists of objects having the same keys, e.g.
+    the issues of a page, as {"columns": [keys], "rows": [[values], ...]}.
+    """
+    if isinstance(data, dict):
+        return {key: to_columns(value) for key, value in data.items()}
+    if isinstance(data, list) and data and isinstance(data[0], dict):
+        columns = list(data[0])
+        if all(isinstance(item, dict) and len(item) == len(columns)
+               and all(key in item for key in columns) for item in data):
+            return {'columns': columns,
+                    'rows': [[to_columns(item[key]) for key in columns]
+                             for item in data]}
+    if isinstance(data, list):
+        return [to_columns(item) for item in data]
+    return data
+
+
+class ColumnarJSONRenderer(JSONRenderer):
+    """
+    Renders the data as JSON, with the keys of the objects of its lists
+    once, see to_columns.
+    """
+    media_type = 'application/vnd.softdesk.columnar+json'
+    format = 'columnar'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return super().render(to_columns(data), accepted_media_type,
+                              renderer_context)
@@ -0,0 +1,367 @@
+"""
+Full-text search over the issues and the comments.
+
+Every issue (title and description) and every comment is a document of the
+search index, which is kept up to date by the signals of the models, and by
+the bulk and deletion helpers which bypass them. The index is stored by a
+backend picked from the database vendor, or from the HELPDESK_SEARCH_BACKEND
+setting:
+
+- SQLite: an FTS5 virtual table, ranked with bm25,
+- PostgreSQL: a table with a tsvector column and a GIN index, ranked with
+  ts_rank.
+
+The documents are keyed by the id of the issue doubled, or by the id of the
+comment doubled plus one, and carry the project and issue ids, so that the
+searches are scoped to the projects of the user within the index.
+"""
+import re
+from itertools import chain, islice
+
+from django.conf import settings
+from django.db import connection
+from django.utils.module_loading import import_string
+
+TABLE = 'helpdesk_search'
+
+TERM = re.compile(r'\w+\*?')
+
+
+def issue_key(pk):
+    return pk * 2
+
+
+def comment_key(pk):
+    return pk * 2 + 1
+
+
+def chunks(items, size=500):
+    items = iter(items)
+    chunk = list(islice(items, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(items, size))
+
+
+class SearchBackend:
+    """
+    Storage of the search index. The documents are (key, project id, issue
+    id, title, body) tuples.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def create(self):
+        raise NotImplementedError
+
+    def drop(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute('DROP TABLE IF EXISTS %s' % TABLE)
+
+    def clear(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute('DELETE FROM %s' % TABLE)
+
+    def optimize(self):
+        pass
+
+    def index(self, documents):
+        raise NotImplementedError
+
+    def remove(self, keys):
+        raise NotImplementedError
+
+    def remove_issues(self, issue_ids):
+        """
+        Removes the documents of the issues and of their comments.
+        """
+        raise NotImplementedError
+
+    def remove_project(self, project_id):
+        raise NotImplementedError
+
+    def search(self, terms, project_ids, offset, limit):
+        """
+        Returns the (key, score) of the documents matching all the terms,
+        the best first.
+        """
+        raise NotImplementedError
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """
+    FTS5 index, whose scope column holds a token for the project and one for
+    the issue of each document, so that the documents of a project or an
+    issue are deleted through the full-text index too.
+
+    The searches filter the matches on the project_id column instead of
+    the scope tokens: intersecting the few matches of a term with the
+    tokens of a large project costs more than reading the project of each
+    match.
+    """
+
+    # bm25 weights of the columns
+    rank = 'bm25(10.0, 1.0, 0.0, 0.0)'
+
+    def create(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                'CREATE VIRTUAL TABLE %s USING fts5(title, body, '
+                'project_id UNINDEXED, scope, '
+                'tokenize="unicode61 remove_diacritics 2")' % TABLE)
+
+    def optimize(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO %s(%s) VALUES ('optimize')" % (TABLE, TABLE))
+
+    def index(self, documents):
+        for chunk in chunks(documents):
+            self.remove([document[0] for document in chunk])
+            with self.connection.cursor() as cursor:
+                cursor.executemany(
+                    'INSERT INTO %s (rowid, title, body, project_id, scope) '
+                    'VALUES (%%s, %%s, %%s, %%s, %%s)' % TABLE,
+                    [(key, title, body, project_id,
+                      'p%d i%d' % (project_id, issue_id))
+                     for key, project_id, issue_id, title, body in chunk])
+
+    def remove(self, keys):
+        for chunk in chunks(keys):
+            with self.connection.cursor() as cursor:
+                cursor.execute(
+                    'DELETE FROM %s WHERE rowid IN (%s)'
+                    % (TABLE, ', '.join(['%s'] * len(chunk))), chunk)
+
+    def remove_issues(self, issue_ids):
+        for chunk in chunks(issue_ids):
+            with self.connection.cursor() as cursor:
+                cursor.execute(
+                    'DELETE FROM %s WHERE %s MATCH %%s' % (TABLE, TABLE),
+                    ['scope : (%s)' % ' OR '.join(
+                        'i%d' % pk for pk in chunk)])
+
+    def remove_project(self, project_id):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                'DELETE FROM %s WHERE %s MATCH %%s' % (TABLE, TABLE),
+                ['scope : p%d' % project_id])
+
+    def search(self, terms, project_ids, offset, limit):
+        if not project_ids:
+            return []
+        match = '{title body} : (%s)' % ' '.join(
+            '"%s"*' % term[:-1] if term.endswith('*') else '"%s"' % term
+            for term in terms)
+        projects = ', '.join(['%s'] * len(project_ids))
+        with self.connection.cursor() as cursor:
+            # Ranked by FTS5, the issue titles weighing more than the bodies
+            cursor.execute(
+                'SELECT rowid, rank FROM %s WHERE %s MATCH %%s '
+                'AND rank MATCH %%s AND project_id IN (%s) '
+                'ORDER BY rank LIMIT %%s OFFSET %%s'
+                % (TABLE, TABLE, projects),
+                [match, self.rank, *project_ids, limit, offset])
+            # bm25 is lower for better matches
+            return [(key, -score) for key, score in cursor.fetchall()]
+
+
+class PostgresSearchBackend(SearchBackend):
+    """
+    Table of tsvector documents with a GIN index, using the text search
+    configuration of the HELPDESK_SEARCH_CONFIG setting.
+    """
+
+    def get_config(self):
+        return getattr(settings, 'HELPDESK_SEARCH_CONFIG', 'simple')
+
+    def create(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                'CREATE TABLE %s (id bigint PRIMARY KEY, '
+                'project_id integer NOT NULL, issue_id integer NOT NULL, '
+                'document tsvector NOT NULL)' % TABLE)
+            cursor.execute('CREATE INDEX %s_document ON %s USING gin '
+                           '(document)' % (TABLE, TABLE))
+            cursor.execute('CREATE INDEX %s_project ON %s (project_id)'
+                           % (TABLE, TABLE))
+            cursor.execute('CREATE INDEX %s_issue ON %s (issue_id)'
+                           % (TABLE, TABLE))
+
+    def index(self, documents):
+        config = self.get_config()
+        for chunk in chunks(documents):
+            with self.connection.cursor() as cursor:
+                cursor.executemany(
+                    'INSERT INTO %s (id, project_id, issue_id, document) '
+                    "VALUES (%%s, %%s, %%s, setweight(to_tsvector(%%s::"
+                    "regconfig, %%s), 'A') || setweight(to_tsvector(%%s::"
+                    "regconfig, %%s), 'B')) ON CONFLICT (id) DO UPDATE SET "
+                    'document = EXCLUDED.document' % TABLE,
+                    [(key, project_id, issue_id, config, title, config, body)
+                     for key, project_id, issue_id, title, body in chunk])
+
+    def remove(self, keys):
+        with self.connection.cursor() as cursor:
+            cursor.execute('DELETE FROM %s WHERE id = ANY(%%s)' % TABLE,
+                           [list(keys)])
+
+    def remove_issues(self, issue_ids):
+        with self.connection.cursor() as cursor:
+            cursor.execute('DELETE FROM %s WHERE issue_id = ANY(%%s)'
+                           % TABLE, [list(issue_ids)])
+
+    def remove_project(self, project_id):
+        with self.connection.cursor() as cursor:
+            cursor.execute('DELETE FROM %s WHERE project_id = %%s' % TABLE,
+                           [project_id])
+
+    def search(self, terms, project_ids, offset, limit):
+        if not project_ids:
+            return []
+        query = ' & '.join('%s:*' % term[:-1] if term.endswith('*')
+                           else term for term in terms)
+        config = self.get_config()
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT id, ts_rank(document, query) AS score '
+                'FROM %s, to_tsquery(%%s::regconfig, %%s) query '
+                'WHERE document @@ query AND project_id = ANY(%%s) '
+                'ORDER BY score DESC, id LIMIT %%s OFFSET %%s' % TABLE,
+                [config, query, list(project_ids), limit, offset])
+            return cursor.fetchall()
+
+
+BACKENDS = {
+    'sqlite': SQLiteSearchBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+
+def get_backend(using=None):
+    """
+    Returns the search backend of the HELPDESK_SEARCH_BACKEND setting, a
+    dotted path, or the one of the database vendor.
+    """
+    using = using or connection
+    path = getattr(settings, 'HELPDESK_SEARCH_BACKEND', None)
+    if path:
+        return import_string(path)(using)
+    return BACKENDS[using.vendor](using)
+
+
+def parse_query(query):
+    """
+    Returns the terms of a search query, words which may end with a * to
+    match their prefix.
+    """
+    return TERM.findall(query)
+
+
+def issue_documents(issues):
+    return [(issue_key(issue.pk), issue.project_id, issue.pk, issue.title,
+             issue.desc) for issue in issues]
+
+
+def comment_documents(comments):
+    return [(comment_key(comment.pk), comment.issue.project_id,
+             comment.issue_id, '', comment.description)
+            for comment in comments]
+
+
+def index_issues(issues):
+    get_backend().index(issue_documents(issues))
+
+
+def index_comments(comments):
+    get_backend().index(comment_documents(comments))
+
+
+def remove_issues(issue_ids):
+    get_backend().remove_issues(issue_ids)
+
+
+def remove_comments(comment_ids):
+    get_backend().remove([comment_key(pk) for pk in comment_ids])
+
+
+def remove_project(project_id):
+    get_backend().remove_project(project_id)
+
+
+def rebuild(issues, comments, batch_size=2000, using=None):
+    """
+    Replaces the index with the documents of the issues and comments
+    querysets, and returns their number.
+    """
+    backend = get_backend(using)
+    backend.clear()
+    issue_rows = issues.values_list('pk', 'project_id', 'title', 'desc')
+    comment_rows = comments.values_list(
+        'pk', 'issue__project_id', 'issue_id', 'description')
+    documents = chain(
+        ((issue_key(pk), project_id, pk, title, desc)
+         for pk, project_id, title, desc in issue_rows.iterator(batch_size)),
+        ((comment_key(pk), project_id, issue_id, '', description)
+         for pk, project_id, issue_id, description
+         in comment_rows.iterator(batch_size)))
+    count = 0
+    for batch in chunks(documents, batch_size):
+        backend.index(batch)
+        count += len(batch)
+    backend.optimize()
+    return count
+
+
+class SearchResults:
+    """
+    Lazy results of a search, which are fetched when sliced, e.g. by a
+    paginator, as dicts with the matching issue or comment.
+    """
+
+    def __init__(self, terms, project_ids):
+        self.terms = terms
+        self.project_ids = sorted(project_ids)
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice) or item.step:
+            raise TypeError('Search results only support slices.')
+        start = item.start or 0
+        hits = get_backend().search(
+            self.terms, self.project_ids, start, item.stop - start)
+        return self.load(hits)
+
+    def load(self, hits):
+        from .models import Comment, Issue
+
+        issues = Issue.objects.only(
+            'project', 'title', 'desc').in_bulk(
+                [key // 2 for key, score in hits if not key % 2])
+        comments = Comment.objects.select_related('issue').only(
+            'description', 'issue__project', 'issue__title').in_bulk(
+                [key // 2 for key, score in hits if key % 2])
+        results = []
+        for key, score in hits:
+            if key % 2:
+                comment = comments.get(key // 2)
+                if comment is None:
+                    continue
+                issue = comment.issue
+                result = {'type': 'comment', 'id': comment.pk,
+                          'text': comment.description}
+            else:
+                issue = issues.get(key // 2)
+                if issue is None:
+                    continue
+                result = {'type': 'issue', 'id': issue.pk,
+                          'text': issue.desc}
+            result.update({'project_id': issue.project_id,
+                           'issue_id': issue.pk, 'title': issue.title,
+                           'score': score})
+            results.append(result)
+        return results
+
+
+def search(terms, project_ids):
+    return SearchResults(terms, project_ids)
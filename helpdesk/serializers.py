@@ -3,7 +3,8 @@ from django.contrib.auth.models import User
 from rest_framework import serializers
 from rest_framework.validators import UniqueTogetherValidator
 
-from .models import Contributor, Project, Issue, Comment
+from .counters import get_issue_counts
+from .models import Change, Contributor, Project, Issue, Comment
 
 
 class ContributorSerializer(serializers.ModelSerializer):
@@ -23,16 +24,47 @@ class ContributorSerializer(serializers.ModelSerializer):
 
 
 class ProjectSerializer(serializers.ModelSerializer):
+
+    # Role and permission of the request user on the project
+    role = serializers.ReadOnlyField()
+    permission = serializers.ReadOnlyField()
+    # Issue counts by status, priority and tag, read from the counters
+    issue_counts = serializers.SerializerMethodField()
+
     class Meta:
         model = Project
-        fields = ['id', 'title', 'description', 'type']
+        fields = ['id', 'title', 'description', 'type', 'role', 'permission',
+                  'issue_counts']
+
+    def get_issue_counts(self, project):
+        return get_issue_counts(project)
+
+
+class AssigneeField(serializers.SlugRelatedField):
+    """
+    Username of the assignee of an issue. When the serializer context
+    provides the project contributors, by username, the assignee is looked up
+    among them instead of being queried.
+    """
+
+    def to_internal_value(self, data):
+        contributors = self.context.get('contributors')
+        if contributors is None:
+            return super().to_internal_value(data)
+        try:
+            return contributors[data]
+        except (KeyError, TypeError):
+            error_message = 'The assignee '\
+                            + str(data)\
+                            + ' is not registered for the project.'
+            raise serializers.ValidationError(error_message)
 
 
 class IssueSerializer(serializers.ModelSerializer):
 
     issue_id = serializers.ReadOnlyField(source='id')
     author = serializers.ReadOnlyField(source='author.username')
-    assignee = serializers.SlugRelatedField(
+    assignee = AssigneeField(
         queryset=User.objects.all(),
         slug_field='username',
         default=serializers.CurrentUserDefault()
@@ -41,15 +73,20 @@ class IssueSerializer(serializers.ModelSerializer):
     class Meta:
         model = Issue
         fields = ['issue_id', 'title', 'desc', 'tag', 'priority',
-                  'status', 'author', 'assignee', 'created_time']
+                  'status', 'author', 'assignee', 'created_time',
+                  'comment_count']
 
     def validate_assignee(self, assignee):
         """
         Checks if the assignee is registered as a project contributor
         """
-        user_id = User.objects.get(username=assignee).id
-        if not Contributor.objects.filter(
-                       user=user_id, project=self.context['project']).exists():
+        contributors = self.context.get('contributors')
+        if contributors is not None:
+            registered = assignee.username in contributors
+        else:
+            registered = Contributor.objects.filter(
+                user=assignee.pk, project=self.context['project']).exists()
+        if not registered:
             error_message = 'The assignee '\
                             + str(assignee)\
                             + ' is not registered for the project.'
@@ -63,3 +100,43 @@ class CommentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Comment
         fields = ['id', 'description', 'author', 'created_time']
+
+
+class SearchResultSerializer(serializers.Serializer):
+    """
+    Issue or comment matching a search, with the issue it belongs to.
+    """
+    type = serializers.CharField()
+    id = serializers.IntegerField()
+    project_id = serializers.IntegerField()
+    issue_id = serializers.IntegerField()
+    title = serializers.CharField()
+    text = serializers.CharField()
+    score = serializers.FloatField()
+
+
+class ChangeSerializer(serializers.ModelSerializer):
+    """
+    Change of a project, with the current data of the changed object, or
+    null if it was deleted since. The objects are given by the context, by
+    (model, id).
+    """
+    data = serializers.SerializerMethodField()
+
+    object_serializers = {
+        'project': ProjectSerializer,
+        'issue': IssueSerializer,
+        'comment': CommentSerializer,
+        'contributor': ContributorSerializer,
+    }
+
+    class Meta:
+        model = Change
+        fields = ['seq', 'model', 'object_id', 'issue_id', 'action', 'time',
+                  'data']
+
+    def get_data(self, change):
+        obj = self.context['objects'].get((change.model, change.object_id))
+        if obj is None:
+            return None
+        return self.object_serializers[change.model](obj).data
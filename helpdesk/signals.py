@@ -0,0 +1,98 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import changes, counters, events, search
+from .memberships import invalidate_memberships
+from .models import Change, Comment, Contributor, Issue, Project
+
+
+@receiver(post_save, sender=Contributor)
+@receiver(post_delete, sender=Contributor)
+def invalidate_contributor_memberships(sender, instance, **kwargs):
+    invalidate_memberships(instance.user_id)
+    events.publish_memberships(instance.user_id)
+
+
+@receiver(post_save, sender=Issue)
+def index_issue(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or {'title', 'desc'} & set(update_fields):
+        search.index_issues([instance])
+
+
+@receiver(post_delete, sender=Issue)
+def unindex_issue(sender, instance, **kwargs):
+    search.remove_issues([instance.pk])
+
+
+@receiver(post_save, sender=Comment)
+def index_comment(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or 'description' in update_fields:
+        search.index_comments([instance])
+
+
+@receiver(post_delete, sender=Comment)
+def unindex_comment(sender, instance, **kwargs):
+    search.remove_comments([instance.pk])
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=Issue)
+@receiver(post_save, sender=Comment)
+@receiver(post_save, sender=Contributor)
+def record_save(sender, instance, created, **kwargs):
+    changes.record_instance(instance, 'create' if created else 'update')
+
+
+@receiver(post_delete, sender=Issue)
+@receiver(post_delete, sender=Comment)
+@receiver(post_delete, sender=Contributor)
+def record_delete(sender, instance, **kwargs):
+    changes.record_instance(instance, 'delete')
+
+
+@receiver(post_delete, sender=Project)
+def delete_project_changes(sender, instance, **kwargs):
+    # The deletions of the objects of a project deleted by the collector are
+    # recorded after its changes were collected, and before it is deleted
+    Change.objects.filter(project=instance.pk).delete()
+
+
+@receiver(post_save, sender=Issue)
+def publish_issue(sender, instance, created, **kwargs):
+    events.publish_issues([instance], created)
+
+
+@receiver(post_save, sender=Comment)
+def publish_comment(sender, instance, created, **kwargs):
+    if created:
+        events.publish_comments([instance], instance.issue.project_id)
+
+
+@receiver(post_save, sender=Project)
+def create_project_counters(sender, instance, created, **kwargs):
+    if created:
+        counters.create_counters(instance.pk)
+
+
+@receiver(post_save, sender=Issue)
+def count_issue(sender, instance, created, **kwargs):
+    if created:
+        counters.count_issues([instance])
+    else:
+        counters.count_issue_updates([instance])
+
+
+@receiver(post_delete, sender=Issue)
+def uncount_issue(sender, instance, **kwargs):
+    counters.count_issues([instance], -1)
+
+
+@receiver(post_save, sender=Comment)
+def count_comment(sender, instance, created, **kwargs):
+    if created:
+        counters.count_comments(instance.issue_id)
+
+
+@receiver(post_delete, sender=Comment)
+def uncount_comment(sender, instance, **kwargs):
+    counters.count_comments(instance.issue_id, -1)
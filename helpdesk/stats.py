@@ -0,0 +1,223 @@
+"""
+Statistics of the projects, read from aggregates updated along with the
+issue counters, see helpdesk.counters, so that their cost does not depend on
+the number of issues:
+
+- the issues opened and closed each day, by DailyIssueStat,
+- the time spent by the issues in each status, by StatusTimeStat,
+- the number of issues of each assignee, by AssigneeStat.
+
+The aggregates are rebuilt from the issues by the rebuild_stats command,
+which keeps the durations of the ended stays, as the issues only keep the
+time they entered their current status.
+"""
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import (CLOSED_STATUS, STATUS_CHOICES, AssigneeStat,
+                     DailyIssueStat, Issue, StatusTimeStat)
+
+# Values of an issue which the statistics depend on
+STATS_FIELDS = ('project_id', 'status', 'status_time', 'created_time',
+                'assignee_id')
+
+
+def get_max_days():
+    return getattr(settings, 'HELPDESK_STATS_MAX_DAYS', 365)
+
+
+def get_top_assignees():
+    return getattr(settings, 'HELPDESK_STATS_TOP_ASSIGNEES', 5)
+
+
+def get_cache():
+    return caches[getattr(settings, 'HELPDESK_STATS_CACHE', 'default')]
+
+
+def get_cache_timeout():
+    return getattr(settings, 'HELPDESK_STATS_CACHE_TIMEOUT', 60)
+
+
+def timestamp(time):
+    return int(time.timestamp())
+
+
+def increment(model, lookup, **deltas):
+    """
+    Adds the deltas to the fields of the row of the model matching the
+    lookup. The row is created when there is none and one of the deltas is
+    positive, so that the rows of the deleted projects are not created again
+    by the deletion of their issues.
+
+    The row is created in a savepoint, and updated when a concurrent
+    transaction created it first, failing its unique constraint.
+    """
+    if not any(deltas.values()):
+        return
+    queryset = model.objects.filter(**lookup)
+    values = {field: F(field) + delta for field, delta in deltas.items()}
+    if queryset.update(**values) or max(deltas.values()) <= 0:
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **deltas)
+    except IntegrityError:
+        queryset.update(**values)
+
+
+class StatsDeltas:
+    """
+    Changes of the aggregates of the statistics, by project.
+    """
+
+    def __init__(self):
+        # (opened, closed) by project and day
+        self.daily = defaultdict(Counter)
+        # (stays, seconds, current, entered) by project and status
+        self.status_time = defaultdict(Counter)
+        # Issues by project and assignee
+        self.assignees = Counter()
+
+    def add_issue(self, values, delta=1):
+        """
+        Adds an issue, given by its STATS_FIELDS values, to the aggregates,
+        or removes it with a delta of -1.
+        """
+        project_id = values['project_id']
+        day = timezone.localdate(values['created_time'])
+        self.daily[project_id, day]['opened'] += delta
+        if values['status'] == CLOSED_STATUS:
+            day = timezone.localdate(values['status_time'])
+            self.daily[project_id, day]['closed'] += delta
+        status_time = self.status_time[project_id, values['status']]
+        status_time['current'] += delta
+        status_time['entered'] += delta * timestamp(values['status_time'])
+        if values['assignee_id'] is not None:
+            self.assignees[project_id, values['assignee_id']] += delta
+
+    def update_issue(self, previous, values):
+        """
+        Moves an updated issue from its previous values, ending its stay in
+        its previous status if it changed.
+        """
+        if all(previous[field] == values[field] for field in STATS_FIELDS):
+            return
+        if previous['status'] != values['status']:
+            status_time = self.status_time[
+                previous['project_id'], previous['status']]
+            status_time['stays'] += 1
+            status_time['seconds'] += timestamp(values['status_time']) \
+                - timestamp(previous['status_time'])
+        self.add_issue(previous, -1)
+        self.add_issue(values)
+
+    def save(self):
+        with transaction.atomic():
+            for (project_id, day), deltas in self.daily.items():
+                increment(DailyIssueStat, {'project_id': project_id,
+                                           'day': day}, **deltas)
+            for (project_id, status), deltas in self.status_time.items():
+                increment(StatusTimeStat, {'project_id': project_id,
+                                           'status': status}, **deltas)
+            for (project_id, assignee_id), delta in self.assignees.items():
+                increment(AssigneeStat, {'project_id': project_id,
+                                         'assignee_id': assignee_id},
+                          issues=delta)
+
+
+def get_stats(project, days=30):
+    """
+    Returns the statistics of a project, with the issues opened and closed
+    on each of the last days.
+    """
+    today = timezone.localdate()
+    first_day = today - timedelta(days=days - 1)
+    daily = {
+        stat.day: stat for stat in DailyIssueStat.objects.filter(
+            project=project.pk, day__gte=first_day, day__lte=today)}
+    throughput = []
+    for i in range(days):
+        day = first_day + timedelta(days=i)
+        stat = daily.get(day)
+        throughput.append({
+            'day': day.isoformat(),
+            'opened': stat.opened if stat else 0,
+            'closed': stat.closed if stat else 0,
+        })
+
+    now = timestamp(timezone.now())
+    status_time = {status: {'issues': 0, 'stays': 0, 'seconds': 0,
+                            'average_seconds': None}
+                   for status, label in STATUS_CHOICES}
+    for stat in StatusTimeStat.objects.filter(project=project.pk):
+        stays = stat.stays + stat.current
+        seconds = stat.seconds + stat.current * now - stat.entered
+        status_time[stat.status] = {
+            'issues': stat.current,
+            'stays': stays,
+            'seconds': seconds,
+            'average_seconds': seconds // stays if stays else None,
+        }
+
+    top_assignees = AssigneeStat.objects.filter(
+        project=project.pk, issues__gt=0).select_related(
+            'assignee').order_by('-issues', 'assignee')[:get_top_assignees()]
+    return {
+        'throughput': throughput,
+        'status_time': status_time,
+        'top_assignees': [{'assignee': stat.assignee.username,
+                           'issues': stat.issues}
+                          for stat in top_assignees],
+    }
+
+
+def get_cached_stats(project, days=30):
+    """
+    Returns the statistics of a project, cached until the project changes,
+    or at most HELPDESK_STATS_CACHE_TIMEOUT seconds, as the durations of the
+    current stays grow with time.
+    """
+    key = 'helpdesk:stats:%s:%s:%s' % (project.pk, project.version, days)
+    cache = get_cache()
+    stats = cache.get(key)
+    if stats is None:
+        stats = get_stats(project, days)
+        cache.set(key, stats, get_cache_timeout())
+    return stats
+
+
+def rebuild(projects):
+    """
+    Rebuilds the aggregates of the projects from their issues. The ended
+    stays, which the issues do not keep, are left as they are.
+    """
+    project_ids = list(projects.values_list('pk', flat=True))
+    deltas = StatsDeltas()
+    issues = Issue.objects.filter(project__in=project_ids).values_list(
+        *STATS_FIELDS)
+    with transaction.atomic():
+        for values in issues.iterator():
+            deltas.add_issue(dict(zip(STATS_FIELDS, values)))
+        DailyIssueStat.objects.filter(project__in=project_ids).delete()
+        DailyIssueStat.objects.bulk_create([
+            DailyIssueStat(project_id=project_id, day=day, **counts)
+            for (project_id, day), counts in deltas.daily.items()],
+            batch_size=500)
+        AssigneeStat.objects.filter(project__in=project_ids).delete()
+        AssigneeStat.objects.bulk_create([
+            AssigneeStat(project_id=project_id, assignee_id=assignee_id,
+                         issues=count)
+            for (project_id, assignee_id), count in deltas.assignees.items()],
+            batch_size=500)
+        StatusTimeStat.objects.filter(project__in=project_ids).update(
+            current=0, entered=0)
+        for (project_id, status), counts in deltas.status_time.items():
+            StatusTimeStat.objects.update_or_create(
+                project_id=project_id, status=status, defaults=counts)
+    return len(project_ids)
@@ -0,0 +1,169 @@
+"""
+ASGI application streaming the activity of the projects of a user as
+Server-Sent Events, routed by softdesk.asgi at /api/events/.
+
+The stream is authenticated with the access token of the API. It carries the
+events of the projects the user contributes to, or of the projects of the
+"project" query parameters, until the client disconnects. It is closed with
+an "overflow" event when the client does not keep up with its events, the
+client resyncing from the change feed of its projects, and after a
+"memberships" event when the projects of the user change, the client
+reconnecting to follow its new projects.
+"""
+import asyncio
+import json
+from urllib.parse import parse_qs
+
+from django.conf import settings
+from rest_framework import exceptions
+from rest_framework.settings import api_settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from . import events
+from .memberships import load_permissions
+from .pool import database_sync_to_async
+
+OVERFLOW = events.encode('overflow', {})
+MEMBERSHIPS = b'event: memberships\n'
+
+
+class StreamError(Exception):
+
+    def __init__(self, status, detail):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+
+
+def get_header(scope, name):
+    for key, value in scope['headers']:
+        if key == name:
+            return value
+    return None
+
+
+def get_authentication():
+    """
+    Returns the JWT authentication of the API, e.g. the stateless one of
+    users.authentication.
+    """
+    for authentication_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        if issubclass(authentication_class, JWTAuthentication):
+            return authentication_class()
+    return JWTAuthentication()
+
+
+def authorize(scope):
+    """
+    Returns the user of the request and the ids of the projects to stream.
+    """
+    authentication = get_authentication()
+    try:
+        header = get_header(scope, b'authorization')
+        raw_token = header and authentication.get_raw_token(header)
+        if not raw_token:
+            raise exceptions.NotAuthenticated()
+        user = authentication.get_user(
+            authentication.get_validated_token(raw_token))
+    except exceptions.APIException as exc:
+        raise StreamError(401, str(exc.detail))
+
+    project_ids = set(load_permissions(user.pk))
+
+    query = parse_qs(scope['query_string'].decode())
+    if 'project' in query:
+        try:
+            requested = {int(value) for value in query['project']}
+        except ValueError:
+            raise StreamError(400, 'A valid integer is required.')
+        if not requested <= project_ids:
+            raise StreamError(
+                403, 'You do not have permission to perform this action.')
+        project_ids = requested
+    return user, project_ids
+
+
+class EventStream:
+
+    def __init__(self, backend=None):
+        self.backend = backend
+
+    async def __call__(self, scope, receive, send):
+        # Authorized in the thread pool, which keeps the connection for its
+        # next queries up to CONN_MAX_AGE
+        try:
+            user, project_ids = await database_sync_to_async(authorize)(scope)
+        except StreamError as exc:
+            await self.send_error(send, exc)
+            return
+
+        backend = self.backend or events.get_backend()
+        channels = [events.project_channel(project_id)
+                    for project_id in sorted(project_ids)]
+        channels.append(events.user_channel(user.pk))
+        subscription = backend.subscribe(channels, events.get_queue_size())
+        try:
+            await send({
+                'type': 'http.response.start',
+                'status': 200,
+                'headers': [
+                    (b'content-type', b'text/event-stream'),
+                    (b'cache-control', b'no-cache'),
+                    (b'x-accel-buffering', b'no'),
+                ],
+            })
+            await send({'type': 'http.response.body', 'body': b': ok\n\n',
+                        'more_body': True})
+            # The disconnection of the client cancels the stream
+            task = asyncio.current_task()
+
+            def cancel(future):
+                task.cancel()
+
+            disconnected = asyncio.ensure_future(self.disconnected(receive))
+            disconnected.add_done_callback(cancel)
+            try:
+                await self.stream(subscription, send)
+                await send({'type': 'http.response.body', 'body': b''})
+            except asyncio.CancelledError:
+                if not disconnected.done() or disconnected.cancelled():
+                    raise
+            finally:
+                disconnected.remove_done_callback(cancel)
+                disconnected.cancel()
+        finally:
+            subscription.close()
+
+    async def stream(self, subscription, send):
+        """
+        Sends the events of the subscription until it is closed, or a
+        keep-alive comment when no event comes in time.
+        """
+        heartbeat = getattr(settings, 'HELPDESK_EVENTS_HEARTBEAT', 15)
+        while True:
+            messages = await subscription.get(heartbeat)
+            closing = subscription.overflowed or any(
+                message.startswith(MEMBERSHIPS) for message in messages)
+            if subscription.overflowed:
+                # The client resyncs from the change feed
+                messages = [OVERFLOW]
+            body = b''.join(messages) or b': ping\n\n'
+            await send({'type': 'http.response.body', 'body': body,
+                        'more_body': True})
+            if closing:
+                return
+
+    async def disconnected(self, receive):
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+
+    async def send_error(self, send, exc):
+        headers = [(b'content-type', b'application/json')]
+        if exc.status == 401:
+            headers.append((b'www-authenticate', b'Bearer realm="api"'))
+        await send({'type': 'http.response.start', 'status': exc.status,
+                    'headers': headers})
+        await send({'type': 'http.response.body',
+                    'body': json.dumps({'detail': exc.detail}).encode()})
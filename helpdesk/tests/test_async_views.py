@@ -0,0 +1,192 @@
+import asyncio
+import json
+import time
+
+from asgiref.sync import async_to_sync
+from django.db import connections
+from django.test import AsyncClient, TransactionTestCase, override_settings
+from django.urls import resolve, reverse
+from django.contrib.auth.models import User
+from django.contrib.auth.hashers import make_password
+
+from ..models import Project, Contributor, Issue, Comment
+from ..pool import database_sync_to_async
+
+
+class AsyncViewsTest(TransactionTestCase):
+    """
+    Compares the responses of the async views of softdesk.asgi_urls to the
+    ones of the sync views.
+    """
+
+    reset_sequences = True
+
+    def setUp(self):
+        User.objects.create(username='user1', password=make_password('user1'))
+        User.objects.create(username='user2', password=make_password('user2'))
+
+        Project.objects.create(title='title1', description='description1',
+                               type='projet')
+        Project.objects.create(title='title2', description='description2',
+                               type='projet')
+
+        Contributor.objects.create(
+            user=User.objects.get(pk=1),
+            project=Project.objects.get(pk=1),
+            permission='manager',
+            role='manager',
+        )
+
+        for priority in ('faible', 'haute', 'moyenne'):
+            Issue.objects.create(
+                title='title ' + priority,
+                desc='description',
+                tag='bug',
+                priority=priority,
+                project=Project.objects.get(pk=1),
+                status='a faire',
+                author=User.objects.get(pk=1),
+                assignee=User.objects.get(pk=1),
+            )
+
+        Issue.objects.create(
+            title='title2',
+            desc='description2',
+            tag='bug',
+            priority='moyenne',
+            project=Project.objects.get(pk=2),
+            status='a faire',
+            author=User.objects.get(pk=1),
+            assignee=User.objects.get(pk=1),
+        )
+
+        for i in range(3):
+            Comment.objects.create(
+                description='comment' + str(i),
+                issue=Issue.objects.get(pk=1),
+                author=User.objects.get(pk=1),
+            )
+
+        self.auth_url = reverse('token_obtain')
+        self.token_user1 = self.get_token('user1', 'user1')
+        self.token_user2 = self.get_token('user2', 'user2')
+
+    def get_token(self, username, password):
+        post = {'username': username, 'password': password}
+        response = self.client.post(self.auth_url, post)
+        data = json.loads(response.content)
+        return data['access']
+
+    @override_settings(ROOT_URLCONF='softdesk.asgi_urls')
+    @async_to_sync
+    async def async_get(self, url, token, **headers):
+        return await AsyncClient().get(
+            url, authorization='Bearer ' + token, **headers)
+
+    def sync_get(self, url, token):
+        return self.client.get(url, HTTP_AUTHORIZATION='Bearer ' + token)
+
+    def assertSameResponses(self, url, token=None, status_code=200):
+        token = token or self.token_user1
+        sync_response = self.sync_get(url, token)
+        async_response = self.async_get(url, token)
+        self.assertEquals(sync_response.status_code, status_code)
+        self.assertEquals(async_response.status_code, status_code)
+        self.assertEquals(async_response.content, sync_response.content)
+        self.assertEquals(async_response.get('ETag'),
+                          sync_response.get('ETag'))
+
+    def test_async_views(self):
+        for url in ('/api/projects/', '/api/projects/1/',
+                    '/api/projects/1/issues/',
+                    '/api/projects/1/issues/1/',
+                    '/api/projects/1/issues/1/comments/',
+                    '/api/projects/1/issues/1/comments/1/'):
+            match = resolve(url, 'softdesk.asgi_urls')
+            self.assertTrue(asyncio.iscoroutinefunction(match.func), url)
+            self.assertFalse(asyncio.iscoroutinefunction(resolve(url).func))
+
+    def test_projects(self):
+        self.assertSameResponses('/api/projects/')
+        self.assertSameResponses('/api/projects/1/')
+        self.assertSameResponses('/api/projects/2/', status_code=403)
+        self.assertSameResponses('/api/projects/3/', status_code=404)
+
+    def test_issues(self):
+        self.assertSameResponses('/api/projects/1/issues/')
+        self.assertSameResponses(
+            '/api/projects/1/issues/?ordering=priority&page_size=2')
+        self.assertSameResponses(
+            '/api/projects/1/issues/?priority=wrong', status_code=400)
+        self.assertSameResponses('/api/projects/1/issues/2/')
+        self.assertSameResponses('/api/projects/2/issues/', status_code=403)
+        self.assertSameResponses('/api/projects/1/issues/4/', status_code=404)
+        self.assertSameResponses('/api/projects/2/issues/4/', status_code=403)
+
+    def test_comments(self):
+        self.assertSameResponses('/api/projects/1/issues/1/comments/')
+        self.assertSameResponses(
+            '/api/projects/1/issues/1/comments/?page_size=2')
+        self.assertSameResponses('/api/projects/1/issues/1/comments/3/')
+        self.assertSameResponses('/api/projects/1/issues/2/comments/')
+        self.assertSameResponses(
+            '/api/projects/1/issues/4/comments/', status_code=404)
+        self.assertSameResponses(
+            '/api/projects/1/issues/2/comments/1/', status_code=404)
+        self.assertSameResponses('/api/projects/1/issues/1/comments/',
+                                 self.token_user2, status_code=403)
+
+    def test_not_authenticated(self):
+        response = self.async_get('/api/projects/', 'invalid')
+        self.assertEquals(response.status_code, 401)
+        self.assertIn('WWW-Authenticate', response)
+
+    def test_not_modified(self):
+        url = '/api/projects/1/issues/'
+        etag = self.async_get(url, self.token_user1)['ETag']
+        response = self.async_get(url, self.token_user1,
+                                  **{'if-none-match': etag})
+        self.assertEquals(response.status_code, 304)
+        self.assertEquals(response['ETag'], etag)
+
+    def test_not_modified_missing(self):
+        for url in ('/api/projects/1/issues/4/',
+                    '/api/projects/1/issues/4/comments/',
+                    '/api/projects/1/issues/1/comments/9/'):
+            response = self.async_get(url, self.token_user1,
+                                      **{'if-none-match': '*'})
+            self.assertEquals(response.status_code, 404)
+        response = self.async_get('/api/projects/1/issues/1/',
+                                  self.token_user1, **{'if-none-match': '*'})
+        self.assertEquals(response.status_code, 304)
+
+    @async_to_sync
+    async def test_release_connections(self):
+        def query(expired):
+            connection = connections['default']
+            Project.objects.exists()
+            if expired:
+                connection.close_at = time.monotonic() - 1
+            return connection
+
+        # Kept by the thread until CONN_MAX_AGE
+        connection = await database_sync_to_async(query)(False)
+        self.assertIsNotNone(connection.connection)
+        connection = await database_sync_to_async(query)(True)
+        self.assertIsNone(connection.connection)
+
+    @override_settings(ROOT_URLCONF='softdesk.asgi_urls')
+    @async_to_sync
+    async def test_other_methods(self):
+        # The writes are served by the sync views, HEAD by the async ones
+        client = AsyncClient()
+        response = await client.post(
+            '/api/projects/1/issues/1/comments/',
+            json.dumps({'description': 'comment'}),
+            content_type='application/json',
+            authorization='Bearer ' + self.token_user1)
+        self.assertEquals(response.status_code, 201)
+        response = await client.head(
+            '/api/projects/1/issues/1/comments/',
+            authorization='Bearer ' + self.token_user1)
+        self.assertEquals(response.status_code, 200)
@@ -0,0 +1,141 @@
+import json
+
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.contrib.auth.hashers import make_password
+from rest_framework_simplejwt.tokens import AccessToken, UntypedToken
+
+from ..models import Project, Contributor, Issue
+from .test_memberships import use_shared_cache
+
+
+class StatelessAuthenticationTest(TestCase):
+
+    def setUp(self):
+        # The version of the memberships is read from the shared cache
+        use_shared_cache(self)
+        User.objects.create(username='user1', password=make_password('user1'))
+        User.objects.create(username='user2', password=make_password('user2'))
+
+        Project.objects.create(title='title1', description='description1',
+                               type='projet')
+
+        Contributor.objects.create(
+            user=User.objects.get(pk=1),
+            project=Project.objects.get(pk=1),
+            permission='manager',
+            role='manager',
+        )
+
+        Issue.objects.create(
+            title='title1',
+            desc='description1',
+            tag='bug',
+            priority='moyenne',
+            project=Project.objects.get(pk=1),
+            status='a faire',
+            author=User.objects.get(pk=1),
+            assignee=User.objects.get(pk=1),
+        )
+
+        self.issues_url = '/api/projects/1/issues/'
+        self.auth_url = reverse('token_obtain')
+
+        self.token_user1 = self.get_token('user1', 'user1')
+        self.client_user1 = Client(
+            HTTP_AUTHORIZATION='Bearer '+self.token_user1
+            )
+        self.client_user2 = Client(
+            HTTP_AUTHORIZATION='Bearer '+self.get_token('user2', 'user2')
+            )
+
+    def get_token(self, username, password):
+        post = {'username': username, 'password': password}
+        response = self.client.post(self.auth_url, post)
+        data = json.loads(response.content)
+        return data['access']
+
+    def get(self, client, url=None):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url or self.issues_url)
+        user_queries = [query for query in context.captured_queries
+                        if 'FROM "auth_user"' in query['sql']]
+        return response, len(user_queries)
+
+    def test_claims(self):
+        token = UntypedToken(self.token_user1)
+        self.assertEquals(token['user_id'], 1)
+        self.assertEquals(token['username'], 'user1')
+        self.assertIn('memberships_version', token)
+
+    def test_no_user_query(self):
+        response, user_queries = self.get(self.client_user1)
+        self.assertEquals(response.status_code, 200)
+        self.assertEquals(user_queries, 0)
+
+    def test_local_cache(self):
+        # Without a shared cache, the user is checked on every request
+        with self.settings(HELPDESK_MEMBERSHIP_CACHE='default'):
+            response, user_queries = self.get(self.client_user1)
+        self.assertEquals(response.status_code, 200)
+        self.assertEquals(user_queries, 1)
+
+    def test_user_fetched_when_needed(self):
+        response = self.client_user1.post(
+            self.issues_url,
+            {'title': 'title2', 'desc': 'description2', 'tag': 'bug',
+             'priority': 'faible', 'status': 'a faire'})
+        self.assertEquals(response.status_code, 201)
+        issue = Issue.objects.get(title='title2')
+        self.assertEquals(issue.author.username, 'user1')
+        self.assertEquals(issue.assignee.username, 'user1')
+
+    def test_token_without_claims(self):
+        # Tokens issued before the claims were added fetch their user
+        client = Client(HTTP_AUTHORIZATION='Bearer %s' % AccessToken.for_user(
+            User.objects.get(pk=1)))
+        response, user_queries = self.get(client)
+        self.assertEquals(response.status_code, 200)
+        self.assertEquals(user_queries, 1)
+
+    def test_memberships_change(self):
+        response = self.client_user2.get(self.issues_url)
+        self.assertEquals(response.status_code, 403)
+        Contributor.objects.create(
+            user=User.objects.get(pk=2),
+            project=Project.objects.get(pk=1),
+            permission='contributeur',
+            role='contributeur',
+        )
+        response, user_queries = self.get(self.client_user2)
+        self.assertEquals(response.status_code, 200)
+        self.assertEquals(user_queries, 1)
+
+    def test_deactivated_user(self):
+        user = User.objects.get(pk=1)
+        user.is_active = False
+        user.save()
+        response = self.client_user1.get(self.issues_url)
+        self.assertEquals(response.status_code, 401)
+
+    def test_renamed_user(self):
+        user = User.objects.get(pk=1)
+        user.username = 'renamed'
+        user.save()
+        response, user_queries = self.get(self.client_user1)
+        self.assertEquals(response.status_code, 200)
+        self.assertEquals(user_queries, 1)
+
+    def test_deleted_user(self):
+        User.objects.filter(pk=2).delete()
+        response = self.client_user2.get(self.issues_url)
+        self.assertEquals(response.status_code, 401)
+
+    def test_last_login(self):
+        user = User.objects.get(pk=1)
+        user.save(update_fields=['last_login'])
+        response, user_queries = self.get(self.client_user1)
+        self.assertEquals(user_queries, 0)
@@ -0,0 +1,188 @@
+import json
+
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.contrib.auth.hashers import make_password
+
+from ..models import Project, Contributor, Change
+
+
+class ChangesTest(TestCase):
+
+    def setUp(self):
+        User.objects.create(username='user1', password=make_password('user1'))
+        User.objects.create(username='user2', password=make_password('user2'))
+
+        Project.objects.create(title='title1', description='description1',
+                               type='projet')
+
+        Contributor.objects.create(
+            user=User.objects.get(pk=1),
+            project=Project.objects.get(pk=1),
+            permission='manager',
+            role='manager',
+        )
+
+        self.changes_url = '/api/projects/1/changes/'
+        self.issues_url = '/api/projects/1/issues/'
+        self.auth_url = reverse('token_obtain')
+
+        self.client_user1 = Client(
+            HTTP_AUTHORIZATION='Bearer '+self.get_token('user1', 'user1')
+            )
+        self.client_user2 = Client(
+            HTTP_AUTHORIZATION='Bearer '+self.get_token('user2', 'user2')
+            )
+
+    def get_token(self, username, password):
+        post = {'username': username, 'password': password}
+        response = self.client.post(self.auth_url, post)
+        data = json.loads(response.content)
+        return data['access']
+
+    def create_issue(self, title='title'):
+        post = {'title': title, 'desc': 'description', 'tag': 'bug',
+                'priority': 'moyenne', 'status': 'a faire',
+                'assignee': 'user1'}
+        response = self.client_user1.post(self.issues_url, post)
+        self.assertEquals(response.status_code, 201)
+
+    def get_changes(self, query=''):
+        url = query if query.startswith('/') else self.changes_url + query
+        response = self.client_user1.get(url)
+        self.assertEquals(response.status_code, 200)
+        return json.loads(response.content)['results']
+
+    def test_changes(self):
+        since = Project.objects.get(pk=1).version
+        self.create_issue()
+        self.client_user1.post(self.issues_url + '1/comments/',
+                               {'description': 'comment'})
+        self.client_user1.put(
+            self.issues_url + '1/comments/1/',
+            json.dumps({'description': 'updated'}),
+            content_type='application/json')
+        self.client_user1.post('/api/projects/1/users/', {
+            'user': 'user2', 'permission': 'contributeur', 'role': 'role'})
+        changes = self.get_changes('?since=%d' % since)
+        self.assertEquals(
+            [(change['model'], change['action'], change['object_id'])
+             for change in changes],
+            [('issue', 'create', 1), ('comment', 'create', 1),
+             ('comment', 'update', 1), ('contributor', 'create', 2)])
+        self.assertEquals([change['seq'] for change in changes],
+                          list(range(since + 1, since + 5)))
+        self.assertEquals(changes[1]['issue_id'], 1)
+        self.assertEquals(changes[1]['data']['description'], 'updated')
+        self.assertEquals(changes[3]['data']['user'], 'user2')
+
+    def test_since(self):
+        self.create_issue('first')
+        since = Project.objects.get(pk=1).version
+        self.create_issue('second')
+        changes = self.get_changes('?since=%d' % since)
+        self.assertEquals(len(changes), 1)
+        self.assertEquals(changes[0]['data']['title'], 'second')
+        self.assertEquals(self.get_changes('?since=%d' % (since + 1)), [])
+
+    def test_deletes(self):
+        self.create_issue()
+        self.client_user1.post(
+            self.issues_url + '1/comments/bulk/',
+            json.dumps([{'description': 'comment'}] * 2),
+            content_type='application/json')
+        since = Project.objects.get(pk=1).version
+        response = self.client_user1.delete(self.issues_url + '1/')
+        self.assertEquals(response.status_code, 204)
+        changes = self.get_changes('?since=%d' % since)
+        self.assertEquals(
+            [(change['model'], change['action'], change['object_id'],
+              change['data']) for change in changes],
+            [('comment', 'delete', 1, None), ('comment', 'delete', 2, None),
+             ('issue', 'delete', 1, None)])
+
+    def test_delete_project(self):
+        self.create_issue()
+        self.client_user1.post(self.issues_url + '1/comments/',
+                               {'description': 'comment'})
+        # Deleted by the collector, which sends the signals of the issues,
+        # comments and contributors
+        Project.objects.get(pk=1).delete()
+        self.assertFalse(Change.objects.exists())
+
+    def test_bulk(self):
+        since = Project.objects.get(pk=1).version
+        items = [{'title': 'bulk', 'desc': 'description', 'tag': 'bug',
+                  'priority': 'faible', 'status': 'a faire',
+                  'assignee': 'user1'}] * 3
+        self.client_user1.post(self.issues_url + 'bulk/', json.dumps(items),
+                               content_type='application/json')
+        self.client_user1.patch(
+            self.issues_url + 'bulk/',
+            json.dumps([{'issue_id': 2, 'status': 'termine'}]),
+            content_type='application/json')
+        changes = self.get_changes('?since=%d' % since)
+        self.assertEquals(
+            [(change['action'], change['object_id']) for change in changes],
+            [('create', 1), ('create', 2), ('create', 3), ('update', 2)])
+        self.assertEquals([change['seq'] for change in changes],
+                          list(range(since + 1, since + 5)))
+
+    def test_paginated(self):
+        for i in range(5):
+            self.create_issue()
+        seqs = []
+        url = self.changes_url + '?page_size=2'
+        while url is not None:
+            data = json.loads(self.client_user1.get(url).content)
+            seqs.extend(change['seq'] for change in data['results'])
+            url = data['next']
+        self.assertEquals(seqs, list(Change.objects.filter(
+            project=1).values_list('seq', flat=True)))
+
+    def test_queries(self):
+        since = Project.objects.get(pk=1).version
+        self.create_issue()
+        url = self.changes_url + '?since=%d' % since
+        with CaptureQueriesContext(connection) as context:
+            self.get_changes(url)
+        queries = len(context)
+        for i in range(5):
+            self.create_issue()
+        with self.assertNumQueries(queries):
+            self.assertEquals(len(self.get_changes(url)), 6)
+
+    def update_project(self, title):
+        response = self.client_user1.put(
+            '/api/projects/1/',
+            json.dumps({'title': title, 'description': 'description1',
+                        'type': 'projet'}),
+            content_type='application/json')
+        self.assertEquals(response.status_code, 200)
+
+    def test_project_queries(self):
+        since = Project.objects.get(pk=1).version
+        self.update_project('first')
+        url = self.changes_url + '?since=%d' % since
+        with CaptureQueriesContext(connection) as context:
+            self.get_changes(url)
+        queries = len(context)
+        for i in range(5):
+            self.update_project('title%d' % i)
+        with self.assertNumQueries(queries):
+            changes = self.get_changes(url)
+        self.assertEquals(len(changes), 6)
+        self.assertEquals(changes[0]['data']['title'], 'title4')
+        self.assertEquals(changes[0]['data']['role'], 'manager')
+        self.assertEquals(changes[0]['data']['permission'], 'manager')
+
+    def test_invalid_since(self):
+        response = self.client_user1.get(self.changes_url + '?since=last')
+        self.assertEquals(response.status_code, 400)
+
+    def test_non_contributor(self):
+        response = self.client_user2.get(self.changes_url)
+        self.assertEquals(response.status_code, 403)
@@ -0,0 +1,82 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.contrib.auth.models import User
+
+from .. import search
+from ..management.commands.explain_queries import FULL_SCAN
+from ..models import Project, Contributor, Issue, Comment
+
+
+class CommandsTest(TestCase):
+
+    def setUp(self):
+        User.objects.create(username='user1')
+        User.objects.create(username='user2')
+
+        Project.objects.create(title='title1', description='description1',
+                               type='projet')
+
+        Contributor.objects.create(
+            user=User.objects.get(pk=1),
+            project=Project.objects.get(pk=1),
+            permission='manager',
+            role='manager',
+        )
+
+        Contributor.objects.create(
+            user=User.objects.get(pk=2),
+            project=Project.objects.get(pk=1),
+            permission='contributeur',
+            role='contributeur',
+        )
+
+        Issue.objects.create(
+            title='title1',
+            desc='description1',
+            tag='bug',
+            priority='moyenne',
+            project=Project.objects.get(pk=1),
+            status='a faire',
+            author=User.objects.get(pk=1),
+            assignee=User.objects.get(pk=2),
+        )
+
+        Comment.objects.create(
+            description='description1',
+            author=User.objects.get(pk=1),
+            issue=Issue.objects.get(pk=1),
+        )
+
+    def test_explain_queries(self):
+        out = StringIO()
+        call_command('explain_queries', '--fail-on-scan', stdout=out)
+        self.assertIn('GET /api/projects/1/issues/', out.getvalue())
+        self.assertIn('0 full table scan(s)', out.getvalue())
+        self.assertEquals(Comment.objects.count(), 1)
+        self.assertEquals(Project.objects.count(), 1)
+
+    def test_full_scan(self):
+        for line in ('SCAN TABLE helpdesk_issue',
+                     'SCAN helpdesk_issue',
+                     'SCAN TABLE helpdesk_issue USING INDEX '
+                     'issue_project_created',
+                     'SCAN auth_user USING COVERING INDEX '
+                     'auth_user_username_6821ab7c_like',
+                     'Seq Scan on helpdesk_comment  (cost=0.00..1.01)'):
+            self.assertTrue(FULL_SCAN.search(line), line)
+        for line in ('SEARCH helpdesk_issue USING INDEX '
+                     'issue_project_created (project_id=?)',
+                     'SCAN helpdesk_search VIRTUAL TABLE INDEX 0:M3',
+                     'SCAN CONSTANT ROW',
+                     'USE TEMP B-TREE FOR ORDER BY'):
+            self.assertFalse(FULL_SCAN.search(line), line)
+
+    def test_rebuild_search_index(self):
+        Issue.objects.update(title='rebuilt')
+        out = StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        self.assertIn('2 document(s) indexed', out.getvalue())
+        results = search.search(['rebuilt'], [1])[0:10]
+        self.assertEquals([result['issue_id'] for result in results], [1])
@@ -0,0 +1,115 @@
+import json
+
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.contrib.auth.hashers import make_password
+
+from ..models import Project, Contributor, Issue, Comment
+
+
+class CommentBulkTest(TestCase):
+
+    def setUp(self):
+        User.objects.create(username='user1', password=make_password('user1'))
+        User.objects.create(username='user2', password=make_password('user2'))
+
+        Project.objects.create(title='title1', description='description1',
+                               type='projet')
+        Project.objects.create(title='title2', description='description2',
+                               type='projet')
+
+        Contributor.objects.create(
+            user=User.objects.get(pk=1),
+            project=Project.objects.get(pk=1),
+            permission='manager',
+            role='manager',
+        )
+
+        Issue.objects.create(
+            title='title1',
+            desc='description1',
+            tag='bug',
+            priority='moyenne',
+            project=Project.objects.get(pk=1),
+            status='a faire',
+            author=User.objects.get(pk=1),
+            assignee=User.objects.get(pk=1),
+        )
+
+        Issue.objects.create(
+            title='title2',
+            desc='description2',
+            tag='bug',
+            priority='moyenne',
+            project=Project.objects.get(pk=2),
+            status='a faire',
+            author=User.objects.get(pk=1),
+            assignee=User.objects.get(pk=1),
+        )
+
+        self.bulk_url = '/api/projects/1/issues/1/comments/bulk/'
+        self.auth_url = reverse('token_obtain')
+
+        self.client_user1 = Client(
+            HTTP_AUTHORIZATION='Bearer '+self.get_token('user1', 'user1')
+            )
+        self.client_user2 = Client(
+            HTTP_AUTHORIZATION='Bearer '+self.get_token('user2', 'user2')
+            )
+
+    def get_token(self, username, password):
+        post = {'username': username, 'password': password}
+        response = self.client.post(self.auth_url, post)
+        data = json.loads(response.content)
+        return data['access']
+
+    def get_items(self, count):
+        return [{'description': 'comment' + str(i)} for i in range(count)]
+
+    def post(self, client, items, url=None):
+        return client.post(url or self.bulk_url, json.dumps(items),
+                           content_type='application/json')
+
+    def test_create(self):
+        response = self.post(self.client_user1, self.get_items(3))
+        self.assertEquals(response.status_code, 201)
+        data = json.loads(response.content)
+        self.assertEquals([item['status'] for item in data], [201] * 3)
+        self.assertEquals([item['data']['id'] for item in data], [1, 2, 3])
+        self.assertEquals(data[2]['data']['description'], 'comment2')
+        self.assertEquals(data[2]['data']['author'], 'user1')
+        self.assertEquals(Comment.objects.filter(issue=1).count(), 3)
+
+    def test_create_partial_errors(self):
+        items = self.get_items(1) + [{}, 'comment']
+        response = self.post(self.client_user1, items)
+        self.assertEquals(response.status_code, 207)
+        data = json.loads(response.content)
+        self.assertEquals([item['status'] for item in data], [201, 400, 400])
+        self.assertIn('description', data[1]['data'])
+        self.assertEquals(Comment.objects.count(), 1)
+
+    def test_create_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            self.post(self.client_user1, self.get_items(2))
+        with self.assertNumQueries(len(context)):
+            response = self.post(self.client_user1, self.get_items(50))
+        self.assertEquals(response.status_code, 201)
+
+    def test_create_non_contributor(self):
+        response = self.post(self.client_user2, self.get_items(1))
+        self.assertEquals(response.status_code, 403)
+
+    def test_create_wrong_url(self):
+        response = self.post(self.client_user1, self.get_items(1),
+                             '/api/projects/1/issues/2/comments/bulk/')
+        self.assertEquals(response.status_code, 404)
+
+    @override_settings(HELPDESK_BULK_MAX_ITEMS=2)
+    def test_create_too_many_items(self):
+        response = self.post(self.client_user1, self.get_items(3))
+        self.assertEquals(response.status_code, 400)
+        self.assertEquals(Comment.objects.count(), 0)
@@ -0,0 +1,186 @@
+import json
+
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.contrib.auth.hashers import make_password
+
+from ..models import Project, Contributor, Issue, Comment
+
+
+class ConditionalTest(TestCase):
+
+    def setUp(self):
+        User.objects.create(username='user1', password=make_password('user1'))
+        User.objects.create(username='user2', password=make_password('user2'))
+
+        Project.objects.create(title='title1', description='description1',
+                               type='projet')
+        Project.objects.create(title='title2', description='description2',
+                               type='projet')
+
+        Contributor.objects.create(
+            user=User.objects.get(pk=1),
+            project=Project.objects.get(pk=1),
+            permission='manager',
+            role='manager',
+        )
+
+        Issue.objects.create(
+            title='title1',
+            desc='description1',
+            tag='bug',
+            priority='moyenne',
+            project=Project.objects.get(pk=1),
+            status='a faire',
+            author=User.objects.get(pk=1),
+            assignee=User.objects.get(pk=1),
+        )
+
+        Comment.objects.create(
+            description='description1',
+            author=User.objects.get(pk=1),
+            issue=Issue.objects.get(pk=1),
+        )
+
+        self.issues_url = '/api/projects/1/issues/'
+        self.auth_url = reverse('token_obtain')
+
+        self.client_user1 = Client(
+            HTTP_AUTHORIZATION='Bearer '+self.get_token('user1', 'user1')
+            )
+        self.client_user2 = Client(
+            HTTP_AUTHORIZATION='Bearer '+self.get_token('user2', 'user2')
+            )
+
+    def get_token(self, username, password):
+        post = {'username': username, 'password': password}
+        response = self.client.post(self.auth_url, post)
+        data = json.loads(response.content)
+        return data['access']
+
+    def get_etag(self, url):
+        response = self.client_user1.get(url)
+        self.assertEquals(response.status_code, 200)
+        self.assertIn('Last-Modified', response)
+        return response['ETag']
+
+    def test_not_modified(self):
+        urls = [
+            '/api/projects/',
+            '/api/projects/1/',
+            self.issues_url,
+            self.issues_url + '1/',
+            self.issues_url + '1/comments/',
+            self.issues_url + '1/comments/1/',
+            '/api/projects/1/users/',
+        ]
+        for url in urls:
+            etag = self.get_etag(url)
+            response = self.client_user1.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEquals(response.status_code, 304)
+            self.assertEquals(response['ETag'], etag)
+            self.assertEquals(response.content, b'')
+
+    def test_not_modified_skips_fetch(self):
+        etag = self.get_etag(self.issues_url)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client_user1.get(
+                self.issues_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEquals(response.status_code, 304)
+        for query in context.captured_queries:
+            self.assertNotIn('"helpdesk_issue"', query['sql'])
+
+    def test_if_modified_since(self):
+        response = self.client_user1.get(self.issues_url)
+        response = self.client_user1.get(
+            self.issues_url,
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEquals(response.status_code, 304)
+
+    def test_missing_object(self):
+        for url in (self.issues_url + '9/',
+                    self.issues_url + '9/comments/',
+                    self.issues_url + '1/comments/9/'):
+            for headers in ({'HTTP_IF_NONE_MATCH': '*'},
+                            {'HTTP_IF_MODIFIED_SINCE':
+                             'Fri, 01 Jan 2100 00:00:00 GMT'}):
+                response = self.client_user1.get(url, **headers)
+                self.assertEquals(response.status_code, 404)
+        # Matched once the object is found
+        for url in (self.issues_url + '1/', self.issues_url + '1/comments/'):
+            response = self.client_user1.get(url, HTTP_IF_NONE_MATCH='*')
+            self.assertEquals(response.status_code, 304)
+
+    def test_etag_per_query(self):
+        self.assertNotEqual(
+            self.get_etag(self.issues_url),
+            self.get_etag(self.issues_url + '?status=termine'))
+
+    def test_changes_modify(self):
+        changes = [
+            lambda: self.client_user1.post(
+                self.issues_url + '1/comments/', {'description': 'new'}),
+            lambda: self.client_user1.delete(
+                self.issues_url + '1/comments/2/'),
+            lambda: self.client_user1.post(
+                self.issues_url + '1/comments/bulk/',
+                json.dumps([{'description': 'bulk'}]),
+                content_type='application/json'),
+            lambda: self.client_user1.patch(
+                self.issues_url + 'bulk/',
+                json.dumps([{'issue_id': 1, 'status': 'termine'}]),
+                content_type='application/json'),
+            lambda: self.client_user1.post(
+                '/api/projects/1/users/', {'user': 'user2',
+                                           'permission': 'contributeur',
+                                           'role': 'role'}),
+            lambda: self.client_user1.put(
+                '/api/projects/1/', json.dumps({
+                    'title': 'title', 'description': 'description',
+                    'type': 'projet'}), content_type='application/json'),
+        ]
+        for change in changes:
+            etag = self.get_etag(self.issues_url)
+            self.assertLess(change().status_code, 300)
+            response = self.client_user1.get(
+                self.issues_url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEquals(response.status_code, 200)
+
+    def test_project_list_memberships(self):
+        # No project, hence no Last-Modified
+        etag = self.client_user2.get('/api/projects/')['ETag']
+        Contributor.objects.create(
+            user=User.objects.get(pk=2),
+            project=Project.objects.get(pk=2),
+            permission='manager',
+            role='manager',
+        )
+        response = self.client_user2.get(
+            '/api/projects/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEquals(response.status_code, 200)
+
+    def test_project_list_other_project(self):
+        user2 = User.objects.get(pk=2)
+        contributor = Contributor.objects.create(
+            user=user2, project=Project.objects.get(pk=1),
+            permission='contributor', role='contributor')
+        version = Project.objects.get(pk=1).version
+        etag = self.client_user2.get('/api/projects/')['ETag']
+        contributor.delete()
+        Contributor.objects.create(
+            user=user2, project=Project.objects.get(pk=2),
+            permission='contributor', role='contributor')
+        Project.objects.filter(pk=2).update(version=version)
+        response = self.client_user2.get(
+            '/api/projects/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEquals(response.status_code, 200)
+        self.assertEquals(json.loads(response.content)[0]['id'], 2)
+
+    def test_permission_before_not_modified(self):
+        etag = self.get_etag(self.issues_url)
+        response = self.client_user2.get(
+            self.issues_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEquals(response.status_code, 403)
@@ -0,0 +1,220 @@
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.contrib.auth.hashers import make_password
+
+from ..counters import get_issue_counts
+from ..models import (Project, Contributor, Issue, IssueCounter, Comment,
+                      Change, DailyIssueStat, StatusTimeStat, AssigneeStat)
+
+
+class CountersTest(TestCase):
+
+    def setUp(self):
+        User.objects.create(username='user1', password=make_password('user1'))
+
+        Project.objects.create(title='title1', description='description1',
+                               type='projet')
+
+        Contributor.objects.create(
+            user=User.objects.get(pk=1),
+            project=Project.objects.get(pk=1),
+            permission='manager',
+            role='manager',
+        )
+
+        Issue.objects.create(
+            title='title1',
+            desc='description1',
+            tag='bug',
+            priority='moyenne',
+            project=Project.objects.get(pk=1),
+            status='a faire',
+            author=User.objects.get(pk=1),
+            assignee=User.objects.get(pk=1),
+        )
+
+        Comment.objects.create(
+            description='description1',
+            author=User.objects.get(pk=1),
+            issue=Issue.objects.get(pk=1),
+        )
+
+        self.project_url = '/api/projects/1/'
+        self.issues_url = '/api/projects/1/issues/'
+        self.auth_url = reverse('token_obtain')
+        self.client_user1 = Client(
+            HTTP_AUTHORIZATION='Bearer '+self.get_token('user1', 'user1')
+            )
+
+    def get_token(self, username, password):
+        post = {'username': username, 'password': password}
+        response = self.client.post(self.auth_url, post)
+        data = json.loads(response.content)
+        return data['access']
+
+    def get_counts(self):
+        return get_issue_counts(Project.objects.get(pk=1))
+
+    def post_issue(self, **data):
+        issue = {'title': 'title2', 'desc': 'description2', 'tag': 'bug',
+                 'priority': 'faible', 'status': 'a faire'}
+        issue.update(data)
+        return self.client_user1.post(self.issues_url, issue)
+
+    def test_project(self):
+        # The user, whose claims are not trusted without a shared cache,
+        # the project, its counters and the memberships of the user
+        with self.assertNumQueries(4):
+            response = self.client_user1.get(self.project_url)
+        counts = json.loads(response.content)['issue_counts']
+        self.assertEquals(counts['status'],
+                          {'a faire': 1, 'en cours': 0, 'termine': 0})
+        self.assertEquals(counts['priority'],
+                          {'elevee': 0, 'moyenne': 1, 'faible': 0})
+        self.assertEquals(counts['tag'],
+                          {'bug': 1, 'tache': 0, 'amelioration': 0})
+
+    def test_issue(self):
+        response = self.client_user1.get(self.issues_url + '1/')
+        self.assertEquals(json.loads(response.content)['comment_count'], 1)
+
+    def test_create_issue(self):
+        self.post_issue(status='en cours')
+        counts = self.get_counts()
+        self.assertEquals(counts['status']['a faire'], 1)
+        self.assertEquals(counts['status']['en cours'], 1)
+        self.assertEquals(counts['priority']['faible'], 1)
+        self.assertEquals(counts['tag']['bug'], 2)
+
+    def test_update_issue(self):
+        response = self.client_user1.put(
+            self.issues_url + '1/',
+            {'title': 'title1', 'desc': 'description1', 'tag': 'tache',
+             'priority': 'moyenne', 'status': 'termine'},
+            content_type='application/json')
+        self.assertEquals(response.status_code, 200)
+        counts = self.get_counts()
+        self.assertEquals(counts['status']['a faire'], 0)
+        self.assertEquals(counts['status']['termine'], 1)
+        self.assertEquals(counts['tag'], {'bug': 0, 'tache': 1,
+                                          'amelioration': 0})
+        self.assertEquals(counts['priority']['moyenne'], 1)
+
+    def test_update_twice(self):
+        issue = Issue.objects.get(pk=1)
+        issue.status = 'en cours'
+        issue.save()
+        issue.status = 'termine'
+        issue.save()
+        counts = self.get_counts()
+        self.assertEquals(counts['status'],
+                          {'a faire': 0, 'en cours': 0, 'termine': 1})
+
+    def test_save_keeps_comment_count(self):
+        issue = Issue.objects.get(pk=1)
+        Comment.objects.create(description='description2',
+                               author=User.objects.get(pk=1), issue=issue)
+        issue.title = 'title_update'
+        issue.save()
+        self.assertEquals(Issue.objects.get(pk=1).comment_count, 2)
+
+    def test_save_deleted_issue(self):
+        issue = Issue.objects.get(pk=1)
+        self.assertEquals(set(issue._saved_values), {
+            'project_id', 'status', 'priority', 'tag', 'assignee_id',
+            'created_time', 'status_time'})
+        Issue.objects.filter(pk=1).delete()
+        # Inserted again, as by any model
+        issue.save()
+        self.assertEquals(Issue.objects.get(pk=1).comment_count, 1)
+
+    def test_delete_issue(self):
+        response = self.client_user1.delete(self.issues_url + '1/')
+        self.assertEquals(response.status_code, 204)
+        counts = self.get_counts()
+        self.assertEquals(counts['status']['a faire'], 0)
+        self.assertEquals(counts['tag']['bug'], 0)
+
+    def test_cascade(self):
+        User.objects.get(pk=1).delete()
+        self.assertEquals(self.get_counts()['status']['a faire'], 0)
+
+    def test_delete_project(self):
+        response = self.client_user1.delete(self.project_url)
+        self.assertEquals(response.status_code, 204)
+        # The rows updated by the signals of the issues and comments, which
+        # are deleted without them, go with the project
+        for model in (Issue, Comment, IssueCounter, DailyIssueStat,
+                      StatusTimeStat, AssigneeStat, Change):
+            self.assertFalse(model.objects.exists(), model)
+
+    def test_delete_drifted(self):
+        # Comments counted by no counter, e.g. created by a raw insert
+        Comment.objects.create(description='description2',
+                               author=User.objects.get(pk=1),
+                               issue=Issue.objects.get(pk=1))
+        Issue.objects.filter(pk=1).update(comment_count=0)
+        response = self.client_user1.delete(self.issues_url + '1/comments/1/')
+        self.assertEquals(response.status_code, 204)
+        self.assertEquals(Issue.objects.get(pk=1).comment_count, 0)
+        # Deleted by the collector, which deletes the comments one by one
+        Issue.objects.get(pk=1).delete()
+        self.assertFalse(Comment.objects.exists())
+
+    def test_bulk_issues(self):
+        response = self.client_user1.post(
+            self.issues_url + 'bulk/',
+            [{'title': 'title%s' % i, 'desc': 'description', 'tag': 'bug',
+              'priority': 'elevee', 'status': 'a faire'} for i in range(3)],
+            content_type='application/json')
+        self.assertEquals(response.status_code, 201)
+        response = self.client_user1.patch(
+            self.issues_url + 'bulk/',
+            [{'issue_id': 1, 'status': 'termine'},
+             {'issue_id': 2, 'status': 'en cours'}],
+            content_type='application/json')
+        self.assertEquals(response.status_code, 200)
+        counts = self.get_counts()
+        self.assertEquals(counts['status'],
+                          {'a faire': 2, 'en cours': 1, 'termine': 1})
+        self.assertEquals(counts['priority']['elevee'], 3)
+
+    def test_comments(self):
+        comments_url = self.issues_url + '1/comments/'
+        self.client_user1.post(comments_url, {'description': 'comment'})
+        response = self.client_user1.post(
+            comments_url + 'bulk/',
+            [{'description': 'comment'}, {'description': 'comment'}],
+            content_type='application/json')
+        self.assertEquals(response.status_code, 201)
+        self.assertEquals(Issue.objects.get(pk=1).comment_count, 4)
+        response = self.client_user1.delete(comments_url + '1/')
+        self.assertEquals(response.status_code, 204)
+        self.assertEquals(Issue.objects.get(pk=1).comment_count, 3)
+
+    def test_check_counters(self):
+        out = StringIO()
+        call_command('check_counters', stdout=out)
+        self.assertIn('No drifted counter', out.getvalue())
+
+        Issue.objects.filter(pk=1).update(status='termine', comment_count=5)
+        IssueCounter.objects.filter(field='tag', value='tache').delete()
+        with self.assertRaises(CommandError):
+            call_command('check_counters', stdout=StringIO())
+
+        out = StringIO()
+        call_command('check_counters', '--repair', stdout=out)
+        self.assertIn('4 counter(s) repaired', out.getvalue())
+        counts = self.get_counts()
+        self.assertEquals(counts['status'],
+                          {'a faire': 0, 'en cours': 0, 'termine': 1})
+        self.assertEquals(Issue.objects.get(pk=1).comment_count, 1)
+        out = StringIO()
+        call_command('check_counters', stdout=out)
+        self.assertIn('No drifted counter', out.getvalue())
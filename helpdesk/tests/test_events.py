@@ -0,0 +1,299 @@
+import asyncio
+import json
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.db import transaction
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.contrib.auth.hashers import make_password
+
+from users.authentication import LazyUser
+
+from .. import events
+from ..models import Project, Contributor, Issue, Comment
+from ..memberships import invalidate_memberships
+from ..stream import EventStream, authorize
+from .test_memberships import use_shared_cache
+
+
+class StreamClient:
+    """
+    Drives the event stream application with a request of the tests.
+    """
+
+    def __init__(self, token=None, query=''):
+        headers = []
+        if token is not None:
+            headers.append((b'authorization', b'Bearer ' + token.encode()))
+        self.scope = {'type': 'http', 'method': 'GET', 'path': '/api/events/',
+                      'query_string': query.encode(), 'headers': headers}
+        self.messages = []
+        self.received = None
+        self.disconnect = None
+
+    async def receive(self):
+        await self.disconnect.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(self, message):
+        self.messages.append(message)
+        self.received.set()
+
+    async def start(self):
+        self.received = asyncio.Event()
+        self.disconnect = asyncio.Event()
+        self.task = asyncio.ensure_future(
+            EventStream()(self.scope, self.receive, self.send))
+        await self.wait_for(lambda: self.messages)
+
+    async def wait_for(self, condition):
+        while not condition():
+            self.received.clear()
+            await asyncio.wait_for(self.received.wait(), 5)
+
+    async def wait_event(self, event):
+        await self.wait_for(lambda: ('event: %s\n' % event) in self.body)
+
+    async def close(self):
+        self.disconnect.set()
+        await asyncio.wait_for(self.task, 5)
+
+    @property
+    def status(self):
+        return self.messages[0]['status']
+
+    @property
+    def body(self):
+        return b''.join(message.get('body', b'')
+                        for message in self.messages[1:]).decode()
+
+    @property
+    def finished(self):
+        return bool(self.messages) and self.messages[-1]['type'] \
+            == 'http.response.body' \
+            and not self.messages[-1].get('more_body', False)
+
+    def get_events(self):
+        return [(lines[0][len('event: '):],
+                 json.loads(lines[1][len('data: '):]))
+                for lines in (chunk.split('\n')
+                              for chunk in self.body.split('\n\n'))
+                if lines[0].startswith('event: ')]
+
+
+class EventStreamTest(TransactionTestCase):
+
+    reset_sequences = True
+
+    def setUp(self):
+        User.objects.create(username='user1', password=make_password('user1'))
+        User.objects.create(username='user2', password=make_password('user2'))
+
+        Project.objects.create(title='title1', description='description1',
+                               type='projet')
+        Project.objects.create(title='title2', description='description2',
+                               type='projet')
+
+        Contributor.objects.create(
+            user=User.objects.get(pk=1),
+            project=Project.objects.get(pk=1),
+            permission='manager',
+            role='manager',
+        )
+
+        Issue.objects.create(
+            title='title1',
+            desc='description1',
+            tag='bug',
+            priority='moyenne',
+            project=Project.objects.get(pk=1),
+            status='a faire',
+            author=User.objects.get(pk=1),
+            assignee=User.objects.get(pk=1),
+        )
+
+        Issue.objects.create(
+            title='title2',
+            desc='description2',
+            tag='bug',
+            priority='moyenne',
+            project=Project.objects.get(pk=2),
+            status='a faire',
+            author=User.objects.get(pk=1),
+            assignee=User.objects.get(pk=1),
+        )
+
+        self.auth_url = reverse('token_obtain')
+        self.token_user1 = self.get_token('user1', 'user1')
+        self.token_user2 = self.get_token('user2', 'user2')
+
+    def tearDown(self):
+        self.assertEquals(events.get_backend().count(), 0)
+
+    def get_token(self, username, password):
+        post = {'username': username, 'password': password}
+        response = self.client.post(self.auth_url, post)
+        data = json.loads(response.content)
+        return data['access']
+
+    @async_to_sync
+    async def open(self, client):
+        await client.start()
+        if not client.finished:
+            await client.close()
+        return client
+
+    def test_no_token(self):
+        client = self.open(StreamClient())
+        self.assertEquals(client.status, 401)
+        self.assertEquals(events.get_backend().count(), 0)
+
+    def test_invalid_token(self):
+        client = self.open(StreamClient('invalid'))
+        self.assertEquals(client.status, 401)
+
+    def test_non_contributor_project(self):
+        client = self.open(StreamClient(self.token_user1, 'project=2'))
+        self.assertEquals(client.status, 403)
+
+    def test_invalid_project(self):
+        client = self.open(StreamClient(self.token_user1, 'project=one'))
+        self.assertEquals(client.status, 400)
+
+    def test_stateless_authentication(self):
+        use_shared_cache(self)
+        scope = {'query_string': b'', 'headers': [
+            (b'authorization',
+             b'Bearer ' + self.get_token('user1', 'user1').encode())]}
+        # Authenticated by the claims of the token
+        user, project_ids = authorize(scope)
+        self.assertIs(type(user), LazyUser)
+        self.assertEquals(project_ids, {1})
+        # The user is fetched once the memberships of the token changed
+        invalidate_memberships(1)
+        user, project_ids = authorize(scope)
+        self.assertIs(type(user), User)
+
+    def test_headers(self):
+        client = self.open(StreamClient(self.token_user1))
+        self.assertEquals(client.status, 200)
+        self.assertIn((b'content-type', b'text/event-stream'),
+                      client.messages[0]['headers'])
+
+    @async_to_sync
+    async def test_events(self):
+        client = StreamClient(self.token_user1)
+        await client.start()
+
+        @sync_to_async
+        def change():
+            for project_id in (2, 1):
+                Issue.objects.create(
+                    title='new', desc='new', tag='bug', priority='faible',
+                    project_id=project_id, status='a faire', author_id=1,
+                    assignee_id=1)
+            issue = Issue.objects.get(pk=1)
+            issue.title = 'renamed'
+            issue.save()
+            issue.status = 'termine'
+            issue.save()
+            Comment.objects.create(description='comment', issue_id=1,
+                                   author_id=1)
+
+        await change()
+        await client.wait_event('comment_created')
+        await client.close()
+        self.assertEquals(client.get_events(), [
+            ('issue_created', {'project_id': 1, 'issue_id': 4,
+                               'title': 'new', 'status': 'a faire',
+                               'author_id': 1}),
+            ('issue_status', {'project_id': 1, 'issue_id': 1,
+                              'status': 'termine',
+                              'previous_status': 'a faire'}),
+            ('comment_created', {'project_id': 1, 'issue_id': 1,
+                                 'comment_id': 1, 'author_id': 1,
+                                 'description': 'comment'}),
+        ])
+
+    @async_to_sync
+    async def test_bulk_events(self):
+        client = StreamClient(self.token_user1, 'project=1')
+        await client.start()
+
+        @sync_to_async
+        def change():
+            self.client.post(
+                '/api/projects/1/issues/bulk/',
+                json.dumps([{'title': 'bulk', 'desc': 'description',
+                             'tag': 'bug', 'priority': 'faible',
+                             'status': 'a faire', 'assignee': 'user1'}] * 2),
+                content_type='application/json',
+                HTTP_AUTHORIZATION='Bearer ' + self.token_user1)
+            self.client.patch(
+                '/api/projects/1/issues/bulk/',
+                json.dumps([{'issue_id': 1, 'status': 'termine'},
+                            {'issue_id': 3, 'priority': 'haute'}]),
+                content_type='application/json',
+                HTTP_AUTHORIZATION='Bearer ' + self.token_user1)
+
+        await change()
+        await client.wait_event('issue_status')
+        await client.close()
+        self.assertEquals(
+            [(event, data['issue_id']) for event, data in client.get_events()],
+            [('issue_created', 3), ('issue_created', 4), ('issue_status', 1)])
+
+    @async_to_sync
+    async def test_rollback(self):
+        client = StreamClient(self.token_user1)
+        await client.start()
+
+        @sync_to_async
+        def change():
+            with transaction.atomic():
+                Comment.objects.create(description='rolled back', issue_id=1,
+                                       author_id=1)
+                transaction.set_rollback(True)
+            Comment.objects.create(description='comment', issue_id=1,
+                                   author_id=1)
+
+        await change()
+        await client.wait_event('comment_created')
+        await client.close()
+        self.assertEquals(
+            [data['description'] for event, data in client.get_events()],
+            ['comment'])
+
+    @async_to_sync
+    async def test_memberships(self):
+        client = StreamClient(self.token_user2)
+        await client.start()
+        await sync_to_async(Contributor.objects.create)(
+            user_id=2, project_id=2, permission='contributeur',
+            role='contributeur')
+        await asyncio.wait_for(client.task, 5)
+        self.assertTrue(client.finished)
+        self.assertEquals(client.get_events(),
+                          [('memberships', {'user_id': 2})])
+
+    @override_settings(HELPDESK_EVENTS_QUEUE_SIZE=2)
+    @async_to_sync
+    async def test_overflow(self):
+        client = StreamClient(self.token_user1)
+        await client.start()
+        for i in range(3):
+            events.get_backend().publish(
+                events.project_channel(1), events.encode('test', {'i': i}))
+        await asyncio.wait_for(client.task, 5)
+        self.assertTrue(client.finished)
+        self.assertEquals(client.get_events(), [('overflow', {})])
+
+    @override_settings(HELPDESK_EVENTS_HEARTBEAT=0.01)
+    @async_to_sync
+    async def test_heartbeat(self):
+        client = StreamClient(self.token_user1)
+        await client.start()
+        await client.wait_for(lambda: ': ping' in client.body)
+        await client.close()
+        self.assertFalse(client.get_events())
@@ -0,0 +1,276 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.core.management import CommandError, call_command
+from django.core.signals import request_finished
+from django.test import TestCase, TransactionTestCase, Client
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.contrib.auth.hashers import make_password
+
+from .. import export
+from ..models import Project, Contributor, Issue, Comment
+
+
+def create_project():
+    """
+    Creates a project of 2 issues, whose comments are not created in the
+    order of the issues, and another project.
+    """
+    for username in ('user1', 'user2', 'user3'):
+        User.objects.create(username=username,
+                            password=make_password(username))
+    for pk in (1, 2):
+        Project.objects.create(title='title%s' % pk,
+                               description='description%s' % pk,
+                               type='projet')
+    for pk, permission in ((1, 'manager'), (2, 'contributeur')):
+        Contributor.objects.create(
+            user=User.objects.get(pk=pk),
+            project=Project.objects.get(pk=1),
+            permission=permission,
+            role=permission,
+        )
+    for pk, project in ((1, 1), (2, 1), (3, 2)):
+        Issue.objects.create(
+            title='title%s' % pk,
+            desc='description%s' % pk,
+            tag='bug',
+            priority='moyenne',
+            project=Project.objects.get(pk=project),
+            status='a faire',
+            author=User.objects.get(pk=1),
+            assignee=User.objects.get(pk=2) if pk == 1 else None,
+        )
+    for pk, issue in ((1, 2), (2, 1), (3, 3), (4, 1)):
+        Comment.objects.create(
+            description='comment%s' % pk,
+            author=User.objects.get(pk=2),
+            issue=Issue.objects.get(pk=issue),
+        )
+
+
+def parse_ndjson(content):
+    return [json.loads(line) for line in content.decode().splitlines()]
+
+
+class ExportTest(TestCase):
+
+    def setUp(self):
+        create_project()
+        self.export_url = reverse('project-export', kwargs={'pk': 1})
+        self.auth_url = reverse('token_obtain')
+        self.client_user2 = Client(
+            HTTP_AUTHORIZATION='Bearer '+self.get_token('user2', 'user2')
+            )
+        self.client_user3 = Client(
+            HTTP_AUTHORIZATION='Bearer '+self.get_token('user3', 'user3')
+            )
+
+    def get_token(self, username, password):
+        post = {'username': username, 'password': password}
+        response = self.client.post(self.auth_url, post)
+        data = json.loads(response.content)
+        return data['access']
+
+    def get_export(self, format):
+        response = self.client_user2.get(self.export_url,
+                                         {'format': format})
+        self.assertEquals(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content)
+
+    def test_ndjson(self):
+        response, content = self.get_export('ndjson')
+        self.assertEquals(response['Content-Type'], 'application/x-ndjson')
+        self.assertEquals(response['Content-Disposition'],
+                          'attachment; filename="project-1.ndjson"')
+        records = parse_ndjson(content)
+        self.assertEquals(records[0], {'project': {
+            'id': 1, 'title': 'title1', 'description': 'description1',
+            'type': 'projet'}})
+        self.assertEquals(records[1:3], [
+            {'contributor': {'user': 'user1', 'permission': 'manager',
+                             'role': 'manager'}},
+            {'contributor': {'user': 'user2', 'permission': 'contributeur',
+                             'role': 'contributeur'}}])
+        # Each issue is followed by its comments
+        self.assertEquals(
+            [(kind, data['id']) for record in records[3:]
+             for kind, data in record.items()],
+            [('issue', 1), ('comment', 2), ('comment', 4), ('issue', 2),
+             ('comment', 1)])
+        issue = records[3]['issue']
+        self.assertEquals(issue['author'], 'user1')
+        self.assertEquals(issue['assignee'], 'user2')
+        self.assertEquals(issue['created_time'],
+                          Issue.objects.get(pk=1).created_time.isoformat())
+        self.assertIsNone(records[6]['issue']['assignee'])
+        self.assertEquals(records[4]['comment']['issue_id'], 1)
+
+    def test_json(self):
+        response, content = self.get_export('json')
+        self.assertEquals(response['Content-Type'], 'application/json')
+        data = json.loads(content)
+        self.assertEquals(data['project']['title'], 'title1')
+        self.assertEquals([contributor['user']
+                           for contributor in data['contributors']],
+                          ['user1', 'user2'])
+        self.assertEquals(
+            [(issue['id'], [comment['description']
+                            for comment in issue['comments']])
+             for issue in data['issues']],
+            [(1, ['comment2', 'comment4']), (2, ['comment1'])])
+
+    def test_json_empty_project(self):
+        Issue.objects.filter(project=1).delete()
+        Contributor.objects.filter(project=1, user=1).delete()
+        response, content = self.get_export('json')
+        data = json.loads(content)
+        self.assertEquals(len(data['contributors']), 1)
+        self.assertEquals(data['issues'], [])
+        project = Project.objects.get(pk=2)
+        data = json.loads(b''.join(export.export(project, 'json')))
+        self.assertEquals(data['contributors'], [])
+        self.assertEquals(len(data['issues']), 1)
+
+    def test_not_contributor(self):
+        response = self.client_user3.get(self.export_url,
+                                         {'format': 'ndjson'})
+        self.assertEquals(response.status_code, 403)
+        response = self.client_user2.get(
+            reverse('project-export', kwargs={'pk': 3}))
+        self.assertEquals(response.status_code, 404)
+
+    def test_chunks(self):
+        project = Project.objects.get(pk=1)
+        content = b''.join(export.export(project))
+        chunks = list(export.export(project, chunk_size=1, buffer_size=100))
+        self.assertGreater(len(chunks), 3)
+        self.assertEquals(b''.join(chunks), content)
+
+    def test_timestamps(self):
+        # As read by SQLite, PostgreSQL and MySQL
+        for text in ('2021-03-12 07:35:00.123456',
+                     '2021-03-12 07:35:00.123456+00',
+                     '2021-03-12 07:35:00.123456+00:00'):
+            self.assertEquals(export.to_json(text),
+                              '2021-03-12T07:35:00.123456+00:00')
+        self.assertEquals(export.to_json('2021-03-12 07:35:00-05'),
+                          '2021-03-12T07:35:00-05:00')
+
+    def test_queries_independent_of_rows(self):
+        project = Project.objects.get(pk=1)
+        # The contributors, the issues and the comments
+        with self.assertNumQueries(3):
+            records = list(export.iter_records(project))
+        self.assertEquals(len(records), 8)
+        # A query by chunk, the rows following a full chunk being selected
+        # after its last row
+        with self.assertNumQueries(6):
+            self.assertEquals(
+                list(export.iter_records(project, chunk_size=2)), records)
+        self.assertEquals(list(export.iter_records(project, chunk_size=1)),
+                          records)
+
+    def test_interleaved_projects(self):
+        # Issues of both projects created at the same time, with comments
+        for pk in range(4, 10):
+            issue = Issue.objects.create(
+                title='title%s' % pk, desc='description', tag='bug',
+                priority='moyenne', project=Project.objects.get(pk=pk % 2 + 1),
+                status='a faire', author=User.objects.get(pk=1))
+            Comment.objects.create(description='comment', issue=issue,
+                                   author=User.objects.get(pk=1))
+        chunks = []
+        iter_chunks = export.iter_chunks
+
+        def read_chunks(queryset, fields, key, chunk_size):
+            for rows in iter_chunks(queryset, fields, key, chunk_size):
+                chunks.append((fields, rows))
+                yield rows
+
+        project = Project.objects.get(pk=1)
+        with mock.patch.object(export, 'iter_chunks', read_chunks):
+            records = list(export.iter_records(project, chunk_size=2))
+        issues = set(Issue.objects.filter(
+            project=project).values_list('pk', flat=True))
+        self.assertEquals(
+            sum(kind == 'comment' for kind, data in records),
+            Comment.objects.filter(issue__project=project).count())
+        # Only the comments of the project are read
+        self.assertEquals(
+            {row[1] for fields, rows in chunks if 'issue_id' in fields
+             for row in rows} - issues, set())
+
+    def test_command(self):
+        out = StringIO()
+        call_command('export_project', '1', stdout=out)
+        self.assertEquals(len(parse_ndjson(out.getvalue().encode())), 8)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'export.json')
+            call_command('export_project', '1', '--format', 'json',
+                         '--output', path, '--chunk-size', '1')
+            with open(path) as output:
+                data = json.load(output)
+        self.assertEquals(len(data['issues']), 2)
+        with self.assertRaises(CommandError):
+            call_command('export_project', '3')
+
+
+class ASGIExportTest(TransactionTestCase):
+    """
+    Streams the export from the ASGI handler, which iterates it outside of
+    the event loop.
+    """
+
+    reset_sequences = True
+
+    def setUp(self):
+        create_project()
+        response = self.client.post(reverse('token_obtain'),
+                                    {'username': 'user2',
+                                     'password': 'user2'})
+        self.token = json.loads(response.content)['access']
+
+    @async_to_sync
+    async def get(self, path, query):
+        from softdesk.asgi import django_application
+
+        scope = {'type': 'http', 'method': 'GET', 'path': path,
+                 'query_string': query.encode(),
+                 'headers': [(b'host', b'testserver'),
+                             (b'authorization',
+                              b'Bearer ' + self.token.encode())]}
+        messages = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b''}
+
+        async def send(message):
+            messages.append(message)
+
+        await django_application(scope, receive, send)
+        return messages
+
+    def test_stream(self):
+        finished = []
+
+        def receiver(**kwargs):
+            finished.append(kwargs)
+
+        request_finished.connect(receiver)
+        try:
+            messages = self.get('/api/projects/1/export/', 'format=ndjson')
+        finally:
+            request_finished.disconnect(receiver)
+        self.assertEquals(len(finished), 1)
+        self.assertEquals(messages[0]['status'], 200)
+        self.assertEquals(messages[-1], {'type': 'http.response.body'})
+        content = b''.join(message.get('body', b'')
+                           for message in messages[1:])
+        self.assertEquals(len(parse_ndjson(content)), 8)
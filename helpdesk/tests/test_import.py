@@ -0,0 +1,228 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.contrib.auth.hashers import make_password
+
+from .. import counters, search
+from ..models import (Project, Contributor, Issue, Comment, Change,
+                      ImportRun, ImportedIssue)
+
+RECORDS = [
+    {'project': {'id': 7, 'title': 'imported', 'description': 'description',
+                 'type': 'produit'}},
+    {'contributor': {'user': 'user1', 'permission': 'manager',
+                     'role': 'manager'}},
+    {'contributor': {'user': 'user2', 'permission': 'contributeur',
+                     'role': 'contributeur'}},
+    {'issue': {'id': 10, 'title': 'first issue', 'desc': 'description',
+               'tag': 'bug', 'priority': 'elevee', 'status': 'termine',
+               'author': 'user1', 'assignee': 'user2',
+               'created_time': '2020-01-02T10:00:00+00:00',
+               'updated_time': '2020-01-03T10:00:00+00:00',
+               'status_time': '2020-01-03T10:00:00+00:00'}},
+    {'comment': {'id': 1, 'issue_id': 10, 'description': 'first comment',
+                 'author': 'user2',
+                 'created_time': '2020-01-02T11:00:00+00:00'}},
+    {'issue': {'id': 11, 'title': 'second issue', 'desc': 'description',
+               'tag': 'tache', 'priority': 'faible', 'status': 'a faire',
+               'author': 'user2', 'assignee': None}},
+    {'comment': {'id': 2, 'issue_id': 11, 'description': 'second comment',
+                 'author': 'user1'}},
+    # A comment of an issue of a previous batch
+    {'comment': {'id': 3, 'issue_id': 10, 'description': 'third comment',
+                 'author': 'user1'}},
+]
+
+
+class ImportTest(TestCase):
+
+    def setUp(self):
+        User.objects.create(username='user1', password=make_password('user1'))
+        User.objects.create(username='user2', password=make_password('user2'))
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, records, name='project.ndjson'):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w') as file:
+            for record in records:
+                file.write(json.dumps(record) + '\n')
+        return path
+
+    def import_project(self, path, *args):
+        out = StringIO()
+        call_command('import_project', path, *args, stdout=out)
+        return out.getvalue()
+
+    def check_project(self):
+        project = Project.objects.get(title='imported')
+        self.assertEquals(project.type, 'produit')
+        self.assertEquals(
+            sorted(Contributor.objects.filter(project=project).values_list(
+                'user__username', 'permission')),
+            [('user1', 'manager'), ('user2', 'contributeur')])
+        first, second = Issue.objects.filter(project=project).order_by('pk')
+        self.assertEquals(first.title, 'first issue')
+        self.assertEquals(first.author.username, 'user1')
+        self.assertEquals(first.assignee.username, 'user2')
+        self.assertEquals(first.created_time.isoformat(),
+                          '2020-01-02T10:00:00+00:00')
+        self.assertEquals(first.status_time.isoformat(),
+                          '2020-01-03T10:00:00+00:00')
+        self.assertIsNone(second.assignee)
+        self.assertEquals(first.comment_count, 2)
+        self.assertEquals(second.comment_count, 1)
+        self.assertEquals(
+            list(Comment.objects.filter(issue=first).values_list(
+                'description', flat=True)),
+            ['first comment', 'third comment'])
+        self.assertEquals(counters.check_issue_counters(), [])
+        self.assertEquals(counters.check_comment_counts(), [])
+        self.assertEquals(
+            [(hit['type'], hit['issue_id'])
+             for hit in search.search(['third'], [project.pk])[:10]],
+            [('comment', first.pk)])
+        # The project creation, 2 contributors, 2 issues and 3 comments
+        self.assertEquals(Change.objects.filter(project=project).count(), 8)
+        return project
+
+    def test_import(self):
+        out = self.import_project(self.write(RECORDS), '--batch-size', '3')
+        self.assertIn('8 record(s) imported', out)
+        project = self.check_project()
+        run = ImportRun.objects.get()
+        self.assertEquals(run.project, project)
+        self.assertEquals(run.records, 8)
+        self.assertTrue(run.finished)
+        self.assertFalse(ImportedIssue.objects.exists())
+
+    def test_export(self):
+        self.import_project(self.write(RECORDS))
+        project = Project.objects.get(title='imported')
+        path = os.path.join(self.directory, 'export.ndjson')
+        call_command('export_project', str(project.pk), '--output', path)
+        self.import_project(path)
+        copy = Project.objects.exclude(pk=project.pk).get()
+        self.assertEquals(
+            list(Issue.objects.filter(project=copy).values_list(
+                'title', 'created_time', 'comment_count')),
+            list(Issue.objects.filter(project=project).values_list(
+                'title', 'created_time', 'comment_count')))
+
+    def test_csv(self):
+        path = os.path.join(self.directory, 'project.csv')
+        with open(path, 'w') as file:
+            file.write(
+                'record,id,title,description,type,user,permission,role,'
+                'desc,tag,priority,status,author,assignee,issue_id,'
+                'created_time\n'
+                'project,,imported,description,produit,,,,,,,,,,,\n'
+                'contributor,,,,,user1,manager,manager,,,,,,,,\n'
+                'issue,10,first issue,,,,,,description,bug,elevee,termine,'
+                'user1,user2,,2020-01-02 10:00:00\n'
+                'comment,1,,first comment,,,,,,,,,user2,,10,\n')
+        self.import_project(path)
+        issue = Issue.objects.get(project__title='imported')
+        self.assertEquals(issue.assignee.username, 'user2')
+        self.assertEquals(issue.created_time.isoformat(),
+                          '2020-01-02T10:00:00+00:00')
+        self.assertEquals(issue.comment_count, 1)
+
+    def test_unknown_users(self):
+        records = RECORDS + [{'comment': {
+            'issue_id': 11, 'description': 'comment', 'author': 'user3'}}]
+        path = self.write(records)
+        with self.assertRaisesMessage(CommandError, 'Unknown user(s) user3'):
+            self.import_project(path)
+        self.assertFalse(Project.objects.exists())
+        self.import_project(path, '--resume', str(ImportRun.objects.get().pk),
+                            '--create-users')
+        user = User.objects.get(username='user3')
+        self.assertFalse(user.has_usable_password())
+        self.assertEquals(Comment.objects.filter(author=user).count(), 1)
+
+    def test_resume(self):
+        records = list(RECORDS)
+        records[6] = {'comment': {'issue_id': 12, 'description': 'comment',
+                                  'author': 'user1'}}
+        path = self.write(records)
+        with self.assertRaisesMessage(CommandError, 'Record 7: Unknown '
+                                      'issue 12. Resume the import with '
+                                      '--resume'):
+            self.import_project(path, '--batch-size', '3')
+        # The first 2 batches were imported
+        run = ImportRun.objects.get()
+        self.assertEquals(run.records, 6)
+        self.assertFalse(run.finished)
+        self.assertEquals(Issue.objects.count(), 2)
+        self.assertEquals(ImportedIssue.objects.count(), 2)
+
+        self.write(RECORDS)
+        out = self.import_project(path, '--batch-size', '3', '--resume',
+                                  str(run.pk))
+        self.assertIn('from record 7', out)
+        self.assertIn('2 record(s) imported', out)
+        self.check_project()
+        with self.assertRaisesMessage(CommandError, 'is finished'):
+            self.import_project(path, '--resume', str(run.pk))
+
+    def test_duplicate_contributor(self):
+        # Also found among the contributors of the batches already imported
+        path = self.write(RECORDS[:6] + RECORDS[1:2])
+        message = ('Record 7: The user user1 is already a contributor. '
+                   'Resume the import with --resume')
+        with self.assertRaisesMessage(CommandError, message):
+            self.import_project(path, '--batch-size', '3')
+        run = ImportRun.objects.get()
+        with self.assertRaisesMessage(CommandError, message):
+            self.import_project(path, '--batch-size', '3', '--resume',
+                                str(run.pk))
+        self.assertEquals(Contributor.objects.count(), 2)
+
+    def test_invalid_records(self):
+        for records, message in (
+                (RECORDS[1:], 'Record 1: The first record must be the '
+                              'project'),
+                (RECORDS[:3] + [{'issue': {}}], 'Record 4: The title field '
+                                                'is required'),
+                (RECORDS[:1] + [{'contributor': {
+                    'user': 'user1', 'permission': 'owner'}}],
+                 'Record 2: "owner" is not a valid permission'),
+                (RECORDS[:1] + [{'milestone': {}}],
+                 'Record 2: Unknown record "milestone"'),
+                (RECORDS[:3] + [{'issue': dict(
+                    RECORDS[3]['issue'], desc={'text': 'description'})}],
+                 'Record 4: The desc field must be a string'),
+                (RECORDS[:3] + [{'issue': dict(
+                    RECORDS[3]['issue'], title=['first', 'issue'])}],
+                 'Record 4: The title field must be a string'),
+                (RECORDS[:5] + [{'comment': dict(
+                    RECORDS[4]['comment'], description='x' * 2049)}],
+                 'Record 6: The description field has more than 2048 '
+                 'characters'),
+                (RECORDS[:1] + [{'contributor': dict(
+                    RECORDS[1]['contributor'], role='x' * 129)}],
+                 'Record 2: The role field has more than 128 characters'),
+                (RECORDS[:1] + [{'contributor': dict(
+                    RECORDS[1]['contributor'], user=1)}],
+                 'Record 2: "1" is not a valid user'),
+                (RECORDS[:2] + [{'contributor': dict(
+                    RECORDS[1]['contributor'], role='other')}],
+                 'Record 3: The user %s is already a contributor'
+                 % RECORDS[1]['contributor']['user'])):
+            with self.assertRaisesMessage(CommandError, message):
+                self.import_project(self.write(records))
+        path = os.path.join(self.directory, 'invalid.ndjson')
+        with open(path, 'w') as file:
+            file.write(json.dumps(RECORDS[0]) + '\n{"issue"\n')
+        with self.assertRaisesMessage(CommandError, 'Record 2: Invalid JSON'):
+            self.import_project(path)
+        self.assertFalse(Project.objects.exists())
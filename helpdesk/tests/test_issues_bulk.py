@@ -0,0 +1,136 @@
+import json
+
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.contrib.auth.hashers import make_password
+
+from ..models import Project, Contributor, Issue
+
+
+class IssueBulkTest(TestCase):
+
+    def setUp(self):
+        User.objects.create(username='user1', password=make_password('user1'))
+        User.objects.create(username='user2', password=make_password('user2'))
+        User.objects.create(username='user3', password=make_password('user3'))
+
+        Project.objects.create(title='title1', description='description1',
+                               type='projet')
+
+        Contributor.objects.create(
+            user=User.objects.get(pk=1),
+            project=Project.objects.get(pk=1),
+            permission='manager',
+            role='manager',
+        )
+
+        Contributor.objects.create(
+            user=User.objects.get(pk=2),
+            project=Project.objects.get(pk=1),
+            permission='contributeur',
+            role='contributeur',
+        )
+
+        Issue.objects.create(
+            title='title1',
+            desc='description1',
+            tag='bug',
+            priority='moyenne',
+            project=Project.objects.get(pk=1),
+            status='a faire',
+            author=User.objects.get(pk=2),
+            assignee=User.objects.get(pk=2),
+        )
+
+        self.bulk_url = '/api/projects/1/issues/bulk/'
+        self.auth_url = reverse('token_obtain')
+
+        self.client_user1 = Client(
+            HTTP_AUTHORIZATION='Bearer '+self.get_token('user1', 'user1')
+            )
+        self.client_user3 = Client(
+            HTTP_AUTHORIZATION='Bearer '+self.get_token('user3', 'user3')
+            )
+
+    def get_token(self, username, password):
+        post = {'username': username, 'password': password}
+        response = self.client.post(self.auth_url, post)
+        data = json.loads(response.content)
+        return data['access']
+
+    def get_items(self, count, assignee='user2'):
+        return [{'title': 'bulk' + str(i), 'desc': 'description',
+                 'tag': 'bug', 'priority': 'faible', 'status': 'a faire',
+                 'assignee': assignee}
+                for i in range(count)]
+
+    def post(self, client, items, method='post'):
+        return getattr(client, method)(
+            self.bulk_url, json.dumps(items), content_type='application/json')
+
+    def test_create(self):
+        response = self.post(self.client_user1, self.get_items(3))
+        self.assertEquals(response.status_code, 201)
+        data = json.loads(response.content)
+        self.assertEquals([item['status'] for item in data], [201] * 3)
+        issues = Issue.objects.filter(title__startswith='bulk')
+        self.assertEquals(
+            [item['data']['issue_id'] for item in data],
+            list(issues.order_by('pk').values_list('pk', flat=True)))
+        self.assertEquals(data[0]['data']['author'], 'user1')
+        self.assertEquals(data[0]['data']['assignee'], 'user2')
+        self.assertEquals(issues.filter(project=1, author=1).count(), 3)
+
+    def test_create_partial_errors(self):
+        items = self.get_items(1) + self.get_items(1, 'user3') \
+            + self.get_items(1, 'wrong_assignee') + [{'title': 'bulk'}]
+        response = self.post(self.client_user1, items)
+        self.assertEquals(response.status_code, 207)
+        data = json.loads(response.content)
+        self.assertEquals([item['status'] for item in data],
+                          [201, 400, 400, 400])
+        self.assertIn('assignee', data[1]['data'])
+        self.assertIn('desc', data[3]['data'])
+        self.assertEquals(
+            Issue.objects.filter(title__startswith='bulk').count(), 1)
+
+    def test_create_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            self.post(self.client_user1, self.get_items(2))
+        with self.assertNumQueries(len(context)):
+            response = self.post(self.client_user1, self.get_items(50))
+        self.assertEquals(response.status_code, 201)
+
+    def test_create_non_contributor(self):
+        response = self.post(self.client_user3, self.get_items(1))
+        self.assertEquals(response.status_code, 403)
+
+    def test_create_not_a_list(self):
+        response = self.post(self.client_user1, self.get_items(1)[0])
+        self.assertEquals(response.status_code, 400)
+
+    @override_settings(HELPDESK_BULK_MAX_ITEMS=2)
+    def test_create_too_many_items(self):
+        response = self.post(self.client_user1, self.get_items(3))
+        self.assertEquals(response.status_code, 400)
+        self.assertFalse(Issue.objects.filter(title__startswith='bulk'))
+
+    def test_update(self):
+        self.post(self.client_user1, self.get_items(2))
+        items = [{'issue_id': 2, 'status': 'termine'},
+                 {'issue_id': 3, 'assignee': 'user1'},
+                 {'issue_id': 1, 'status': 'termine'},
+                 {'issue_id': 4, 'status': 'termine'},
+                 {'issue_id': 2, 'priority': 'wrong'}]
+        response = self.post(self.client_user1, items, 'patch')
+        self.assertEquals(response.status_code, 207)
+        data = json.loads(response.content)
+        self.assertEquals([item['status'] for item in data],
+                          [200, 200, 403, 404, 400])
+        self.assertEquals(Issue.objects.get(pk=2).status, 'termine')
+        self.assertEquals(Issue.objects.get(pk=2).priority, 'faible')
+        self.assertEquals(Issue.objects.get(pk=3).assignee.username, 'user1')
+        self.assertEquals(Issue.objects.get(pk=1).status, 'a faire')
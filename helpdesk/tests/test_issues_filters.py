@@ -0,0 +1,132 @@
+import json
+
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.contrib.auth.hashers import make_password
+
+from ..models import Project, Contributor, Issue
+
+
+class IssueFiltersTest(TestCase):
+
+    def setUp(self):
+        User.objects.create(username='user1', password=make_password('user1'))
+        User.objects.create(username='user2', password=make_password('user2'))
+
+        Project.objects.create(title='title1', description='description1',
+                               type='projet')
+
+        for pk in (1, 2):
+            Contributor.objects.create(
+                user=User.objects.get(pk=pk),
+                project=Project.objects.get(pk=1),
+                permission='manager' if pk == 1 else 'contributeur',
+                role='role',
+            )
+
+        issues = [
+            ('bug', 'faible', 'a faire', 1),
+            ('tache', 'elevee', 'en cours', 2),
+            ('bug', 'moyenne', 'termine', 2),
+            ('amelioration', 'elevee', 'a faire', 1),
+            ('bug', 'faible', 'en cours', 2),
+        ]
+        for i, (tag, priority, status, assignee) in enumerate(issues):
+            Issue.objects.create(
+                title='title' + str(i),
+                desc='description' + str(i),
+                tag=tag,
+                priority=priority,
+                project=Project.objects.get(pk=1),
+                status=status,
+                author=User.objects.get(pk=1),
+                assignee=User.objects.get(pk=assignee),
+            )
+
+        self.issues_url = '/api/projects/1/issues/'
+        self.auth_url = reverse('token_obtain')
+
+        self.client_user1 = Client(
+            HTTP_AUTHORIZATION='Bearer '+self.get_token('user1', 'user1')
+            )
+
+    def get_token(self, username, password):
+        post = {'username': username, 'password': password}
+        response = self.client.post(self.auth_url, post)
+        data = json.loads(response.content)
+        return data['access']
+
+    def get_ids(self, query):
+        response = self.client_user1.get(self.issues_url + query)
+        self.assertEquals(response.status_code, 200)
+        data = json.loads(response.content)
+        return [item['issue_id'] for item in data['results']]
+
+    def test_filter_status(self):
+        self.assertEquals(self.get_ids('?status=en cours'), [2, 5])
+        self.assertEquals(self.get_ids('?status=a faire&status=termine'),
+                          [1, 3, 4])
+
+    def test_filter_priority_and_tag(self):
+        self.assertEquals(self.get_ids('?priority=faible'), [1, 5])
+        self.assertEquals(self.get_ids('?priority=elevee&tag=tache'), [2])
+
+    def test_filter_assignee(self):
+        self.assertEquals(self.get_ids('?assignee=user2'), [2, 3, 5])
+        self.assertEquals(self.get_ids('?assignee=unknown'), [])
+
+    def test_filter_invalid_choice(self):
+        for query in ('?status=wrong', '?priority=urgente', '?tag=Bug'):
+            response = self.client_user1.get(self.issues_url + query)
+            self.assertEquals(response.status_code, 400)
+
+    def test_sort(self):
+        self.assertEquals(self.get_ids('?ordering=-created_time'),
+                          [5, 4, 3, 2, 1])
+        self.assertEquals(self.get_ids('?ordering=priority'),
+                          [2, 4, 3, 1, 5])
+        self.assertEquals(self.get_ids('?ordering=-priority'),
+                          [5, 1, 3, 4, 2])
+
+    def test_sort_invalid(self):
+        response = self.client_user1.get(self.issues_url + '?ordering=title')
+        self.assertEquals(response.status_code, 400)
+
+    def test_filter_and_sort_paginated(self):
+        url = self.issues_url + '?ordering=priority&status=a faire' \
+            '&status=en cours&page_size=2'
+        ids = []
+        while url is not None:
+            response = self.client_user1.get(url)
+            data = json.loads(response.content)
+            ids.append([item['issue_id'] for item in data['results']])
+            url = data['next']
+        self.assertEquals(ids, [[2, 4], [1, 5]])
+
+    def test_priority_rank(self):
+        issue = Issue.objects.get(pk=1)
+        issue.priority = 'elevee'
+        issue.save()
+        self.assertEquals(self.get_ids('?ordering=priority&page_size=3'),
+                          [1, 2, 4])
+        response = self.client_user1.patch(
+            self.issues_url + 'bulk/',
+            json.dumps([{'issue_id': 2, 'priority': 'faible'}]),
+            content_type='application/json')
+        self.assertEquals(response.status_code, 200)
+        self.assertEquals(self.get_ids('?ordering=priority&page_size=3'),
+                          [1, 4, 3])
+
+    def test_filtered_list_uses_index(self):
+        with CaptureQueriesContext(connection) as context:
+            self.get_ids('?status=a faire&ordering=priority')
+        sql = [query['sql'] for query in context.captured_queries
+               if query['sql'].startswith('SELECT "helpdesk_issue"')][0]
+        with connection.cursor() as cursor:
+            cursor.execute(connection.ops.explain_query_prefix() + ' ' + sql)
+            plan = ' '.join(str(row[-1]) for row in cursor.fetchall())
+        self.assertIn('INDEX', plan)
+        self.assertNotIn('SCAN TABLE helpdesk_issue ', plan + ' ')
@@ -0,0 +1,127 @@
+import json
+
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.contrib.auth.hashers import make_password
+
+from ..models import Project, Contributor, Issue, Comment
+
+
+class IssueQueriesTest(TestCase):
+    """
+    Checks that the number of queries of the issue and comment endpoints does
+    not depend on the number of rows returned.
+    """
+
+    def setUp(self):
+        User.objects.create(username='user1', password=make_password('user1'))
+        User.objects.create(username='user2', password=make_password('user2'))
+
+        Project.objects.create(title='title1', description='description1',
+                               type='projet')
+
+        Contributor.objects.create(
+            user=User.objects.get(pk=1),
+            project=Project.objects.get(pk=1),
+            permission='manager',
+            role='manager',
+        )
+
+        Contributor.objects.create(
+            user=User.objects.get(pk=2),
+            project=Project.objects.get(pk=1),
+            permission='contributeur',
+            role='contributeur',
+        )
+
+        self.create_issues(1)
+        self.create_comments(1)
+
+        self.issues_url = '/api/projects/1/issues/'
+        self.issue_url = '/api/projects/1/issues/1/'
+        self.comments_url = '/api/projects/1/issues/1/comments/'
+        self.comment_url = '/api/projects/1/issues/1/comments/1/'
+        self.auth_url = reverse('token_obtain')
+
+        self.client_user1 = Client(
+            HTTP_AUTHORIZATION='Bearer '+self.get_token('user1', 'user1')
+            )
+
+    def get_token(self, username, password):
+        post = {'username': username, 'password': password}
+        response = self.client.post(self.auth_url, post)
+        data = json.loads(response.content)
+        return data['access']
+
+    def create_issues(self, count):
+        for i in range(count):
+            Issue.objects.create(
+                title='title',
+                desc='description',
+                tag='bug',
+                priority='moyenne',
+                project=Project.objects.get(pk=1),
+                status='a faire',
+                author=User.objects.get(pk=1 + i % 2),
+                assignee=User.objects.get(pk=2 - i % 2),
+            )
+
+    def create_comments(self, count):
+        for i in range(count):
+            Comment.objects.create(
+                description='description',
+                author=User.objects.get(pk=1 + i % 2),
+                issue=Issue.objects.get(pk=1),
+            )
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client_user1.get(url)
+        self.assertEquals(response.status_code, 200)
+        return len(context)
+
+    def test_list_issues(self):
+        queries = self.count_queries(self.issues_url)
+        self.create_issues(20)
+        with self.assertNumQueries(queries):
+            response = self.client_user1.get(self.issues_url)
+        self.assertEquals(len(json.loads(response.content)['results']), 21)
+
+    def test_list_comments(self):
+        queries = self.count_queries(self.comments_url)
+        self.create_comments(20)
+        with self.assertNumQueries(queries):
+            response = self.client_user1.get(self.comments_url)
+        self.assertEquals(len(json.loads(response.content)['results']), 21)
+
+    def test_retrieve_issue(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client_user1.get(self.issue_url)
+        self.assertContains(response, 'user2')
+        # Only the authentication may query the user table
+        self.assertLessEqual(self.count_user_queries(context), 1)
+
+    def test_retrieve_comment(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client_user1.get(self.comment_url)
+        self.assertContains(response, 'user1')
+        self.assertLessEqual(self.count_user_queries(context), 1)
+
+    def count_user_queries(self, context):
+        return len([query for query in context.captured_queries
+                    if query['sql'].startswith('SELECT')
+                    and 'FROM "auth_user"' in query['sql']])
+
+    def test_delete_issue(self):
+        self.create_comments(20)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client_user1.delete(self.issue_url)
+        self.assertEquals(response.status_code, 204)
+        self.assertEquals(Comment.objects.count(), 0)
+        deletes = [query for query in context.captured_queries
+                   if query['sql'].startswith('DELETE')]
+        # Whatever the number of comments
+        self.assertLessEqual(len(deletes), 3)
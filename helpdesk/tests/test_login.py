@@ -0,0 +1,139 @@
+import asyncio
+import json
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.core.cache import cache, caches
+from django.test import (AsyncClient, TestCase, TransactionTestCase,
+                         override_settings)
+from django.urls import resolve, reverse
+from django.contrib.auth.models import User
+from django.contrib.auth.hashers import check_password, make_password
+
+from users.checks import check_throttle_cache
+from users.hashers import ScryptPasswordHasher
+
+
+class LoginTest(TestCase):
+
+    def setUp(self):
+        # The throttles keep their history in the cache
+        cache.clear()
+        User.objects.create(username='user1', password=make_password('user1'))
+        self.auth_url = reverse('token_obtain')
+
+    def tearDown(self):
+        cache.clear()
+
+    def login(self, username, password, **extra):
+        post = {'username': username, 'password': password}
+        return self.client.post(self.auth_url, post, **extra)
+
+    def test_scrypt(self):
+        password = User.objects.get(username='user1').password
+        self.assertTrue(password.startswith('scrypt$16384$'))
+        self.assertTrue(check_password('user1', password))
+        self.assertFalse(check_password('user2', password))
+
+    def test_rehash_on_login(self):
+        User.objects.create(
+            username='user2',
+            password=make_password('user2', hasher='pbkdf2_sha256'))
+        response = self.login('user2', 'user2')
+        self.assertEquals(response.status_code, 200)
+        password = User.objects.get(username='user2').password
+        self.assertTrue(password.startswith('scrypt$'))
+        self.assertEquals(self.login('user2', 'user2').status_code, 200)
+
+    @override_settings(USERS_SCRYPT_WORK_FACTOR=2 ** 12)
+    def test_rehash_on_cost_change(self):
+        self.assertTrue(ScryptPasswordHasher().must_update(
+            User.objects.get(username='user1').password))
+        self.assertEquals(self.login('user1', 'user1').status_code, 200)
+        password = User.objects.get(username='user1').password
+        self.assertTrue(password.startswith('scrypt$4096$'))
+
+    def test_username_throttle(self):
+        for i in range(5):
+            response = self.login('user1', 'wrong')
+            self.assertEquals(response.status_code, 401)
+        with mock.patch.object(ScryptPasswordHasher, 'verify') as verify:
+            response = self.login('user1', 'user1')
+            verify.assert_not_called()
+        self.assertEquals(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        # Another username is still allowed
+        self.assertEquals(self.login('user2', 'user2').status_code, 401)
+
+    def test_ip_throttle(self):
+        for i in range(30):
+            self.login('user%s' % i, 'wrong')
+        self.assertEquals(self.login('user1', 'user1').status_code, 429)
+        response = self.login('user1', 'user1', REMOTE_ADDR='10.0.0.1')
+        self.assertEquals(response.status_code, 200)
+
+    def test_ip_throttle_forwarded_for(self):
+        # The X-Forwarded-For header of the clients is ignored without proxies
+        for i in range(30):
+            self.login('user%s' % i, 'wrong',
+                       HTTP_X_FORWARDED_FOR='10.0.1.%d' % i)
+        response = self.login('user1', 'user1',
+                              HTTP_X_FORWARDED_FOR='10.0.2.1')
+        self.assertEquals(response.status_code, 429)
+
+    @override_settings(CACHES={
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        'throttles': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'throttles'},
+    }, USERS_THROTTLE_CACHE='throttles')
+    def test_throttle_cache(self):
+        for i in range(5):
+            self.login('user1', 'wrong')
+        self.assertEquals(self.login('user1', 'user1').status_code, 429)
+        caches['throttles'].clear()
+        self.assertEquals(self.login('user1', 'user1').status_code, 200)
+        self.assertEquals(
+            [error.id for error in check_throttle_cache(None)],
+            ['users.W001'])
+
+    def test_successes_not_counted(self):
+        for i in range(10):
+            self.assertEquals(self.login('user1', 'user1').status_code, 200)
+        self.assertEquals(self.login('user1', 'wrong').status_code, 401)
+
+
+class AsyncLoginTest(TransactionTestCase):
+
+    def setUp(self):
+        cache.clear()
+        User.objects.create(username='user1', password=make_password('user1'))
+
+    def test_async_views(self):
+        for url in ('/api/login/', '/api/signup/'):
+            match = resolve(url, 'softdesk.asgi_urls')
+            self.assertTrue(asyncio.iscoroutinefunction(match.func), url)
+            self.assertFalse(asyncio.iscoroutinefunction(resolve(url).func))
+
+    @override_settings(ROOT_URLCONF='softdesk.asgi_urls')
+    @async_to_sync
+    async def post(self, url, data):
+        return await AsyncClient().post(url, json.dumps(data),
+                                        content_type='application/json')
+
+    def test_login(self):
+        response = self.post('/api/login/',
+                             {'username': 'user1', 'password': 'user1'})
+        self.assertEquals(response.status_code, 200)
+        self.assertIn('access', json.loads(response.content))
+        response = self.post('/api/login/',
+                             {'username': 'user1', 'password': 'wrong'})
+        self.assertEquals(response.status_code, 401)
+
+    def test_signup(self):
+        response = self.post('/api/signup/',
+                             {'username': 'user2', 'password': 'Pass-word42'})
+        self.assertEquals(response.status_code, 201)
+        self.assertTrue(check_password(
+            'Pass-word42', User.objects.get(username='user2').password))
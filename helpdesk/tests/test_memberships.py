@@ -0,0 +1,194 @@
+import json
+import tempfile
+
+from django.db import connection, transaction
+from django.test import (TestCase, TransactionTestCase, Client,
+                         override_settings)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.contrib.auth.hashers import make_password
+
+from ..memberships import (ProjectMemberships, get_cache, get_stats,
+                           local_stats)
+from ..models import Project, Contributor
+
+
+def use_shared_cache(test):
+    """
+    Caches the memberships of a test in a file based cache, shared by the
+    processes, rather than in the local memory one, which is not used.
+    """
+    directory = tempfile.TemporaryDirectory()
+    test.addCleanup(directory.cleanup)
+    settings = override_settings(CACHES={
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+        'memberships': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': directory.name,
+        },
+    }, HELPDESK_MEMBERSHIP_CACHE='memberships')
+    settings.enable()
+    test.addCleanup(settings.disable)
+
+
+class MembershipsTest(TestCase):
+
+    def setUp(self):
+        User.objects.create(username='user1', password=make_password('user1'))
+        User.objects.create(username='user2', password=make_password('user2'))
+
+        Project.objects.create(title='title1', description='description1',
+                               type='projet')
+        Project.objects.create(title='title2', description='description2',
+                               type='projet')
+
+        Contributor.objects.create(
+            user=User.objects.get(pk=1),
+            project=Project.objects.get(pk=1),
+            permission='manager',
+            role='manager',
+        )
+
+        Contributor.objects.create(
+            user=User.objects.get(pk=2),
+            project=Project.objects.get(pk=1),
+            permission='contributeur',
+            role='contributeur',
+        )
+
+        Contributor.objects.create(
+            user=User.objects.get(pk=1),
+            project=Project.objects.get(pk=2),
+            permission='contributeur',
+            role='contributeur',
+        )
+
+        self.auth_url = reverse('token_obtain')
+
+        self.client_user1 = Client(
+            HTTP_AUTHORIZATION='Bearer '+self.get_token('user1', 'user1')
+            )
+
+    def get_token(self, username, password):
+        post = {'username': username, 'password': password}
+        response = self.client.post(self.auth_url, post)
+        data = json.loads(response.content)
+        return data['access']
+
+    def count_contributor_queries(self, context):
+        return len([query for query in context.captured_queries
+                    if query['sql'].startswith(
+                        'SELECT "helpdesk_contributor"')])
+
+    def test_memberships_single_query(self):
+        memberships = ProjectMemberships(User.objects.get(pk=1))
+        with self.assertNumQueries(1):
+            self.assertTrue(memberships.is_manager(1))
+            self.assertTrue(memberships.is_contributor(2))
+            self.assertFalse(memberships.is_manager(2))
+            self.assertFalse(memberships.is_contributor(3))
+
+    def test_update_project_manager(self):
+        post = {'title': 'title_update', 'description': 'description1',
+                'type': 'projet'}
+        with CaptureQueriesContext(connection) as context:
+            response = self.client_user1.put(
+                '/api/projects/1/', post, content_type='application/json')
+        self.assertEquals(response.status_code, 200)
+        self.assertEquals(self.count_contributor_queries(context), 1)
+
+    def test_delete_user_contributor(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client_user1.delete('/api/projects/1/users/2/')
+        self.assertEquals(response.status_code, 204)
+        # The memberships of the user, and the contributor to delete
+        self.assertEquals(self.count_contributor_queries(context), 2)
+
+
+class MembershipsCacheTest(TransactionTestCase):
+    """
+    The shared cache is only used outside of transactions, hence the
+    TransactionTestCase, and with a backend shared by the processes, such as
+    the file based one.
+    """
+
+    def setUp(self):
+        use_shared_cache(self)
+        local_stats.clear()
+        self.user1 = User.objects.create(username='user1')
+        self.user2 = User.objects.create(username='user2')
+        self.project = Project.objects.create(
+            title='title1', description='description1', type='projet')
+        self.contributor = Contributor.objects.create(
+            user=self.user1,
+            project=self.project,
+            permission='manager',
+            role='manager',
+        )
+
+    def test_cache_hit(self):
+        with self.assertNumQueries(1):
+            self.assertTrue(ProjectMemberships(self.user1).is_manager(
+                self.project.pk))
+        with self.assertNumQueries(0):
+            self.assertTrue(ProjectMemberships(self.user1).is_manager(
+                self.project.pk))
+        self.assertEquals(get_stats(), {'hits': 1, 'misses': 1})
+
+    def test_invalidation_on_create(self):
+        self.assertFalse(ProjectMemberships(self.user2).is_contributor(
+            self.project.pk))
+        Contributor.objects.create(
+            user=self.user2,
+            project=self.project,
+            permission='contributeur',
+            role='contributeur',
+        )
+        self.assertTrue(ProjectMemberships(self.user2).is_contributor(
+            self.project.pk))
+
+    def test_invalidation_on_delete(self):
+        self.assertTrue(ProjectMemberships(self.user1).is_contributor(
+            self.project.pk))
+        self.contributor.delete()
+        self.assertFalse(ProjectMemberships(self.user1).is_contributor(
+            self.project.pk))
+
+    def test_evicted_version(self):
+        self.assertTrue(ProjectMemberships(self.user1).is_contributor(
+            self.project.pk))
+        get_cache().delete('helpdesk:memberships:version:%s' % self.user1.pk)
+        Contributor.objects.filter(pk=self.contributor.pk).update(
+            permission='contributeur')
+        self.assertFalse(ProjectMemberships(self.user1).is_manager(
+            self.project.pk))
+
+    def test_stats_batch(self):
+        with self.settings(HELPDESK_MEMBERSHIP_STATS_BATCH=2):
+            for i in range(3):
+                ProjectMemberships(self.user1).is_contributor(self.project.pk)
+        self.assertEquals(get_cache().get('helpdesk:memberships:hits'), 1)
+        self.assertEquals(get_cache().get('helpdesk:memberships:misses'), 1)
+        self.assertEquals(get_stats(), {'hits': 2, 'misses': 1})
+
+    def test_local_cache(self):
+        # Not invalidated in the other processes, so not used
+        with self.settings(HELPDESK_MEMBERSHIP_CACHE='default'):
+            self.assertIsNone(get_cache())
+            for i in range(2):
+                with self.assertNumQueries(1):
+                    ProjectMemberships(self.user1).is_contributor(
+                        self.project.pk)
+            self.contributor.delete()
+            self.assertFalse(ProjectMemberships(self.user1).is_contributor(
+                self.project.pk))
+
+    def test_no_cache_in_transaction(self):
+        with transaction.atomic():
+            with self.assertNumQueries(2):
+                ProjectMemberships(self.user1).is_contributor(self.project.pk)
+                ProjectMemberships(self.user1).is_contributor(self.project.pk)
+        self.assertEquals(get_stats(), {'hits': 0, 'misses': 0})
@@ -0,0 +1,95 @@
+import json
+
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+
+from ..models import Project, Contributor, Issue, Comment
+
+
+class PaginationTest(TestCase):
+
+    def setUp(self):
+        User.objects.create(username='user1', password=make_password('user1'))
+
+        Project.objects.create(title='title1', description='description1',
+                               type='projet')
+
+        Contributor.objects.create(
+            user=User.objects.get(pk=1),
+            project=Project.objects.get(pk=1),
+            permission='manager',
+            role='manager',
+        )
+
+        for i in range(5):
+            Issue.objects.create(
+                title='title' + str(i),
+                desc='description' + str(i),
+                tag='bug',
+                priority='moyenne',
+                project=Project.objects.get(pk=1),
+                status='a faire',
+                author=User.objects.get(pk=1),
+                assignee=User.objects.get(pk=1),
+            )
+
+        for i in range(5):
+            Comment.objects.create(
+                description='description' + str(i),
+                author=User.objects.get(pk=1),
+                issue=Issue.objects.get(pk=1),
+            )
+
+        # Identical timestamps, so that the pages are split on the id
+        Issue.objects.update(created_time=timezone.now())
+        Comment.objects.update(created_time=timezone.now())
+
+        self.issues_url = '/api/projects/1/issues/'
+        self.comments_url = '/api/projects/1/issues/1/comments/'
+        self.auth_url = reverse('token_obtain')
+
+        self.client_user1 = Client(
+            HTTP_AUTHORIZATION='Bearer '+self.get_token('user1', 'user1')
+            )
+
+    def get_token(self, username, password):
+        post = {'username': username, 'password': password}
+        response = self.client.post(self.auth_url, post)
+        data = json.loads(response.content)
+        return data['access']
+
+    def browse(self, url, direction):
+        ids = []
+        while url is not None:
+            response = self.client_user1.get(url)
+            self.assertEquals(response.status_code, 200)
+            data = json.loads(response.content)
+            self.assertLessEqual(len(data['results']), 2)
+            ids.append([item.get('issue_id', item.get('id'))
+                        for item in data['results']])
+            last_url, url = url, data[direction]
+        return ids, last_url
+
+    def test_list_issues_forward_and_backward(self):
+        ids, last_url = self.browse(self.issues_url + '?page_size=2', 'next')
+        self.assertEquals(ids, [[1, 2], [3, 4], [5]])
+        ids, first_url = self.browse(last_url, 'previous')
+        self.assertEquals(ids, [[5], [3, 4], [1, 2]])
+
+    def test_list_comments_forward(self):
+        ids, last_url = self.browse(self.comments_url + '?page_size=2', 'next')
+        self.assertEquals(ids, [[1, 2], [3, 4], [5]])
+
+    def test_list_default_page(self):
+        response = self.client_user1.get(self.issues_url)
+        data = json.loads(response.content)
+        self.assertEquals(len(data['results']), 5)
+        self.assertIsNone(data['next'])
+        self.assertIsNone(data['previous'])
+
+    def test_list_invalid_cursor(self):
+        response = self.client_user1.get(self.issues_url + '?cursor=invalid')
+        self.assertEquals(response.status_code, 404)
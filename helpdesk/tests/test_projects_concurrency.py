@@ -0,0 +1,64 @@
+import threading
+
+from django.db import connection
+from django.test import TransactionTestCase
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+
+from ..models import Project, Contributor
+
+
+class ProjectConcurrencyTest(TransactionTestCase):
+    """
+    Creates projects from several threads, each with its own database
+    connection.
+    """
+    threads = 8
+    projects_per_thread = 5
+
+    def setUp(self):
+        self.users = [User.objects.create(username='user' + str(i))
+                      for i in range(self.threads)]
+
+    def create_projects(self, user, barrier, errors):
+        client = APIClient()
+        client.force_authenticate(user)
+        try:
+            barrier.wait()
+            for i in range(self.projects_per_thread):
+                post = {'title': user.username, 'description': 'description',
+                        'type': 'projet'}
+                response = client.post('/api/projects/', post)
+                if response.status_code != 201:
+                    errors.append(response.content)
+                elif response.json()['permission'] != 'manager':
+                    errors.append(response.content)
+        except Exception as error:
+            errors.append(error)
+        finally:
+            connection.close()
+
+    def test_concurrent_create(self):
+        barrier = threading.Barrier(self.threads)
+        errors = []
+        threads = [threading.Thread(target=self.create_projects,
+                                    args=(user, barrier, errors))
+                   for user in self.users]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEquals(errors, [])
+        self.assertEquals(Project.objects.count(),
+                          self.threads * self.projects_per_thread)
+        for user in self.users:
+            # Each creator manages exactly the projects they created
+            managed = Project.objects.filter(
+                contributors__user=user, contributors__permission='manager')
+            self.assertEquals(managed.count(), self.projects_per_thread)
+            self.assertEquals(
+                set(managed.values_list('title', flat=True)),
+                {user.username})
+        self.assertEquals(Contributor.objects.count(),
+                          self.threads * self.projects_per_thread)
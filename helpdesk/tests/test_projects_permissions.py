@@ -8,6 +8,22 @@ from django.contrib.auth.hashers import make_password
 from ..models import Project, Contributor, Issue, Comment
 
 
+def get_issue_counts(**counts):
+    issue_counts = {
+        'status': {'a faire': 0, 'en cours': 0, 'termine': 0},
+        'priority': {'elevee': 0, 'moyenne': 0, 'faible': 0},
+        'tag': {'bug': 0, 'tache': 0, 'amelioration': 0},
+    }
+    for field, values in counts.items():
+        issue_counts[field].update(values)
+    return issue_counts
+
+
+# Issue counts of the first project
+ISSUE_COUNTS = get_issue_counts(status={'a faire': 2},
+                                priority={'moyenne': 2}, tag={'bug': 2})
+
+
 class ProjectPermissionsTest(TestCase):
 
     def setUp(self):
@@ -120,8 +136,12 @@ class ProjectPermissionsTest(TestCase):
 
     def test_list_manager(self):
         response = self.client_user1.get(self.create_read_url)
-        self.assertContains(response, 'title1')
-        self.assertContains(response, 'title2')
+        data = json.loads(response.content)
+        content = [{'id': 1, 'title': 'title1',
+                    'description': 'description1', 'type': 'projet',
+                    'role': 'manager', 'permission': 'manager',
+                    'issue_counts': ISSUE_COUNTS}]
+        self.assertEquals(data, content)
 
     def test_create_manager(self):
         post = {'title': 'title3', 'description': 'description3',
@@ -130,7 +150,8 @@ class ProjectPermissionsTest(TestCase):
         data = json.loads(response.content)
         self.assertEquals(response.status_code, 201)
         content = {'id': 3, 'title': 'title3', 'description': 'description3',
-                   'type': 'projet'}
+                   'type': 'projet', 'role': 'Project Manager',
+                   'permission': 'manager', 'issue_counts': get_issue_counts()}
         self.assertEquals(data, content)
         self.assertEquals(Project.objects.count(), 3)
 
@@ -138,7 +159,8 @@ class ProjectPermissionsTest(TestCase):
         response = self.client_user1.get(self.read_update_delete_url)
         data = json.loads(response.content)
         content = {'id': 1, 'title': 'title1', 'description': 'description1',
-                   'type': 'projet'}
+                   'type': 'projet', 'role': 'manager',
+                   'permission': 'manager', 'issue_counts': ISSUE_COUNTS}
         self.assertEquals(data, content)
 
     def test_update_manager(self):
@@ -149,12 +171,19 @@ class ProjectPermissionsTest(TestCase):
         data = json.loads(response.content)
         content = {'id': 1, 'title': 'title_update',
                    'description': 'description1',
-                   'type': 'projet'}
+                   'type': 'projet', 'role': 'manager',
+                   'permission': 'manager', 'issue_counts': ISSUE_COUNTS}
         self.assertEquals(data, content)
 
     def test_list_contributor(self):
         response = self.client_user2.get(self.create_read_url)
         self.assertContains(response, 'title1')
+        self.assertContains(response, 'contributeur')
+        self.assertNotContains(response, 'title2')
+
+    def test_list_other_project_manager(self):
+        response = self.client_user3.get(self.create_read_url)
+        self.assertNotContains(response, 'title1')
         self.assertContains(response, 'title2')
 
     def test_create_contributor(self):
@@ -164,7 +193,8 @@ class ProjectPermissionsTest(TestCase):
         data = json.loads(response.content)
         self.assertEquals(response.status_code, 201)
         content = {'id': 3, 'title': 'title3', 'description': 'description3',
-                   'type': 'projet'}
+                   'type': 'projet', 'role': 'Project Manager',
+                   'permission': 'manager', 'issue_counts': get_issue_counts()}
         self.assertEquals(data, content)
         self.assertEquals(Project.objects.count(), 3)
 
@@ -179,7 +209,9 @@ class ProjectPermissionsTest(TestCase):
         response = self.client_user2.get(self.read_update_delete_url)
         data = json.loads(response.content)
         content = {'id': 1, 'title': 'title1', 'description': 'description1',
-                   'type': 'projet'}
+                   'type': 'projet', 'role': 'contributeur',
+                   'permission': 'contributeur',
+                   'issue_counts': ISSUE_COUNTS}
         self.assertEquals(data, content)
 
     def test_update_non_contributor(self):
@@ -0,0 +1,132 @@
+import json
+
+import msgpack
+from django.test import TestCase, Client
+from django.utils.cache import has_vary_header
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.contrib.auth.hashers import make_password
+
+from ..models import Project, Contributor, Issue, Comment
+from ..renderers import to_columns
+
+
+class RenderersTest(TestCase):
+
+    def setUp(self):
+        User.objects.create(username='user1', password=make_password('user1'))
+        User.objects.create(username='user2', password=make_password('user2'))
+
+        Project.objects.create(title='title1', description='description1',
+                               type='projet')
+        Contributor.objects.create(
+            user=User.objects.get(pk=1),
+            project=Project.objects.get(pk=1),
+            permission='manager',
+            role='manager',
+        )
+        for pk in (1, 2):
+            Issue.objects.create(
+                title='title%s' % pk,
+                desc='description%s' % pk,
+                tag='bug',
+                priority='moyenne',
+                project=Project.objects.get(pk=1),
+                status='a faire',
+                author=User.objects.get(pk=1),
+                assignee=User.objects.get(pk=1) if pk == 1 else None,
+            )
+        Comment.objects.create(
+            description='description1',
+            author=User.objects.get(pk=1),
+            issue=Issue.objects.get(pk=1),
+        )
+
+        self.issues_url = '/api/projects/1/issues/'
+        self.auth_url = reverse('token_obtain')
+        self.client_user1 = Client(
+            HTTP_AUTHORIZATION='Bearer '+self.get_token('user1', 'user1')
+            )
+        self.client_user2 = Client(
+            HTTP_AUTHORIZATION='Bearer '+self.get_token('user2', 'user2')
+            )
+
+    def get_token(self, username, password):
+        post = {'username': username, 'password': password}
+        response = self.client.post(self.auth_url, post)
+        data = json.loads(response.content)
+        return data['access']
+
+    def test_msgpack(self):
+        expected = json.loads(self.client_user1.get(self.issues_url).content)
+        response = self.client_user1.get(
+            self.issues_url, HTTP_ACCEPT='application/msgpack')
+        self.assertEquals(response.status_code, 200)
+        self.assertEquals(response['Content-Type'], 'application/msgpack')
+        self.assertEquals(msgpack.unpackb(response.content), expected)
+        response = self.client_user1.get(self.issues_url + '?format=msgpack')
+        self.assertEquals(msgpack.unpackb(response.content), expected)
+
+    def test_msgpack_errors(self):
+        response = self.client_user2.get(
+            self.issues_url, HTTP_ACCEPT='application/msgpack')
+        self.assertEquals(response.status_code, 403)
+        self.assertIn('detail', msgpack.unpackb(response.content))
+
+    def test_msgpack_request(self):
+        response = self.client_user1.post(
+            self.issues_url,
+            msgpack.packb({'title': 'title3', 'desc': 'description3',
+                           'tag': 'bug', 'priority': 'faible',
+                           'status': 'a faire'}),
+            content_type='application/msgpack',
+            HTTP_ACCEPT='application/msgpack')
+        self.assertEquals(response.status_code, 201)
+        self.assertEquals(msgpack.unpackb(response.content)['title'],
+                          'title3')
+        response = self.client_user1.post(
+            self.issues_url, b'\xc1', content_type='application/msgpack')
+        self.assertEquals(response.status_code, 400)
+
+    def test_columnar(self):
+        expected = json.loads(self.client_user1.get(self.issues_url).content)
+        response = self.client_user1.get(self.issues_url + '?format=columnar')
+        self.assertEquals(response.status_code, 200)
+        self.assertEquals(response['Content-Type'],
+                          'application/vnd.softdesk.columnar+json')
+        data = json.loads(response.content)
+        results = data['results']
+        self.assertEquals(results['columns'], list(expected['results'][0]))
+        self.assertEquals(
+            [dict(zip(results['columns'], row)) for row in results['rows']],
+            expected['results'])
+        self.assertEquals(data['next'], expected['next'])
+
+    def test_to_columns(self):
+        self.assertEquals(to_columns([]), [])
+        self.assertEquals(to_columns({'a': [{'b': 1}, {'b': 2}]}),
+                          {'a': {'columns': ['b'], 'rows': [[1], [2]]}})
+        # The objects of different keys are left as they are
+        self.assertEquals(to_columns([{'a': 1}, {'b': 2}, 3]),
+                          [{'a': 1}, {'b': 2}, 3])
+        self.assertEquals(
+            to_columns([{'a': [{'b': 1}]}]),
+            {'columns': ['a'],
+             'rows': [[{'columns': ['b'], 'rows': [[1]]}]]})
+
+    def test_etags(self):
+        response = self.client_user1.get(self.issues_url)
+        etag = response['ETag']
+        response = self.client_user1.get(
+            self.issues_url, HTTP_ACCEPT='application/msgpack',
+            HTTP_IF_NONE_MATCH=etag)
+        self.assertEquals(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_vary(self):
+        # Also on the 304, whose ETag depends on the user
+        response = self.client_user1.get(self.issues_url)
+        for response in (response, self.client_user1.get(
+                self.issues_url, HTTP_IF_NONE_MATCH=response['ETag'])):
+            for header in ('Accept', 'Authorization'):
+                self.assertTrue(has_vary_header(response, header))
@@ -0,0 +1,172 @@
+import json
+
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.contrib.auth.hashers import make_password
+
+from .. import search
+from ..deletion import delete_issue, delete_project
+from ..models import Project, Contributor, Issue, Comment
+
+
+class SearchTest(TestCase):
+
+    def setUp(self):
+        User.objects.create(username='user1', password=make_password('user1'))
+        User.objects.create(username='user2', password=make_password('user2'))
+
+        Project.objects.create(title='title1', description='description1',
+                               type='projet')
+        Project.objects.create(title='title2', description='description2',
+                               type='projet')
+
+        Contributor.objects.create(
+            user=User.objects.get(pk=1),
+            project=Project.objects.get(pk=1),
+            permission='manager',
+            role='manager',
+        )
+
+        Contributor.objects.create(
+            user=User.objects.get(pk=2),
+            project=Project.objects.get(pk=2),
+            permission='manager',
+            role='manager',
+        )
+
+        issues = [
+            (1, 'Crash au démarrage', 'L\'application plante au lancement'),
+            (1, 'Lenteur', 'La page des projets est lente'),
+            (2, 'Crash à la sauvegarde', 'Plante quand on enregistre'),
+        ]
+        for project, title, desc in issues:
+            Issue.objects.create(
+                title=title,
+                desc=desc,
+                tag='bug',
+                priority='moyenne',
+                project=Project.objects.get(pk=project),
+                status='a faire',
+                author=User.objects.get(pk=project),
+                assignee=User.objects.get(pk=project),
+            )
+
+        Comment.objects.create(
+            description='Le crash vient du cache',
+            author=User.objects.get(pk=1),
+            issue=Issue.objects.get(pk=2),
+        )
+
+        self.search_url = '/api/search/'
+        self.auth_url = reverse('token_obtain')
+
+        self.client_user1 = Client(
+            HTTP_AUTHORIZATION='Bearer '+self.get_token('user1', 'user1')
+            )
+
+    def get_token(self, username, password):
+        post = {'username': username, 'password': password}
+        response = self.client.post(self.auth_url, post)
+        data = json.loads(response.content)
+        return data['access']
+
+    def get_results(self, query):
+        response = self.client_user1.get(self.search_url, query)
+        self.assertEquals(response.status_code, 200)
+        return [(result['type'], result['id'])
+                for result in json.loads(response.content)['results']]
+
+    def test_search_ranked_and_scoped(self):
+        # The title match ranks first, and project 2 is not searched
+        self.assertEquals(self.get_results({'q': 'crash'}),
+                          [('issue', 1), ('comment', 1)])
+
+    def test_search_ranks_older_matches(self):
+        # The issue title outranks the more recent comments
+        for i in range(3):
+            Comment.objects.create(
+                description='Encore un crash', author=User.objects.get(pk=1),
+                issue=Issue.objects.get(pk=2))
+        results = self.get_results({'q': 'crash'})
+        self.assertEquals(len(results), 5)
+        self.assertEquals(results[0], ('issue', 1))
+
+    def test_backend_ranks_all_matches(self):
+        # More matches than the 2000 most recent ones which used to be
+        # ranked, the oldest one matching the title
+        backend = search.get_backend()
+        backend.index(
+            [(search.issue_key(1000), 1, 1000, 'zebre', '')]
+            + [(search.comment_key(1000 + i), 1, 1, '', 'zebre')
+               for i in range(2100)])
+        keys = []
+        for offset in range(0, 2200, 500):
+            keys.extend(key for key, score in backend.search(
+                ['zebre'], [1], offset, 500))
+        self.assertEquals(len(keys), 2101)
+        self.assertEquals(keys[0], search.issue_key(1000))
+        self.assertEquals(backend.search(['zebre'], [2], 0, 10), [])
+
+    def test_search_all_terms_and_prefix(self):
+        self.assertEquals(self.get_results({'q': 'plante lancement'}),
+                          [('issue', 1)])
+        self.assertEquals(self.get_results({'q': 'demarr*'}),
+                          [('issue', 1)])
+
+    def test_search_result(self):
+        response = self.client_user1.get(self.search_url, {'q': 'cache'})
+        result = json.loads(response.content)['results'][0]
+        self.assertEquals(result['project_id'], 1)
+        self.assertEquals(result['issue_id'], 2)
+        self.assertEquals(result['title'], 'Lenteur')
+        self.assertEquals(result['text'], 'Le crash vient du cache')
+
+    def test_search_project(self):
+        self.assertEquals(self.get_results({'q': 'crash', 'project': 1}),
+                          [('issue', 1), ('comment', 1)])
+        response = self.client_user1.get(
+            self.search_url, {'q': 'crash', 'project': 2})
+        self.assertEquals(response.status_code, 403)
+
+    def test_search_without_terms(self):
+        response = self.client_user1.get(self.search_url, {'q': '"*'})
+        self.assertEquals(response.status_code, 400)
+
+    def test_search_paginated(self):
+        response = self.client_user1.get(
+            self.search_url, {'q': 'crash', 'limit': 1})
+        data = json.loads(response.content)
+        self.assertEquals(len(data['results']), 1)
+        response = self.client_user1.get(data['next'])
+        data = json.loads(response.content)
+        self.assertEquals(data['results'][0]['type'], 'comment')
+        self.assertIsNone(data['next'])
+
+    def test_index_updates(self):
+        issue = Issue.objects.get(pk=2)
+        issue.title = 'Crash des projets'
+        issue.save()
+        self.assertEquals(len(self.get_results({'q': 'crash'})), 3)
+        Comment.objects.get(pk=1).delete()
+        self.assertEquals(self.get_results({'q': 'cache'}), [])
+
+    def test_index_bulk(self):
+        self.client_user1.post(
+            '/api/projects/1/issues/2/comments/bulk/',
+            json.dumps([{'description': 'bulk one'}]),
+            content_type='application/json')
+        self.client_user1.patch(
+            '/api/projects/1/issues/bulk/',
+            json.dumps([{'issue_id': 1, 'title': 'bulk two'}]),
+            content_type='application/json')
+        self.assertEquals(self.get_results({'q': 'bulk'}),
+                          [('issue', 1), ('comment', 2)])
+
+    def test_index_deletions(self):
+        delete_issue(Issue.objects.get(pk=2))
+        self.assertEquals(search.get_backend().search(['cache'], [1], 0, 10),
+                          [])
+        delete_project(Project.objects.get(pk=1))
+        self.assertEquals(search.get_backend().search(['crash'], [1], 0, 10),
+                          [])
@@ -0,0 +1,205 @@
+import asyncio
+import json
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db.models import QuerySet
+from django.test import TestCase, Client
+from django.urls import resolve, reverse
+from django.contrib.auth.models import User
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+
+from ..models import (Project, Contributor, Issue, DailyIssueStat,
+                      StatusTimeStat, AssigneeStat)
+from ..stats import increment
+
+
+class StatsTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        User.objects.create(username='user1', password=make_password('user1'))
+        User.objects.create(username='user2', password=make_password('user2'))
+        User.objects.create(username='user3', password=make_password('user3'))
+
+        Project.objects.create(title='title1', description='description1',
+                               type='projet')
+
+        for pk, permission in ((1, 'manager'), (2, 'contributeur')):
+            Contributor.objects.create(
+                user=User.objects.get(pk=pk),
+                project=Project.objects.get(pk=1),
+                permission=permission,
+                role=permission,
+            )
+
+        # Entered its status two hours ago
+        Issue.objects.create(
+            title='title1',
+            desc='description1',
+            tag='bug',
+            priority='moyenne',
+            project=Project.objects.get(pk=1),
+            status='a faire',
+            status_time=timezone.now() - timedelta(hours=2),
+            author=User.objects.get(pk=1),
+            assignee=User.objects.get(pk=2),
+        )
+        Issue.objects.create(
+            title='title2',
+            desc='description2',
+            tag='bug',
+            priority='moyenne',
+            project=Project.objects.get(pk=1),
+            status='en cours',
+            author=User.objects.get(pk=1),
+            assignee=User.objects.get(pk=1),
+        )
+        Issue.objects.create(
+            title='title3',
+            desc='description3',
+            tag='bug',
+            priority='moyenne',
+            project=Project.objects.get(pk=1),
+            status='en cours',
+            author=User.objects.get(pk=1),
+            assignee=User.objects.get(pk=2),
+        )
+
+        self.stats_url = reverse('project-stats', kwargs={'pk': 1})
+        self.auth_url = reverse('token_obtain')
+        self.client_user1 = Client(
+            HTTP_AUTHORIZATION='Bearer '+self.get_token('user1', 'user1')
+            )
+        self.client_user3 = Client(
+            HTTP_AUTHORIZATION='Bearer '+self.get_token('user3', 'user3')
+            )
+
+    def get_token(self, username, password):
+        post = {'username': username, 'password': password}
+        response = self.client.post(self.auth_url, post)
+        data = json.loads(response.content)
+        return data['access']
+
+    def get_stats(self, query=''):
+        cache.clear()
+        response = self.client_user1.get(self.stats_url + query)
+        self.assertEquals(response.status_code, 200)
+        return json.loads(response.content)
+
+    def close_issue(self, pk):
+        response = self.client_user1.put(
+            '/api/projects/1/issues/%s/' % pk,
+            {'title': 'title', 'desc': 'description', 'tag': 'bug',
+             'priority': 'moyenne', 'status': 'termine',
+             'assignee': 'user2'},
+            content_type='application/json')
+        self.assertEquals(response.status_code, 200)
+
+    def test_stats(self):
+        self.close_issue(1)
+        stats = self.get_stats()
+        self.assertEquals(len(stats['throughput']), 30)
+        self.assertEquals(stats['throughput'][-1], {
+            'day': timezone.localdate().isoformat(), 'opened': 3,
+            'closed': 1})
+        self.assertEquals(stats['throughput'][0]['opened'], 0)
+
+        status_time = stats['status_time']
+        self.assertEquals(status_time['a faire']['issues'], 0)
+        self.assertEquals(status_time['a faire']['stays'], 1)
+        self.assertAlmostEqual(status_time['a faire']['seconds'], 7200,
+                               delta=5)
+        self.assertEquals(status_time['en cours']['issues'], 2)
+        self.assertEquals(status_time['termine']['issues'], 1)
+
+        self.assertEquals(stats['top_assignees'], [
+            {'assignee': 'user2', 'issues': 2},
+            {'assignee': 'user1', 'issues': 1}])
+
+    def test_days(self):
+        stats = self.get_stats('?days=7')
+        self.assertEquals(len(stats['throughput']), 7)
+        for days in ('0', '366', 'wrong'):
+            response = self.client_user1.get(self.stats_url + '?days=' + days)
+            self.assertEquals(response.status_code, 400)
+
+    def test_not_contributor(self):
+        response = self.client_user3.get(self.stats_url)
+        self.assertEquals(response.status_code, 403)
+
+    def test_queries_independent_of_issues(self):
+        cache.clear()
+        # The user, as clearing the cache cleared the version of its
+        # memberships, the project, the memberships and the 3 aggregates
+        with self.assertNumQueries(6):
+            self.client_user1.get(self.stats_url)
+        response = self.client_user1.post(
+            '/api/projects/1/issues/bulk/',
+            [{'title': 'title', 'desc': 'description', 'tag': 'bug',
+              'priority': 'faible', 'status': 'termine'}] * 50,
+            content_type='application/json')
+        self.assertEquals(response.status_code, 201)
+        cache.clear()
+        with self.assertNumQueries(6):
+            response = self.client_user1.get(self.stats_url)
+        stats = json.loads(response.content)
+        self.assertEquals(stats['throughput'][-1]['opened'], 53)
+        self.assertEquals(stats['throughput'][-1]['closed'], 50)
+
+    def test_cache(self):
+        self.get_stats()
+        # The user, the project, and the memberships of the user
+        with self.assertNumQueries(3):
+            self.client_user1.get(self.stats_url)
+        self.close_issue(1)
+        stats = json.loads(self.client_user1.get(self.stats_url).content)
+        self.assertEquals(stats['throughput'][-1]['closed'], 1)
+
+    def test_delete(self):
+        self.client_user1.delete('/api/projects/1/issues/2/')
+        stats = self.get_stats()
+        self.assertEquals(stats['throughput'][-1]['opened'], 2)
+        self.assertEquals(stats['status_time']['en cours']['issues'], 1)
+        self.assertEquals(stats['top_assignees'], [
+            {'assignee': 'user2', 'issues': 2}])
+
+    def test_increment_concurrent_create(self):
+        lookup = {'project_id': 1, 'assignee_id': 3}
+        update = QuerySet.update
+
+        def concurrent_update(queryset, **kwargs):
+            # Another transaction creates the row after the first update
+            if not AssigneeStat.objects.filter(**lookup).exists():
+                AssigneeStat.objects.create(**lookup, issues=1)
+                return 0
+            return update(queryset, **kwargs)
+
+        with mock.patch.object(QuerySet, 'update', autospec=True,
+                               side_effect=concurrent_update):
+            increment(AssigneeStat, lookup, issues=1)
+        self.assertEquals(AssigneeStat.objects.get(**lookup).issues, 2)
+
+    def test_rebuild(self):
+        self.close_issue(1)
+        stats = self.get_stats()
+        DailyIssueStat.objects.all().delete()
+        AssigneeStat.objects.update(issues=10)
+        StatusTimeStat.objects.filter(status='en cours').delete()
+        out = StringIO()
+        call_command('rebuild_stats', stdout=out)
+        self.assertIn('1 project(s) rebuilt', out.getvalue())
+        rebuilt = self.get_stats()
+        self.assertEquals(rebuilt['throughput'], stats['throughput'])
+        self.assertEquals(rebuilt['top_assignees'], stats['top_assignees'])
+        self.assertEquals(rebuilt['status_time']['en cours']['issues'], 2)
+        # The ended stays are kept
+        self.assertEquals(rebuilt['status_time']['a faire']['stays'], 1)
+
+    def test_async_view(self):
+        match = resolve('/api/projects/1/stats/', 'softdesk.asgi_urls')
+        self.assertTrue(asyncio.iscoroutinefunction(match.func))
@@ -0,0 +1,87 @@
+import json
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from users.hashers import ScryptPasswordHasher
+from users.models import RevokedToken
+
+
+class RefreshTokenTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        User.objects.create(username='user1', password=make_password('user1'))
+
+        self.auth_url = reverse('token_obtain')
+        self.refresh_url = reverse('token_refresh')
+        self.revoke_url = reverse('token_revoke')
+
+        post = {'username': 'user1', 'password': 'user1'}
+        self.tokens = json.loads(self.client.post(self.auth_url, post).content)
+
+    def refresh(self, refresh):
+        return self.client.post(self.refresh_url, {'refresh': refresh})
+
+    def test_login(self):
+        self.assertEquals(
+            RefreshToken(self.tokens['refresh'])['user_id'], 1)
+        access = AccessToken(self.tokens['access'])
+        self.assertEquals(access['username'], 'user1')
+        self.assertIn('memberships_version', access)
+
+    def test_refresh(self):
+        with self.assertNumQueries(5):
+            response = self.refresh(self.tokens['refresh'])
+        self.assertEquals(response.status_code, 200)
+        data = json.loads(response.content)
+        self.assertNotEquals(data['refresh'], self.tokens['refresh'])
+        access = AccessToken(data['access'])
+        self.assertEquals(access['username'], 'user1')
+        self.assertIn('memberships_version', access)
+
+        client = Client(HTTP_AUTHORIZATION='Bearer ' + data['access'])
+        self.assertEquals(client.get('/api/projects/').status_code, 200)
+        self.assertEquals(self.refresh(data['refresh']).status_code, 200)
+
+    def test_refresh_without_password(self):
+        with mock.patch.object(ScryptPasswordHasher, 'verify') as verify:
+            response = self.refresh(self.tokens['refresh'])
+            verify.assert_not_called()
+        self.assertEquals(response.status_code, 200)
+
+    def test_refresh_once(self):
+        self.assertEquals(self.refresh(self.tokens['refresh']).status_code,
+                          200)
+        self.assertEquals(self.refresh(self.tokens['refresh']).status_code,
+                          401)
+
+    def test_access_token_as_refresh(self):
+        self.assertEquals(self.refresh(self.tokens['access']).status_code,
+                          401)
+
+    def test_revoke(self):
+        response = self.client.post(self.revoke_url,
+                                    {'refresh': self.tokens['refresh']})
+        self.assertEquals(response.status_code, 204)
+        self.assertEquals(self.refresh(self.tokens['refresh']).status_code,
+                          401)
+
+    def test_deactivated_user(self):
+        User.objects.filter(username='user1').update(is_active=False)
+        self.assertEquals(self.refresh(self.tokens['refresh']).status_code,
+                          401)
+
+    def test_expired_removed(self):
+        RevokedToken.objects.create(
+            jti='expired', expires=timezone.now() - timedelta(seconds=1))
+        self.refresh(self.tokens['refresh'])
+        self.assertEquals(RevokedToken.objects.count(), 1)
+        self.assertFalse(RevokedToken.objects.filter(pk='expired').exists())
@@ -7,11 +7,13 @@ from . import views
 
 router = DefaultRouter()
 router.register(r'projects', views.ProjectViewSet)
+router.register(r'search', views.SearchViewSet, basename='search')
 
 project_router = routers.NestedSimpleRouter(
     router, r'projects', lookup='project')
 project_router.register(r'issues', views.IssueViewSet, basename='issues')
 project_router.register(r'users', views.ContributorViewSet, basename='users')
+project_router.register(r'changes', views.ChangeViewSet, basename='changes')
 
 issue_router = routers.NestedSimpleRouter(
     project_router, r'issues', lookup='issue')
@@ -1,65 +1,262 @@
-from rest_framework import permissions, viewsets, status
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import permissions, serializers, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, PermissionDenied
 from rest_framework.generics import get_object_or_404
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 
-from .models import Contributor, Project, Issue, Comment
-from .serializers import (ContributorSerializer, ProjectSerializer,
-                          IssueSerializer, CommentSerializer)
-from .permissions import IsProjectContributor, IsProjectManager, IsProjectManagerUser
+from . import changes, counters, events, export, search, stats
+from .asynchronous import AsyncViewSetMixin, aget_object_or_404
+from .bulk import bulk_create, bulk_response, validate_items
+from .changes import AtomicWritesMixin
+from .conditional import ConditionalMixin
+from .deletion import delete_issue, delete_project
+from .filters import IssueFilterBackend
+from .memberships import get_memberships
+from .models import Change, Contributor, Project, Issue, Comment
+from .pagination import (ChangePagination, IssuePagination, KeysetPagination,
+                         SearchPagination)
+from .pool import database_sync_to_async
+from .renderers import NDJSONRenderer
+from .serializers import (ChangeSerializer, ContributorSerializer,
+                          ProjectSerializer, IssueSerializer,
+                          CommentSerializer, SearchResultSerializer)
+from .permissions import (IsProjectContributor, IsProjectManager,
+                          IsProjectManagerUser)
 
 
-class ProjectViewSet(viewsets.ModelViewSet):
+def check_read_permissions(view, request, project, queryset):
+    """
+    Checks the read permissions of the objects of the queryset on their
+    project, so that an unmodified object is not fetched. The objects are
+    only fetched when the permission is denied, to answer a 404 rather than
+    a 403 to the wrong urls.
+    """
+    try:
+        view.check_object_permissions(request, project)
+    except PermissionDenied:
+        get_object_or_404(queryset)
+        raise
+
+
+def get_projects(user):
+    """
+    Projects with the role and permission of the user, and their issue
+    counters.
+    """
+    contributor = Contributor.objects.filter(project=OuterRef('pk'), user=user)
+    return Project.objects.annotate(
+        role=Subquery(contributor.values('role')),
+        permission=Subquery(contributor.values('permission')),
+    ).prefetch_related('issue_counters')
+
+
+class ProjectViewSet(AsyncViewSetMixin, AtomicWritesMixin, ConditionalMixin,
+                     viewsets.ModelViewSet):
     queryset = Project.objects.all()
     serializer_class = ProjectSerializer
     permission_classes = [permissions.IsAuthenticated, IsProjectManager]
 
+    def get_queryset(self):
+        user = self.request.user.pk
+        if self.action == 'list':
+            # Only the projects of the user, with the user role, joined on
+            # the (user, project) index of the contributors.
+            return Project.objects.filter(contributors__user=user).annotate(
+                role=F('contributors__role'),
+                permission=F('contributors__permission'),
+            ).order_by('pk').prefetch_related('issue_counters')
+        return get_projects(user)
+
+    def get_list_state(self, request):
+        # The ids and versions of the projects of the user: leaving one
+        # project for another with the same version changes the ids.
+        projects = Project.objects.filter(
+            contributors__user=request.user.pk).order_by('pk').values_list(
+                'pk', 'version', 'updated_time')
+        return list(projects)
+
+    def not_modified_list(self, request, projects):
+        state = 'projects:' + ','.join(
+            '%s:%s' % (pk, version) for pk, version, _ in projects)
+        last_modified = max(
+            (updated_time for _, _, updated_time in projects), default=None)
+        return self.not_modified(request, state, last_modified)
+
+    def list(self, request):
+        response = self.not_modified_list(
+            request, self.get_list_state(request))
+        if response is not None:
+            return response
+        return super().list(request)
+
+    async def alist(self, request):
+        state = await database_sync_to_async(self.get_list_state)(request)
+        response = self.not_modified_list(request, state)
+        if response is not None:
+            return response
+        return await database_sync_to_async(super().list)(request)
+
+    def retrieve(self, request, pk=None):
+        project = self.get_object()
+        response = self.not_modified_project(request, project)
+        if response is not None:
+            return response
+        serializer = self.get_serializer(project)
+        return Response(serializer.data)
+
+    async def aretrieve(self, request, pk=None):
+        project = await aget_object_or_404(
+            self.filter_queryset(self.get_queryset()), pk=pk)
+        await self.acheck_object_permissions(request, project)
+        response = self.not_modified_project(request, project)
+        if response is not None:
+            return response
+        serializer = self.get_serializer(project)
+        return Response(serializer.data)
+
     def create(self, request):
         serializer = ProjectSerializer(
             context={'request': request}, data=request.data)
         if serializer.is_valid():
-            serializer.save()
-            contributor = Contributor(
-                user=self.request.user,
-                project=Project.objects.last(),
-                permission='manager',
-                role='Project Manager',
-            )
-            contributor.save()
+            with transaction.atomic():
+                project = serializer.save()
+                contributor = Contributor.objects.create(
+                    user=self.request.user,
+                    project=project,
+                    permission='manager',
+                    role='Project Manager',
+                )
+            project.role = contributor.role
+            project.permission = contributor.permission
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def destroy(self, request, pk=None):
         project = get_object_or_404(Project, pk=pk)
-        issues = Issue.objects.filter(project=pk)
-        contributors = Contributor.objects.filter(project=pk)
         self.check_object_permissions(request, project)
-        project.delete()
-        for issue in issues:
-            comments = Comment.objects.filter(issue=issue.pk)
-            for comment in comments:
-                comment.delete()
-            issue.delete()
-        for contributor in contributors:
-            contributor.delete()
+        delete_project(project)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+    def get_stats_days(self, request):
+        days = request.query_params.get('days', 30)
+        try:
+            days = int(days)
+        except ValueError:
+            raise serializers.ValidationError(
+                {'days': ['A valid integer is required.']})
+        if not 1 <= days <= stats.get_max_days():
+            raise serializers.ValidationError(
+                {'days': ['Ensure this value is between 1 and %s.'
+                          % stats.get_max_days()]})
+        return days
+
+    @action(detail=True)
+    def stats(self, request, pk=None):
+        """
+        Issues opened and closed on each of the last days (30, or the days
+        query parameter), time spent by the issues in each status, and top
+        assignees of the project.
+        """
+        days = self.get_stats_days(request)
+        project = get_object_or_404(Project, pk=pk)
+        self.check_object_permissions(request, project)
+        return Response(stats.get_cached_stats(project, days))
+
+    async def astats(self, request, pk=None):
+        days = self.get_stats_days(request)
+        project = await aget_object_or_404(Project, pk=pk)
+        await self.acheck_object_permissions(request, project)
+        return Response(await database_sync_to_async(
+            stats.get_cached_stats)(project, days))
 
-class IssueViewSet(viewsets.ViewSet):
+    @action(detail=True, renderer_classes=[JSONRenderer, NDJSONRenderer])
+    def export(self, request, pk=None):
+        """
+        Whole project, with its contributors, issues and comments, streamed
+        as a JSON object, or as NDJSON with the ndjson format.
+        """
+        project = get_object_or_404(Project, pk=pk)
+        self.check_object_permissions(request, project)
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(
+            export.export(project, renderer.format),
+            content_type=renderer.media_type)
+        response['Content-Disposition'] = \
+            'attachment; filename="project-%s.%s"' % (project.pk,
+                                                      renderer.format)
+        return response
+
+
+class IssueViewSet(AsyncViewSetMixin, AtomicWritesMixin, ConditionalMixin,
+                   viewsets.ViewSet):
     queryset = Issue.objects.all()
     serializer_class = IssueSerializer
     permission_classes = [permissions.IsAuthenticated, IsProjectContributor]
+    pagination_class = IssuePagination
+    filter_backends = [IssueFilterBackend]
 
     def list(self, request, project_pk=None):
         project = get_object_or_404(Project, pk=project_pk)
         self.check_object_permissions(request, project)
-        queryset = Issue.objects.filter(project=project_pk)
-        serializer = IssueSerializer(queryset, many=True)
-        return Response(serializer.data)
+        response = self.not_modified_project(request, project)
+        if response is not None:
+            return response
+        return self.list_page(request, project_pk)
+
+    async def alist(self, request, project_pk=None):
+        project = await aget_object_or_404(Project, pk=project_pk)
+        await self.acheck_object_permissions(request, project)
+        response = self.not_modified_project(request, project)
+        if response is not None:
+            return response
+        return await database_sync_to_async(self.list_page)(
+            request, project_pk)
+
+    def list_page(self, request, project_pk):
+        queryset = Issue.objects.filter(project=project_pk).select_related(
+            'author', 'assignee')
+        for backend in self.filter_backends:
+            queryset = backend().filter_queryset(request, queryset, self)
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = IssueSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    def get_retrieve_queryset(self, pk, project_pk):
+        return Issue.objects.filter(
+            pk=pk, project=project_pk).select_related('author', 'assignee')
 
     def retrieve(self, request, pk=None, project_pk=None):
-        queryset = Issue.objects.filter(pk=pk, project=project_pk)
+        queryset = self.get_retrieve_queryset(pk, project_pk)
+        project = get_object_or_404(Project, pk=project_pk)
+        check_read_permissions(self, request, project, queryset)
+        response = self.not_modified_project(request, project, exists=False)
+        if response is not None:
+            return response
         issue = get_object_or_404(queryset, pk=pk)
-        self.check_object_permissions(request, issue)
+        response = self.not_modified_project(request, project)
+        if response is not None:
+            return response
+        serializer = IssueSerializer(issue)
+        return Response(serializer.data)
+
+    async def aretrieve(self, request, pk=None, project_pk=None):
+        queryset = self.get_retrieve_queryset(pk, project_pk)
+        project = await aget_object_or_404(Project, pk=project_pk)
+        await self.acheck_read_permissions(request, project, queryset)
+        response = self.not_modified_project(request, project, exists=False)
+        if response is not None:
+            return response
+        issue = await aget_object_or_404(queryset, pk=pk)
+        response = self.not_modified_project(request, project)
+        if response is not None:
+            return response
         serializer = IssueSerializer(issue)
         return Response(serializer.data)
 
@@ -67,20 +264,143 @@ class IssueViewSet(viewsets.ViewSet):
         project = get_object_or_404(Project, pk=project_pk)
         self.check_object_permissions(request, project)
         serializer = IssueSerializer(
-            data=request.data, context={'request': request, 'project': project_pk})
+            data=request.data,
+            context={'request': request, 'project': project_pk})
         if serializer.is_valid():
             serializer.save(
                 author=self.request.user,
-                project=Project.objects.get(pk=project_pk)
+                project=project
             )
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=False, methods=['post', 'patch'])
+    def bulk(self, request, project_pk=None):
+        """
+        Creates (POST) or updates (PATCH) a list of issues, and returns the
+        result of each item, i.e. its status code with the issue or the
+        errors.
+        """
+        project = get_object_or_404(Project, pk=project_pk)
+        if not get_memberships(request).is_contributor(project.pk):
+            self.permission_denied(request)
+        items = validate_items(request.data)
+        # The assignees are validated against the contributors, loaded once
+        contributors = {
+            user.username: user
+            for user in User.objects.filter(contributor__project=project)}
+        context = {'request': request, 'project': project.pk,
+                   'contributors': contributors}
+        if request.method == 'POST':
+            results = self.bulk_create(request, project, items, context)
+            success = status.HTTP_201_CREATED
+        else:
+            results = self.bulk_update(request, project, items, context)
+            success = status.HTTP_200_OK
+        return bulk_response(results, success)
+
+    def bulk_create(self, request, project, items, context):
+        # A single serializer validates all the items, so that its fields
+        # are only built once.
+        serializer = IssueSerializer(context=context)
+        results = []
+        issues = []
+        for item in items:
+            try:
+                validated_data = serializer.run_validation(item)
+            except serializers.ValidationError as error:
+                results.append((status.HTTP_400_BAD_REQUEST,
+                                serializers.as_serializer_error(error)))
+                continue
+            issue = Issue(author=request.user, project=project,
+                          **validated_data)
+            issues.append(issue)
+            results.append(issue)
+        with transaction.atomic():
+            bulk_create(Issue.objects.filter(
+                project=project, author=request.user.pk), issues)
+            # bulk_create does not send the signals indexing the issues and
+            # recording their changes
+            search.index_issues(issues)
+            counters.count_issues(issues)
+            changes.record(project.pk, 'issue', 'create',
+                           [(issue.pk, issue.pk) for issue in issues])
+            events.publish_issues(issues, created=True)
+        return [
+            (status.HTTP_201_CREATED, serializer.to_representation(result))
+            if isinstance(result, Issue) else result
+            for result in results
+        ]
+
+    def bulk_update(self, request, project, items, context):
+        pks = [item.get('issue_id') for item in items
+               if isinstance(item, dict)]
+        issues = Issue.objects.filter(project=project).select_related(
+            'author', 'assignee').in_bulk(
+                [pk for pk in pks if isinstance(pk, int)])
+        serializer = IssueSerializer(partial=True, context=context)
+        results = []
+        updated = {}
+        fields = set()
+        for item in items:
+            issue = issues.get(item.get('issue_id')) \
+                if isinstance(item, dict) else None
+            if issue is None:
+                results.append((status.HTTP_404_NOT_FOUND,
+                                {'detail': NotFound.default_detail}))
+                continue
+            if issue.author_id != request.user.pk:
+                results.append((status.HTTP_403_FORBIDDEN,
+                                {'detail': PermissionDenied.default_detail}))
+                continue
+            try:
+                validated_data = serializer.run_validation(item)
+            except serializers.ValidationError as error:
+                results.append((status.HTTP_400_BAD_REQUEST,
+                                serializers.as_serializer_error(error)))
+                continue
+            for attr, value in validated_data.items():
+                setattr(issue, attr, value)
+            fields.update(validated_data)
+            updated[issue.pk] = issue
+            results.append(issue)
+        if fields:
+            # bulk_update does not call pre_save, nor Issue.save
+            if 'priority' in fields:
+                fields.add('priority_rank')
+            if 'status' in fields:
+                fields.add('status_time')
+                now = timezone.now()
+                for issue in updated.values():
+                    if issue.status != issue._saved_values['status']:
+                        issue.status_time = now
+            fields.add('updated_time')
+            for field in fields & {'priority_rank', 'updated_time'}:
+                field = Issue._meta.get_field(field)
+                for issue in updated.values():
+                    field.pre_save(issue, False)
+            with transaction.atomic():
+                Issue.objects.bulk_update(
+                    updated.values(), fields, batch_size=500)
+                if {'title', 'desc'} & fields:
+                    search.index_issues(updated.values())
+                counters.count_issue_updates(updated.values())
+                changes.record(project.pk, 'issue', 'update',
+                               [(pk, pk) for pk in updated])
+                events.publish_issues(updated.values(), created=False)
+        return [
+            (status.HTTP_200_OK, serializer.to_representation(result))
+            if isinstance(result, Issue) else result
+            for result in results
+        ]
+
     def update(self, request, pk=None, project_pk=None):
         queryset = Issue.objects.filter(pk=pk, project=project_pk)
         issue = get_object_or_404(queryset, pk=pk)
         self.check_object_permissions(request, issue)
-        serializer = IssueSerializer(issue, data=request.data, context={'request': request, 'project': project_pk})
+        serializer = IssueSerializer(
+            issue, data=request.data,
+            context={'request': request, 'project': project_pk})
         if serializer.is_valid():
             serializer.save(
                 author=self.request.user,
@@ -92,55 +412,143 @@ class IssueViewSet(viewsets.ViewSet):
     def destroy(self, request, pk=None, project_pk=None):
         queryset = Issue.objects.filter(pk=pk, project=project_pk)
         issue = get_object_or_404(queryset, pk=pk)
-        comments = Comment.objects.filter(issue=pk)
         self.check_object_permissions(request, issue)
-        issue.delete()
-        for comment in comments:
-            comment.delete()
+        delete_issue(issue)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class CommentViewSet(viewsets.ViewSet):
+class CommentViewSet(AsyncViewSetMixin, AtomicWritesMixin, ConditionalMixin,
+                     viewsets.ViewSet):
     serializer_class = CommentSerializer
     permission_classes = [permissions.IsAuthenticated, IsProjectContributor]
+    pagination_class = KeysetPagination
 
     def list(self, request, project_pk=None, issue_pk=None):
-        if not Issue.objects.filter(pk=issue_pk, project=project_pk).exists():
-            return Response(status=status.HTTP_404_NOT_FOUND)
+        issues = Issue.objects.filter(pk=issue_pk, project=project_pk)
         project = get_object_or_404(Project, pk=project_pk)
-        self.check_object_permissions(request, project)
+        check_read_permissions(self, request, project, issues)
+        response = self.not_modified_project(request, project, exists=False)
+        if response is not None:
+            return response
+        if not issues.exists():
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        response = self.not_modified_project(request, project)
+        if response is not None:
+            return response
+        return self.list_page(request, project_pk, issue_pk)
+
+    async def alist(self, request, project_pk=None, issue_pk=None):
+        issues = Issue.objects.filter(pk=issue_pk, project=project_pk)
+        project = await aget_object_or_404(Project, pk=project_pk)
+        await self.acheck_read_permissions(request, project, issues)
+        response = self.not_modified_project(request, project, exists=False)
+        if response is not None:
+            return response
+        if not await database_sync_to_async(issues.exists)():
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        response = self.not_modified_project(request, project)
+        if response is not None:
+            return response
+        return await database_sync_to_async(self.list_page)(
+            request, project_pk, issue_pk)
+
+    def list_page(self, request, project_pk, issue_pk):
         queryset = Comment.objects.filter(
             issue__project=project_pk,
             issue=issue_pk
-        )
-        serializer = CommentSerializer(queryset, many=True)
-        return Response(serializer.data)
+        ).select_related('author')
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = CommentSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
-    def retrieve(self, request, pk=None, project_pk=None, issue_pk=None):
-        queryset = Comment.objects.filter(
+    def get_retrieve_queryset(self, pk, project_pk, issue_pk):
+        return Comment.objects.filter(
             pk=pk,
             issue__project=project_pk,
             issue=issue_pk
-        )
+        ).select_related('author')
+
+    def retrieve(self, request, pk=None, project_pk=None, issue_pk=None):
+        queryset = self.get_retrieve_queryset(pk, project_pk, issue_pk)
+        project = get_object_or_404(Project, pk=project_pk)
+        check_read_permissions(self, request, project, queryset)
+        response = self.not_modified_project(request, project, exists=False)
+        if response is not None:
+            return response
         comment = get_object_or_404(queryset, pk=pk)
-        self.check_object_permissions(request, comment)
+        response = self.not_modified_project(request, project)
+        if response is not None:
+            return response
+        serializer = CommentSerializer(comment)
+        return Response(serializer.data)
+
+    async def aretrieve(self, request, pk=None, project_pk=None,
+                        issue_pk=None):
+        queryset = self.get_retrieve_queryset(pk, project_pk, issue_pk)
+        project = await aget_object_or_404(Project, pk=project_pk)
+        await self.acheck_read_permissions(request, project, queryset)
+        response = self.not_modified_project(request, project, exists=False)
+        if response is not None:
+            return response
+        comment = await aget_object_or_404(queryset, pk=pk)
+        response = self.not_modified_project(request, project)
+        if response is not None:
+            return response
         serializer = CommentSerializer(comment)
         return Response(serializer.data)
 
     def create(self, request, project_pk=None, issue_pk=None):
-        if not Issue.objects.filter(pk=issue_pk, project=project_pk).exists():
-            return Response(status=status.HTTP_404_NOT_FOUND)
-        project = Project.objects.get(pk=project_pk)
-        self.check_object_permissions(request, project)
+        issue = get_object_or_404(Issue, pk=issue_pk, project=project_pk)
+        self.check_object_permissions(request, issue)
         serializer = CommentSerializer(data=request.data)
         if serializer.is_valid():
             serializer.save(
                 author=self.request.user,
-                issue=Issue.objects.get(pk=issue_pk)
+                issue=issue
             )
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=False, methods=['post'])
+    def bulk(self, request, project_pk=None, issue_pk=None):
+        """
+        Creates a list of comments, and returns the result of each item,
+        i.e. its status code with the comment or the errors.
+        """
+        issue = get_object_or_404(Issue, pk=issue_pk, project=project_pk)
+        self.check_object_permissions(request, issue)
+        items = validate_items(request.data)
+        # A single serializer validates all the items, so that its fields
+        # are only built once.
+        serializer = CommentSerializer()
+        results = []
+        comments = []
+        for item in items:
+            try:
+                validated_data = serializer.run_validation(item)
+            except serializers.ValidationError as error:
+                results.append((status.HTTP_400_BAD_REQUEST,
+                                serializers.as_serializer_error(error)))
+                continue
+            comment = Comment(author=request.user, issue=issue,
+                              **validated_data)
+            comments.append(comment)
+            results.append(comment)
+        with transaction.atomic():
+            bulk_create(Comment.objects.filter(
+                issue=issue, author=request.user.pk), comments)
+            search.index_comments(comments)
+            counters.count_comments(issue.pk, len(comments))
+            changes.record(issue.project_id, 'comment', 'create',
+                           [(comment.pk, issue.pk) for comment in comments])
+            events.publish_comments(comments, issue.project_id)
+        return bulk_response([
+            (status.HTTP_201_CREATED, serializer.to_representation(result))
+            if isinstance(result, Comment) else result
+            for result in results
+        ], status.HTTP_201_CREATED)
+
     def update(self, request, pk=None, project_pk=None, issue_pk=None):
         if not Issue.objects.filter(pk=issue_pk, project=project_pk).exists():
             return Response(status=status.HTTP_404_NOT_FOUND)
@@ -164,16 +572,19 @@ class CommentViewSet(viewsets.ViewSet):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class ContributorViewSet(viewsets.ViewSet):
+class ContributorViewSet(AtomicWritesMixin, ConditionalMixin,
+                         viewsets.ViewSet):
     serializer_class = ContributorSerializer
     permission_classes = [permissions.IsAuthenticated, IsProjectManagerUser]
 
     def list(self, request, project_pk=None):
         project = get_object_or_404(Project, pk=project_pk)
         self.check_object_permissions(request, project)
-        if not Project.objects.filter(pk=project_pk).exists():
-            return Response(status=status.HTTP_404_NOT_FOUND)
-        queryset = Contributor.objects.filter(project=project_pk)
+        response = self.not_modified_project(request, project)
+        if response is not None:
+            return response
+        queryset = Contributor.objects.filter(
+            project=project_pk).select_related('user')
         serializer = ContributorSerializer(queryset, many=True)
         return Response(serializer.data)
 
@@ -195,3 +606,90 @@ class ContributorViewSet(viewsets.ViewSet):
         self.check_object_permissions(request, contributor)
         contributor.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class SearchViewSet(viewsets.ViewSet):
+    """
+    Full-text search of the issues and comments of the projects of the
+    user, or of the project given by the project query parameter.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = SearchPagination
+
+    def list(self, request):
+        terms = search.parse_query(request.query_params.get('q', ''))
+        if not terms:
+            raise serializers.ValidationError(
+                {'q': ['This query has no search term.']})
+        memberships = get_memberships(request)
+        project_ids = memberships.permissions.keys()
+        project = request.query_params.get('project')
+        if project is not None:
+            try:
+                project = int(project)
+            except ValueError:
+                raise serializers.ValidationError(
+                    {'project': ['A valid integer is required.']})
+            if not memberships.is_contributor(project):
+                self.permission_denied(request)
+            project_ids = [project]
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(
+            search.search(terms, project_ids), request, view=self)
+        serializer = SearchResultSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+
+class ChangeViewSet(ConditionalMixin, viewsets.ViewSet):
+    """
+    Changes of a project since the one whose seq is given by the since
+    query parameter, with the current data of the changed objects.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsProjectContributor]
+    pagination_class = ChangePagination
+
+    # Querysets loading the changed objects, by model
+    querysets = {
+        'issue': Issue.objects.select_related('author', 'assignee'),
+        'comment': Comment.objects.select_related('author'),
+        'contributor': Contributor.objects.select_related('user'),
+    }
+
+    def list(self, request, project_pk=None):
+        # Serialized as the data of the project changes
+        project = get_object_or_404(get_projects(request.user.pk),
+                                    pk=project_pk)
+        self.check_object_permissions(request, project)
+        response = self.not_modified_project(request, project)
+        if response is not None:
+            return response
+        queryset = Change.objects.filter(project=project_pk)
+        since = request.query_params.get('since')
+        if since is not None:
+            try:
+                queryset = queryset.filter(seq__gt=int(since))
+            except ValueError:
+                raise serializers.ValidationError(
+                    {'since': ['A valid integer is required.']})
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        # The changed objects are loaded with a query per model
+        ids = {}
+        for change in page:
+            if change.model != 'project':
+                ids.setdefault(change.model, set()).add(change.object_id)
+        objects = {
+            (model, pk): obj
+            for model, pks in ids.items()
+            for pk, obj in self.querysets[model].filter(
+                **self.get_project_filter(model, project_pk)).in_bulk(
+                    pks).items()}
+        objects['project', project.pk] = project
+        serializer = ChangeSerializer(
+            page, many=True, context={'objects': objects})
+        return paginator.get_paginated_response(serializer.data)
+
+    def get_project_filter(self, model, project_pk):
+        if model == 'comment':
+            return {'issue__project': project_pk}
+        return {'project': project_pk}
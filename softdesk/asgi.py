@@ -7,10 +7,106 @@ For more information on this file, see
 https://docs.djangoproject.com/en/3.1/howto/deployment/asgi/
 """
 
+import asyncio
 import os
+from concurrent.futures import ThreadPoolExecutor
 
-from django.core.asgi import get_asgi_application
+import django
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIHandler
+from django.db import connections
+from django.urls import set_urlconf
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'softdesk.settings')
 
-application = get_asgi_application()
+
+class AsyncViewsASGIHandler(ASGIHandler):
+    """
+    Serves the urls of softdesk.asgi_urls, with the async views of the
+    helpdesk, rather than the sync views of the WSGI deployments.
+    """
+    urlconf = 'softdesk.asgi_urls'
+
+    def create_request(self, scope, body_file):
+        request, error_response = super().create_request(scope, body_file)
+        if request is not None:
+            request.urlconf = self.urlconf
+        return request, error_response
+
+    async def send_response(self, response, send):
+        """
+        Sends the streaming responses, e.g. the project exports, iterating
+        them in a thread of their own, as Django iterates them in the event
+        loop, where they can not query the database. The iterator keeps its
+        thread, whose connection its queries and transaction use, until it
+        is closed.
+        """
+        if not response.streaming:
+            return await super().send_response(response, send)
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=1)
+
+        def run(func, *args):
+            return loop.run_in_executor(executor, func, *args)
+
+        try:
+            response_headers = []
+            for header, value in response.items():
+                if isinstance(header, str):
+                    header = header.encode('ascii')
+                if isinstance(value, str):
+                    value = value.encode('latin1')
+                response_headers.append((bytes(header), bytes(value)))
+            for cookie in response.cookies.values():
+                response_headers.append((
+                    b'Set-Cookie',
+                    cookie.output(header='').encode('ascii').strip()))
+            await send({
+                'type': 'http.response.start',
+                'status': response.status_code,
+                'headers': response_headers,
+            })
+            parts = iter(response)
+            while True:
+                part = await run(next, parts, None)
+                if part is None:
+                    break
+                for chunk, last in self.chunk_bytes(part):
+                    await send({
+                        'type': 'http.response.body',
+                        'body': chunk,
+                        'more_body': True,
+                    })
+            await send({'type': 'http.response.body'})
+        finally:
+            await run(self.close_streaming_response, response)
+            executor.shutdown(wait=False)
+            # request_finished, sent by the close of the response, resets
+            # the urlconf of its own thread only, rather than the one of the
+            # thread of the sync views, where Django closes the responses
+            await sync_to_async(set_urlconf, thread_sensitive=True)(None)
+
+    def close_streaming_response(self, response):
+        # Closes the iterator, whose transaction is bound to the thread, and
+        # sends request_finished
+        response.close()
+        # The thread ends with the response
+        connections.close_all()
+
+
+django.setup(set_prefix=False)
+django_application = AsyncViewsASGIHandler()
+
+# Imported once the apps are loaded
+from helpdesk.stream import EventStream  # noqa: E402
+
+event_stream = EventStream()
+
+
+async def application(scope, receive, send):
+    # The event stream is served outside of Django, whose responses cannot
+    # be streamed from a coroutine.
+    if scope['type'] == 'http' and scope['path'] == '/api/events/':
+        await event_stream(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
@@ -0,0 +1,14 @@
+"""softdesk URL Configuration of the ASGI deployments
+
+The urls of softdesk.urls, with the async views of the helpdesk and of the
+users, which the ASGI handler of softdesk.asgi serves.
+"""
+from django.urls import path, include
+
+from . import urls
+
+
+urlpatterns = [
+    path('api/', include('helpdesk.async_urls')),
+    path('api/', include('users.async_urls')),
+] + urls.urlpatterns
@@ -0,0 +1,42 @@
+"""
+Cache profiles of the deployments.
+
+The cache is read from the CACHE_URL environment variable, e.g.
+memcached://cache.example.com:11211, redis://cache.example.com:6379/0, or
+file:///var/tmp/softdesk for the workers of a single host. It must be shared
+by the workers, as the project permissions of the users are cached there,
+see helpdesk.memberships.
+
+The memcached backend needs python-memcached, and the redis one
+django-redis.
+"""
+from urllib.parse import unquote, urlsplit
+
+
+BACKENDS = {
+    'memcached': 'django.core.cache.backends.memcached.MemcachedCache',
+    'pylibmc': 'django.core.cache.backends.memcached.PyLibMCCache',
+    'redis': 'django_redis.cache.RedisCache',
+    'rediss': 'django_redis.cache.RedisCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+}
+
+
+def parse_url(url):
+    """
+    Returns the settings of the cache of the url.
+    """
+    parts = urlsplit(url)
+    try:
+        backend = BACKENDS[parts.scheme]
+    except KeyError:
+        raise ValueError('Unsupported cache url scheme: %s' % parts.scheme)
+    if parts.scheme in ('redis', 'rediss'):
+        # Passed as is to the redis client
+        location = url
+    elif parts.scheme == 'file':
+        location = unquote(parts.path)
+    else:
+        location = parts.netloc
+    return {'BACKEND': backend, 'LOCATION': location}
@@ -10,9 +10,13 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.1/ref/settings/
 """
 
+import os
+import tempfile
 from datetime import timedelta
 from pathlib import Path
 
+from . import cache, database
+
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -42,6 +46,7 @@ INSTALLED_APPS = [
     'rest_framework',
     'helpdesk.apps.HelpdeskConfig',
     'users.apps.UsersConfig',
+    'softdesk.apps.SoftdeskConfig',
 ]
 
 MIDDLEWARE = [
@@ -78,17 +83,138 @@ WSGI_APPLICATION = 'softdesk.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.1/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# The database of the deployments is set by the DATABASE_URL environment
+# variable, see softdesk.database, and its connections are kept
+# DATABASE_CONN_MAX_AGE seconds, rather than opened for each request.
+
+DATABASE_CONN_MAX_AGE = int(os.environ.get('DATABASE_CONN_MAX_AGE', 60))
+
+if 'DATABASE_URL' in os.environ:
+    DATABASES = {
+        'default': database.parse_url(os.environ['DATABASE_URL'],
+                                      DATABASE_CONN_MAX_AGE),
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            'CONN_MAX_AGE': DATABASE_CONN_MAX_AGE,
+        }
+    }
+
+# The test database is a file rather than the in-memory default, so that
+# concurrent connections wait for the write lock as they do on a deployed
+# database, instead of failing immediately. It is kept in the temporary
+# directory, along with its write-ahead log.
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    DATABASES['default']['TEST'] = {
+        'NAME': Path(tempfile.gettempdir()) / 'softdesk_test_db.sqlite3',
     }
+
+# Pragmas of the SQLite connections: the readers do not wait for the writer
+# with the write-ahead log, whose commits are only synced to the disk at
+# checkpoints, and the writers wait for the lock up to busy_timeout
+# milliseconds. The database file is read through a memory map of up to
+# mmap_size bytes.
+SOFTDESK_SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/3.1/topics/cache/
+# The cache of the deployments is set by the CACHE_URL environment variable,
+# see softdesk.cache, and must be shared by their workers (memcached, redis,
+# or a file based cache on a single host).
+
+if 'CACHE_URL' in os.environ:
+    CACHES = {
+        'default': cache.parse_url(os.environ['CACHE_URL']),
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+    }
+
+# Cache holding the project permissions of the users, and how long they are
+# kept. The permissions are not cached when it is private to the process,
+# e.g. the local memory one, since the other workers would not see them
+# invalidated.
+HELPDESK_MEMBERSHIP_CACHE = 'default'
+
+HELPDESK_MEMBERSHIP_CACHE_TIMEOUT = 300
+
+# Number of lookups of the permissions counted by a process before its hits
+# and misses are added to the counters of the cache.
+HELPDESK_MEMBERSHIP_STATS_BATCH = 100
+
+
+# Maximum number of items of the bulk issue and comment requests
+HELPDESK_BULK_MAX_ITEMS = 1000
+
+
+# Full-text search: dotted path of the index backend, by default the one of
+# the database vendor.
+HELPDESK_SEARCH_BACKEND = None
+
+
+# Event streams: dotted path of the publish/subscribe backend, number of
+# events buffered per stream before it is closed, and seconds between the
+# keep-alive comments of an idle stream.
+HELPDESK_EVENTS_BACKEND = 'helpdesk.events.InMemoryBackend'
+
+HELPDESK_EVENTS_QUEUE_SIZE = 100
+
+HELPDESK_EVENTS_HEARTBEAT = 15
+
+# Cache of the project statistics, see helpdesk.stats, how long they are
+# kept, and the longest period and the number of assignees they list.
+HELPDESK_STATS_CACHE = 'default'
+
+HELPDESK_STATS_CACHE_TIMEOUT = 60
+
+HELPDESK_STATS_MAX_DAYS = 365
+
+HELPDESK_STATS_TOP_ASSIGNEES = 5
+
+# Number of rows the project exports fetch at once, see helpdesk.export, which
+# bounds their memory.
+HELPDESK_EXPORT_CHUNK_SIZE = 500
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.1/ref/settings/#auth-password-validators
 
+# The passwords are hashed with scrypt, whose cost is set below. The hashes
+# of the other hashers are still checked, and hashed again with scrypt when
+# their user logs in. Put
+# django.contrib.auth.hashers.Argon2PasswordHasher first to use Argon2,
+# which needs argon2-cffi.
+PASSWORD_HASHERS = [
+    'users.hashers.ScryptPasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+
+USERS_SCRYPT_WORK_FACTOR = 2 ** 14
+
+USERS_SCRYPT_BLOCK_SIZE = 8
+
+USERS_SCRYPT_PARALLELISM = 1
+
+# Threads hashing the passwords of the logins and signups of the ASGI
+# deployments, see users.views.hasher_pool_view. None for the default of
+# ThreadPoolExecutor.
+USERS_HASHER_WORKERS = 2
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -125,11 +251,54 @@ USE_TZ = True
 STATIC_URL = '/static/'
 
 REST_FRAMEWORK = {
+    # The claims of the access tokens authenticate the requests without
+    # fetching the user, see users.authentication. Use
+    # rest_framework_simplejwt.authentication.JWTAuthentication to fetch it
+    # on every request.
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.StatelessJWTAuthentication',
     ),
+    # Besides JSON, the responses are negotiated as MessagePack or columnar
+    # JSON, and the requests parsed from MessagePack, see helpdesk.renderers.
+    'DEFAULT_RENDERER_CLASSES': (
+        'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        'helpdesk.renderers.MessagePackRenderer',
+        'helpdesk.renderers.ColumnarJSONRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'rest_framework.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+        'helpdesk.renderers.MessagePackParser',
+    ),
+    # Default page size of the issue and comment lists, which clients can
+    # override with the page_size query parameter.
+    'PAGE_SIZE': 100,
+    # Failed logins allowed per username and per client, see
+    # users.throttling.
+    'DEFAULT_THROTTLE_RATES': {
+        'login_username': '5/min',
+        'login_ip': '30/min',
+    },
+    # Number of proxies in front of the deployment, whose X-Forwarded-For
+    # addresses identify the clients of the login_ip throttle rather than
+    # REMOTE_ADDR.
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', 0)),
 }
 
+# Cache holding the history of the login throttles, which must be shared by
+# the workers, see users.checks.
+USERS_THROTTLE_CACHE = 'default'
+
+# PAGE_SIZE is used by the pagination classes set on each viewset.
+SILENCED_SYSTEM_CHECKS = ['rest_framework.W001']
+
+# The access tokens are renewed with the refresh tokens, without the
+# password, and are not revoked, so they are short-lived. The refresh tokens
+# are used once, and revoked by users.models.RevokedToken.
 SIMPLE_JWT = {
-    'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
+    'ACCESS_TOKEN_LIFETIME': timedelta(minutes=5),
+    'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
+    'ROTATE_REFRESH_TOKENS': True,
 }
@@ -0,0 +1,41 @@
+"""
+Receivers of the connections of the databases of softdesk.database.
+
+Connections kept between requests are checked at the start of each request
+when the HEALTH_CHECKS option of the database is set, so that a connection
+closed by the server or by a pooler is reopened instead of failing the
+request. The SQLite connections are configured by SOFTDESK_SQLITE_PRAGMAS
+when they are opened.
+"""
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    """
+    Sets the pragmas of SOFTDESK_SQLITE_PRAGMAS on the new SQLite
+    connections.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'SOFTDESK_SQLITE_PRAGMAS', {})
+    with connection.cursor() as cursor:
+        for pragma, value in pragmas.items():
+            cursor.execute('PRAGMA %s = %s' % (pragma, value))
+
+
+@receiver(request_started)
+def check_connections(**kwargs):
+    """
+    Closes the persistent connections of the databases with HEALTH_CHECKS
+    which are no longer usable, before the request uses them.
+    """
+    for conn in connections.all():
+        if conn.connection is not None \
+                and conn.settings_dict.get('HEALTH_CHECKS') \
+                and not conn.is_usable():
+            conn.close()
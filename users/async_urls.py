@@ -0,0 +1,11 @@
+from django.urls import path
+
+from . import views
+from .views import hasher_pool_view
+
+# The urls of users.urls, with the password hashing in the hasher pool
+urlpatterns = [
+    path('login/', hasher_pool_view(views.MyTokenObtainView.as_view()),
+         name='token_obtain'),
+    path('signup/', hasher_pool_view(views.CreateUserView.as_view())),
+]
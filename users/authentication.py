@@ -0,0 +1,56 @@
+from django.contrib.auth.models import User
+from django.utils.functional import SimpleLazyObject
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from helpdesk.memberships import get_version
+
+# Claims of the access tokens, besides the user id, see
+# users.serializers.MyTokenObtainSerializer
+USERNAME_CLAIM = 'username'
+VERSION_CLAIM = 'memberships_version'
+
+
+class LazyUser(SimpleLazyObject):
+    """
+    User authenticated by the claims of its token. Its id and username are
+    read from the claims, and its row is only fetched when another of its
+    attributes is used, or when it is assigned to a relation.
+    """
+
+    def __init__(self, user_id, username):
+        super().__init__(lambda: User.objects.get(pk=user_id))
+        self.__dict__.update(pk=user_id, id=user_id, username=username,
+                             is_authenticated=True, is_anonymous=False)
+
+    def __bool__(self):
+        return True
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication trusting the claims of the access tokens without
+    fetching their user, while the version of the memberships of the user is
+    the one the token was issued with.
+
+    The version is incremented when the projects or the roles of the user
+    change, and when the user is deactivated, renamed or deleted, see
+    users.signals. The user of a token issued before is then fetched and
+    checked as by JWTAuthentication, so that these changes take effect on
+    the next request rather than when the token expires.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _('Token contained no recognizable user identification'))
+
+        version = validated_token.get(VERSION_CLAIM)
+        if version is None or USERNAME_CLAIM not in validated_token \
+                or version != get_version(user_id):
+            return super().get_user(validated_token)
+        return LazyUser(user_id, validated_token[USERNAME_CLAIM])
@@ -0,0 +1,20 @@
+from django.core.checks import Tags, Warning, register
+
+from helpdesk.memberships import LOCAL_BACKENDS
+
+from .throttling import get_cache
+
+
+@register(Tags.security, deploy=True)
+def check_throttle_cache(app_configs, **kwargs):
+    """
+    Warns when the login throttles keep their history in a cache private to
+    each worker, which multiplies their rates by the number of workers.
+    """
+    if isinstance(get_cache(), LOCAL_BACKENDS):
+        return [Warning(
+            'The login throttles use a cache private to the process.',
+            hint='Set CACHE_URL, or USERS_THROTTLE_CACHE, to a cache shared '
+                 'by the workers.',
+            id='users.W001')]
+    return []
@@ -0,0 +1,79 @@
+import base64
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth.hashers import BasePasswordHasher, mask_hash
+from django.utils.crypto import constant_time_compare
+from django.utils.translation import gettext_noop as _
+
+
+class ScryptPasswordHasher(BasePasswordHasher):
+    """
+    Password hashing using scrypt, from the standard library, whose cost is
+    set by the USERS_SCRYPT_WORK_FACTOR, USERS_SCRYPT_BLOCK_SIZE and
+    USERS_SCRYPT_PARALLELISM settings.
+
+    The passwords hashed with another cost, or another hasher of
+    PASSWORD_HASHERS, are hashed again with the current one when their user
+    logs in.
+    """
+    algorithm = 'scrypt'
+    dklen = 64
+
+    @property
+    def work_factor(self):
+        return getattr(settings, 'USERS_SCRYPT_WORK_FACTOR', 2 ** 14)
+
+    @property
+    def block_size(self):
+        return getattr(settings, 'USERS_SCRYPT_BLOCK_SIZE', 8)
+
+    @property
+    def parallelism(self):
+        return getattr(settings, 'USERS_SCRYPT_PARALLELISM', 1)
+
+    def encode(self, password, salt, n=None, r=None, p=None):
+        assert password is not None
+        assert salt and '$' not in salt
+        n = n or self.work_factor
+        r = r or self.block_size
+        p = p or self.parallelism
+        hash = hashlib.scrypt(
+            password.encode(), salt=salt.encode(), n=n, r=r, p=p,
+            # The memory needed by scrypt, with some margin
+            maxmem=256 * n * r * p, dklen=self.dklen)
+        hash = base64.b64encode(hash).decode('ascii').strip()
+        return '%s$%d$%s$%d$%d$%s' % (self.algorithm, n, salt, r, p, hash)
+
+    def decode(self, encoded):
+        algorithm, n, salt, r, p, hash = encoded.split('$', 5)
+        assert algorithm == self.algorithm
+        return {'algorithm': algorithm, 'n': int(n), 'salt': salt,
+                'r': int(r), 'p': int(p), 'hash': hash}
+
+    def verify(self, password, encoded):
+        decoded = self.decode(encoded)
+        encoded_2 = self.encode(password, decoded['salt'], decoded['n'],
+                                decoded['r'], decoded['p'])
+        return constant_time_compare(encoded, encoded_2)
+
+    def safe_summary(self, encoded):
+        decoded = self.decode(encoded)
+        return {
+            _('algorithm'): decoded['algorithm'],
+            _('work factor'): decoded['n'],
+            _('block size'): decoded['r'],
+            _('parallelism'): decoded['p'],
+            _('salt'): mask_hash(decoded['salt']),
+            _('hash'): mask_hash(decoded['hash']),
+        }
+
+    def must_update(self, encoded):
+        decoded = self.decode(encoded)
+        return (decoded['n'], decoded['r'], decoded['p']) != (
+            self.work_factor, self.block_size, self.parallelism)
+
+    def harden_runtime(self, password, encoded):
+        # The cost of scrypt can not be completed by another hash, as the
+        # iterations of PBKDF2
+        pass
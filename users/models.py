@@ -0,0 +1,35 @@
+from django.db import IntegrityError, models, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+
+class RevokedToken(models.Model):
+    """
+    Refresh token revoked before it expires, logged out or used to refresh,
+    by its jti. The tokens are removed once expired, as their signature is
+    then rejected anyway.
+    """
+    jti = models.CharField(max_length=32, primary_key=True)
+    expires = models.DateTimeField(db_index=True)
+
+    @classmethod
+    def revoke(cls, token):
+        """
+        Revokes the token, and removes the expired ones. Returns False if
+        the token was already revoked, so that two refreshes racing with the
+        same token can not both succeed.
+        """
+        cls.objects.filter(expires__lte=timezone.now()).delete()
+        try:
+            with transaction.atomic():
+                cls.objects.create(
+                    jti=token[api_settings.JTI_CLAIM],
+                    expires=datetime_from_epoch(token['exp']))
+        except IntegrityError:
+            return False
+        return True
+
+    @classmethod
+    def is_revoked(cls, token):
+        return cls.objects.filter(pk=token[api_settings.JTI_CLAIM]).exists()
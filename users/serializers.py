@@ -1,9 +1,24 @@
 from django.contrib.auth.models import User
 from django.contrib.auth.hashers import make_password
 from django.contrib.auth.password_validation import validate_password
-from rest_framework import serializers
+from rest_framework import exceptions, serializers
+from rest_framework_simplejwt.exceptions import InvalidToken
 from rest_framework_simplejwt.serializers import PasswordField, TokenObtainSerializer
-from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from helpdesk.memberships import get_version
+from .authentication import USERNAME_CLAIM, VERSION_CLAIM
+from .models import RevokedToken
+
+
+def get_access_token(refresh, user_id, username):
+    # The claims authorizing the requests without fetching the user,
+    # see users.authentication.StatelessJWTAuthentication
+    access = refresh.access_token
+    access[USERNAME_CLAIM] = username
+    access[VERSION_CLAIM] = get_version(user_id)
+    return access
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -23,10 +38,64 @@ class UserSerializer(serializers.ModelSerializer):
 class MyTokenObtainSerializer(TokenObtainSerializer):
     @classmethod
     def get_token(cls, user):
-        return AccessToken.for_user(user)
+        return RefreshToken.for_user(user)
 
     def validate(self, attrs):
         data = super().validate(attrs)
-        access = self.get_token(self.user)
-        data['access'] = str(access)
+        refresh = self.get_token(self.user)
+        data['refresh'] = str(refresh)
+        data['access'] = str(get_access_token(
+            refresh, self.user.pk, self.user.username))
         return data
+
+
+class MyTokenRefreshSerializer(serializers.Serializer):
+    """
+    Issues an access token from a refresh token, checking its signature and
+    that it is not revoked, but not the password of its user.
+
+    With ROTATE_REFRESH_TOKENS, the refresh token is revoked and another one
+    is issued, so that each refresh token is used once.
+    """
+    refresh = serializers.CharField()
+
+    default_error_messages = {
+        'no_active_account': TokenObtainSerializer.default_error_messages[
+            'no_active_account'],
+    }
+
+    def validate(self, attrs):
+        refresh = RefreshToken(attrs['refresh'])
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            revoked = not RevokedToken.revoke(refresh)
+        else:
+            revoked = RevokedToken.is_revoked(refresh)
+        if revoked:
+            raise InvalidToken()
+
+        # The version of the memberships trusts the claims of the access
+        # token, so the user is checked again, deactivated or renamed
+        user_id = refresh[api_settings.USER_ID_CLAIM]
+        username = User.objects.filter(pk=user_id, is_active=True) \
+            .values_list('username', flat=True).first()
+        if username is None:
+            raise exceptions.AuthenticationFailed(
+                self.error_messages['no_active_account'],
+                'no_active_account',
+            )
+
+        data = {'access': str(get_access_token(refresh, user_id, username))}
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            refresh.set_jti()
+            refresh.set_exp()
+            data['refresh'] = str(refresh)
+        return data
+
+
+class RevokeTokenSerializer(serializers.Serializer):
+    refresh = serializers.CharField()
+
+    def validate(self, attrs):
+        RevokedToken.revoke(RefreshToken(attrs['refresh']))
+        return {}
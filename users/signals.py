@@ -0,0 +1,19 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from helpdesk.memberships import invalidate_memberships
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_tokens(sender, instance, created, update_fields,
+                           **kwargs):
+    # The claims of the tokens of the user may be stale, unless only its
+    # last login was saved
+    if not created and set(update_fields or ()) != {'last_login'}:
+        invalidate_memberships(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def invalidate_deleted_user_tokens(sender, instance, **kwargs):
+    invalidate_memberships(instance.pk)
@@ -0,0 +1,78 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import SimpleRateThrottle
+
+
+def get_cache():
+    """
+    Returns the cache of the USERS_THROTTLE_CACHE setting, which must be
+    shared by the workers for the rates to hold across them.
+    """
+    return caches[getattr(settings, 'USERS_THROTTLE_CACHE', 'default')]
+
+
+class LoginFailureThrottle(SimpleRateThrottle):
+    """
+    Throttles the logins after too many failures in the duration of the rate
+    of its scope. Only the failures, recorded by record_failure, count, and
+    the throttled logins are answered before their password is hashed.
+    """
+
+    @property
+    def cache(self):
+        return get_cache()
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.history = self.cache.get(self.key, [])
+        self.now = self.timer()
+        while self.history and self.history[-1] <= self.now - self.duration:
+            self.history.pop()
+        if len(self.history) >= self.num_requests:
+            return self.throttle_failure()
+        return True
+
+    def record_failure(self):
+        if getattr(self, 'key', None) is not None:
+            self.history.insert(0, self.now)
+            self.cache.set(self.key, self.history, self.duration)
+
+
+class LoginUsernameThrottle(LoginFailureThrottle):
+    """
+    Throttles the logins of a username, whatever the client.
+    """
+    scope = 'login_username'
+
+    def get_cache_key(self, request, view):
+        try:
+            username = request.data.get('username')
+        except AttributeError:
+            return None
+        if not isinstance(username, str):
+            return None
+        # The usernames may not be valid cache keys
+        ident = hashlib.md5(username.encode()).hexdigest()
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+
+class LoginIPThrottle(LoginFailureThrottle):
+    """
+    Throttles the logins from an IP address, whatever the username. The
+    address is REMOTE_ADDR, or the X-Forwarded-For one added by the last of
+    the NUM_PROXIES proxies of the deployment, since the clients can send
+    any X-Forwarded-For header.
+    """
+    scope = 'login_ip'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope,
+                                    'ident': self.get_ident(request)}
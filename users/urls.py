@@ -5,4 +5,7 @@ from . import views
 urlpatterns = [
     path('login/', views.MyTokenObtainView.as_view(), name='token_obtain'),
     path('signup/', views.CreateUserView.as_view()),
+    path('token/refresh/', views.MyTokenRefreshView.as_view(),
+         name='token_refresh'),
+    path('logout/', views.RevokeTokenView.as_view(), name='token_revoke'),
 ]
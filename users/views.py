@@ -1,9 +1,19 @@
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
 from rest_framework.views import APIView
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework_simplejwt.views import TokenViewBase
 from rest_framework import status
 from rest_framework.response import Response
 
-from .serializers import MyTokenObtainSerializer, UserSerializer
+from helpdesk.pool import release_connections
+from .serializers import (MyTokenObtainSerializer, MyTokenRefreshSerializer,
+                          RevokeTokenSerializer, UserSerializer)
+from .throttling import LoginIPThrottle, LoginUsernameThrottle
 
 
 class CreateUserView(APIView):
@@ -19,3 +29,70 @@ class CreateUserView(APIView):
 
 class MyTokenObtainView(TokenViewBase):
     serializer_class = MyTokenObtainSerializer
+    throttle_classes = [LoginUsernameThrottle, LoginIPThrottle]
+
+    def get_throttles(self):
+        # The throttles checked by the request record its failure
+        if not hasattr(self, 'throttles'):
+            self.throttles = super().get_throttles()
+        return self.throttles
+
+    def post(self, request, *args, **kwargs):
+        try:
+            return super().post(request, *args, **kwargs)
+        except AuthenticationFailed:
+            for throttle in self.get_throttles():
+                throttle.record_failure()
+            raise
+
+
+class MyTokenRefreshView(TokenViewBase):
+    serializer_class = MyTokenRefreshSerializer
+
+
+class RevokeTokenView(TokenViewBase):
+    serializer_class = RevokeTokenSerializer
+
+    def post(self, request, *args, **kwargs):
+        super().post(request, *args, **kwargs)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+_hasher_executor = None
+
+
+def get_hasher_executor():
+    """
+    Returns the pool of threads hashing the passwords of the async views,
+    of USERS_HASHER_WORKERS threads.
+    """
+    global _hasher_executor
+    if _hasher_executor is None:
+        _hasher_executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'USERS_HASHER_WORKERS', None),
+            thread_name_prefix='hasher')
+    return _hasher_executor
+
+
+def hasher_pool_view(view):
+    """
+    Returns an async view running a sync view hashing passwords in the
+    hasher pool. A burst of logins then waits for the pool, instead of
+    occupying the thread of the sync views, or the thread pool of the async
+    views.
+    """
+    def run(request, *args, **kwargs):
+        try:
+            response = view(request, *args, **kwargs)
+            return response.render()
+        finally:
+            release_connections()
+
+    async def async_view(request, *args, **kwargs):
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(
+            get_hasher_executor(),
+            functools.partial(context.run, run, request, *args, **kwargs))
+
+    # Copies csrf_exempt too, which would wrap the coroutine in Django 3.1
+    return functools.update_wrapper(async_view, view)